@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agenda única dos sorteios (sigla oficial -> horário de fechamento)
+
+Carregada da tabela premiacoes e recarregada a cada intervalo, com os
+horários já convertidos para time (inclusive "h:mm AM/PM") e um
+reconhecedor de siglas pré-compilado: uma regex com as siglas em ordem
+decrescente de tamanho, que devolve sempre a sigla mais longa possível
+("PTV ESPECIAL" -> PTV, nunca PT). Webhook, pipeline do relatório e
+dashboard consultam a mesma agenda em vez de cada um manter sua cópia.
+
+Enquanto premiacoes não foi lida (ou se a leitura falhar) valem os
+horários padrão abaixo; siglas que não estão em premiacoes continuam
+com o horário padrão.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, time as hora_do_dia, timedelta
+
+logger = logging.getLogger(__name__)
+
+AGENDA_CONFIG = {
+    'intervalo': int(os.getenv('AGENDA_SORTEIOS_INTERVALO', 300)),              # segundos entre recargas
+    'intervalo_falha': int(os.getenv('AGENDA_SORTEIOS_INTERVALO_FALHA', 30)),   # nova tentativa após erro
+}
+
+HORARIOS_PADRAO = {
+    'PPT': hora_do_dia(9, 20),
+    'PTM': hora_do_dia(11, 20),
+    'PT': hora_do_dia(14, 20),
+    'PTV': hora_do_dia(16, 20),
+    'PTN': hora_do_dia(18, 20),
+    'FEDERAL': hora_do_dia(19, 0),
+    'CORUJINHA': hora_do_dia(21, 30),
+}
+
+SQL_PREMIACOES = "SELECT sigla, horario FROM premiacoes"
+
+_PADRAO_HORARIO = re.compile(r'^\s*(\d{1,2})(?::(\d{2}))?(?::(\d{2}))?\s*([AaPp][Mm])?\s*$')
+
+
+def interpretar_horario(valor):
+    """
+    "14:20", "14:20:00", "2:20 PM", TIME do banco (timedelta) ou time -> time
+    Retorna None se não for um horário válido
+    """
+    if isinstance(valor, hora_do_dia):
+        return valor
+    if isinstance(valor, timedelta):
+        segundos = int(valor.total_seconds()) % 86400
+        return hora_do_dia(segundos // 3600, segundos // 60 % 60, segundos % 60)
+    if not isinstance(valor, str):
+        return None
+    match = _PADRAO_HORARIO.match(valor)
+    if not match:
+        return None
+    hora, minuto, segundo, periodo = match.groups()
+    hora, minuto, segundo = int(hora), int(minuto or 0), int(segundo or 0)
+    if periodo:
+        if not 1 <= hora <= 12:
+            return None
+        hora = hora % 12 + (12 if periodo.upper() == 'PM' else 0)
+    if hora > 23 or minuto > 59 or segundo > 59:
+        return None
+    return hora_do_dia(hora, minuto, segundo)
+
+
+class _Tabela:
+    """Retrato imutável da agenda (trocado inteiro a cada recarga)"""
+
+    __slots__ = ('horarios', 'reconhecedor', 'carregada_em', 'invalidas')
+
+    def __init__(self, horarios, carregada_em=None, invalidas=()):
+        self.horarios = dict(sorted(horarios.items(), key=lambda item: item[1]))
+        self.invalidas = frozenset(invalidas)
+        siglas = sorted(self.horarios, key=len, reverse=True)
+        self.reconhecedor = re.compile("|".join(re.escape(s) for s in siglas)) if siglas else None
+        self.carregada_em = carregada_em
+
+
+class AgendaSorteios:
+    """
+    Uso:
+        agenda.atualizar_se_vencida(conexao)     # quem tem conexão à mão (pymysql ou mysql.connector)
+        agenda.sigla_oficial("PTV ESPECIAL")      # -> "PTV" (prefixo mais longo)
+        agenda.procurar_sigla("SUPER PTN")        # -> "PTN" (em qualquer posição)
+        agenda.horario("PTV")                     # -> time(16, 20)
+    As consultas nunca acessam o banco; a recarga é feita por quem chama,
+    com a conexão que já tem (no webhook, numa thread fora do event loop).
+    """
+
+    def __init__(self, intervalo=None, intervalo_falha=None):
+        self.intervalo = AGENDA_CONFIG['intervalo'] if intervalo is None else intervalo
+        self.intervalo_falha = AGENDA_CONFIG['intervalo_falha'] if intervalo_falha is None else intervalo_falha
+        self._tabela = _Tabela(HORARIOS_PADRAO)
+        self._proxima_carga = 0.0
+        self._lock = threading.Lock()
+
+    # -------------------- carga --------------------
+    def vencida(self):
+        return time.monotonic() >= self._proxima_carga
+
+    def atualizar_se_vencida(self, conexao):
+        """Recarrega de premiacoes se o intervalo passou; erros mantêm a agenda atual"""
+        with self._lock:
+            if not self.vencida():
+                return False
+            # Uma thread recarrega; as outras seguem com a agenda atual
+            self._proxima_carga = time.monotonic() + self.intervalo_falha
+        try:
+            self.carregar(conexao)
+            return True
+        except Exception as e:
+            logger.warning(f"Não foi possível recarregar a agenda de sorteios (premiacoes): {e}")
+            return False
+
+    def carregar(self, conexao):
+        """Lê premiacoes pela conexão informada e troca a agenda"""
+        cursor = conexao.cursor()
+        try:
+            cursor.execute(SQL_PREMIACOES)
+            linhas = cursor.fetchall()
+        finally:
+            cursor.close()
+        self.definir(linhas)
+
+    def definir(self, linhas):
+        """Monta a agenda a partir de pares (sigla, horario) - padrão completa o que faltar"""
+        horarios = dict(HORARIOS_PADRAO)
+        invalidas = set()
+        for linha in linhas:
+            sigla, horario = (linha['sigla'], linha['horario']) if isinstance(linha, dict) else linha
+            sigla = (sigla or "").upper().strip()
+            convertido = interpretar_horario(horario)
+            if not sigla:
+                continue
+            if convertido is None:
+                if horario is not None and str(horario).strip():
+                    invalidas.add(sigla)
+                logger.warning(f"Horário inválido em premiacoes para '{sigla}': {horario!r}")
+                continue
+            horarios[sigla] = convertido
+        self._tabela = _Tabela(horarios, carregada_em=datetime.now(), invalidas=invalidas)
+        self._proxima_carga = time.monotonic() + self.intervalo
+        logger.info(f"Agenda de sorteios carregada: {len(horarios)} siglas")
+
+    # -------------------- consultas --------------------
+    def horarios(self):
+        """sigla -> time, em ordem de horário"""
+        return self._tabela.horarios
+
+    def siglas(self):
+        return list(self._tabela.horarios)
+
+    def horario(self, sigla):
+        """Horário de fechamento da sigla exata (None se desconhecida)"""
+        if not sigla:
+            return None
+        return self._tabela.horarios.get(sigla.upper().strip())
+
+    def siglas_horario_invalido(self):
+        """Siglas cujo horário em premiacoes está preenchido mas não é um horário válido"""
+        return self._tabela.invalidas
+
+    def sigla_oficial(self, texto):
+        """Sigla oficial mais longa no início do texto ("PT ESPECIAL" -> "PT")"""
+        tabela = self._tabela
+        if not texto or tabela.reconhecedor is None:
+            return None
+        match = tabela.reconhecedor.match(texto.upper().strip())
+        return match.group(0) if match else None
+
+    def procurar_sigla(self, texto):
+        """Primeira sigla oficial em qualquer posição do texto (a mais longa naquela posição)"""
+        tabela = self._tabela
+        if not texto or tabela.reconhecedor is None:
+            return None
+        match = tabela.reconhecedor.search(texto.upper().strip())
+        return match.group(0) if match else None
+
+    def fechamento(self, sigla, data):
+        """datetime de fechamento da sigla na data (None se a sigla for desconhecida)"""
+        horario = self.horario(sigla)
+        return datetime.combine(data, horario) if horario is not None else None
+
+    def como_dict(self):
+        tabela = self._tabela
+        return {
+            "siglas": {sigla: horario.strftime('%H:%M') for sigla, horario in tabela.horarios.items()},
+            "carregada_em": tabela.carregada_em.isoformat() if tabela.carregada_em else None,
+            "intervalo": self.intervalo,
+        }
+
+
+# Uma agenda por processo, compartilhada por todos os módulos
+agenda_sorteios = AgendaSorteios()
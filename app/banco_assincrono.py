@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Acesso ao MySQL (mysql.connector) a partir de código async
+
+As consultas rodam num executor de threads próprio, com conexões
+emprestadas de um PoolConexoes: o event loop nunca espera a ida e volta
+ao banco remoto, consultas simultâneas se sobrepõem e o handshake só
+acontece quando o pool abre uma conexão nova. O executor é separado do
+padrão do asyncio (usado pelos relatórios em asyncio.to_thread), então
+uma consulta rápida não fica na fila atrás de um relatório longo.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+
+from db_pool import criar_pool_padrao
+
+logger = logging.getLogger(__name__)
+
+ERROS_CONEXAO = (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)
+
+
+class BancoAssincrono:
+    """
+    Uso:
+        banco = BancoAssincrono(pool)
+        linha = await banco.buscar_um("SELECT ... WHERE edicao = %s", (6197,))
+        linhas = await banco.buscar_todos("SELECT ...")
+        valor = await banco.executar(funcao, arg)   # funcao(conexao, arg) numa thread do executor
+    """
+
+    def __init__(self, pool, max_workers=None):
+        self.pool = pool
+        self.max_workers = max_workers or pool.tamanho_max
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="banco")
+
+    async def executar(self, funcao, *args):
+        """Roda funcao(conexao, *args) no executor com uma conexão do pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._com_conexao, funcao, *args))
+
+    def _com_conexao(self, funcao, *args):
+        with self.pool.conexao() as conexao:
+            return funcao(conexao, *args)
+
+    async def buscar_um(self, sql, parametros=None):
+        """Primeira linha como dict (ou None)"""
+        return await self.executar(_consultar, sql, parametros, False)
+
+    async def buscar_todos(self, sql, parametros=None):
+        """Todas as linhas como dicts"""
+        return await self.executar(_consultar, sql, parametros, True)
+
+    async def iniciar(self):
+        """Pré-abre as conexões mínimas do pool (fora do event loop)"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.pool.preencher)
+
+    def encerrar(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.pool.fechar_todas()
+
+    def metricas(self):
+        return {"executor_threads": self.max_workers, **self.pool.metricas()}
+
+
+def _consultar(conexao, sql, parametros, todos):
+    cursor = conexao.cursor(dictionary=True, buffered=True)
+    try:
+        cursor.execute(sql, parametros)
+        return cursor.fetchall() if todos else cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def criar_banco_assincrono(config):
+    """BancoAssincrono sobre um pool mysql.connector dimensionado por DB_POOL_CONFIG"""
+    pool = criar_pool_padrao(config, fabrica=mysql.connector.connect, erros_conexao=ERROS_CONEXAO)
+    return BancoAssincrono(pool)
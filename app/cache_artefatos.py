@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache dos PDFs gerados, pelo conteúdo do CSV exportado
+
+A chave de uma edição é o hash do CSV normalizado (sem BOM, quebras de
+linha unificadas, sem espaços no fim das linhas nem linhas vazias), do
+título e da versão do renderizador. Se o painel devolver o mesmo
+conteúdo, o PDF que já está na pasta de downloads é reaproveitado sem
+transformar nem renderizar de novo; qualquer mudança no export (ou no
+renderizador) gera outra chave e o PDF é refeito. O manifesto de cada
+edição fica num JSON na pasta compartilhada, visível a todos os processos.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CACHE_ARTEFATOS_CONFIG = {
+    'ativo': os.getenv('RELATORIO_CACHE_ARTEFATOS', 'true').lower() in ('1', 'true', 'sim'),
+}
+
+BOM_UTF8 = b"\xef\xbb\xbf"
+
+
+def hash_csv(caminho_csv):
+    """sha256 do CSV normalizado, lido em streaming"""
+    resumo = hashlib.sha256()
+    with open(caminho_csv, "rb") as arquivo:
+        primeira = True
+        for linha in arquivo:
+            if primeira:
+                linha = linha.removeprefix(BOM_UTF8)
+                primeira = False
+            linha = linha.rstrip()
+            if linha:
+                resumo.update(linha)
+                resumo.update(b"\n")
+    return resumo.hexdigest()
+
+
+def chave_artefato(caminho_csv, titulo, versao_renderizador):
+    """Chave do PDF: conteúdo do CSV + título + versão do renderizador"""
+    resumo = hashlib.sha256()
+    for parte in (hash_csv(caminho_csv), str(titulo), str(versao_renderizador)):
+        resumo.update(parte.encode("utf-8"))
+        resumo.update(b"\0")
+    return resumo.hexdigest()
+
+
+class CacheArtefatos:
+    """
+    Uso:
+        artefato = cache.obter(edicao, chave)      # dict do manifesto ou None
+        cache.registrar(edicao, chave, caminho_pdf, linhas_csv=..., compradores=...)
+    Um acerto exige a mesma chave e o PDF ainda no disco com o tamanho gravado.
+    """
+
+    def __init__(self, pasta):
+        self.pasta = os.path.join(pasta, ".artefatos")
+
+    def _caminho_manifesto(self, edicao):
+        return os.path.join(self.pasta, f"relatorio-{edicao}.json")
+
+    def obter(self, edicao, chave):
+        """Manifesto do PDF da edição se a chave bate e o arquivo continua lá"""
+        try:
+            with open(self._caminho_manifesto(edicao), encoding="utf-8") as f:
+                manifesto = json.load(f)
+        except (OSError, ValueError):
+            manifesto = None
+
+        if manifesto and manifesto.get("chave") == chave and self._pdf_intacto(manifesto):
+            return manifesto
+        return None
+
+    def registrar(self, edicao, chave, caminho_pdf, **extras):
+        """Grava (atomicamente) o manifesto do PDF recém-gerado"""
+        arquivo = self._caminho_manifesto(edicao)
+        temporario = f"{arquivo}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            manifesto = {
+                "edicao": str(edicao),
+                "chave": chave,
+                "caminho_pdf": caminho_pdf,
+                "tamanho": os.path.getsize(caminho_pdf),
+                "gerado_em": time.time(),
+                **extras,
+            }
+            os.makedirs(self.pasta, exist_ok=True)
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(manifesto, f)
+            os.replace(temporario, arquivo)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o manifesto do PDF da edição {edicao}: {e}")
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    def invalidar(self, edicao):
+        try:
+            os.remove(self._caminho_manifesto(edicao))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _pdf_intacto(manifesto):
+        try:
+            return os.path.getsize(manifesto["caminho_pdf"]) == manifesto["tamanho"]
+        except (OSError, KeyError, TypeError):
+            return False
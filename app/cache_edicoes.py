@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache LRU com TTL dos metadados de edição (extracoes_cadastro)
+
+edicao, sigla_oficial e data_sorteio praticamente não mudam depois que a
+edição é cadastrada, então o webhook valida pedidos repetidos (e os
+reenvios de quem chama) sem voltar ao banco. Edições desconhecidas
+também ficam em cache (negativo), com TTL mais curto para que uma edição
+recém-cadastrada passe a ser encontrada logo.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_EDICOES_CONFIG = {
+    'max_itens': int(os.getenv('WEBHOOK_CACHE_EDICOES_MAX', 1000)),
+    'ttl': int(os.getenv('WEBHOOK_CACHE_EDICOES_TTL', 3600)),                    # segundos
+    'ttl_negativo': int(os.getenv('WEBHOOK_CACHE_EDICOES_TTL_NEGATIVO', 60)),    # segundos
+}
+
+_AUSENTE = object()
+
+
+class CacheEdicoes:
+    """
+    Uso:
+        encontrado, info = cache.obter(edicao)   # info None = edição inexistente (cache negativo)
+        if not encontrado:
+            info = consultar_banco(edicao)
+            cache.guardar(edicao, info)
+    Só resultados de consultas bem-sucedidas devem ser guardados - erro de
+    banco não é "edição inexistente".
+    """
+
+    def __init__(self, max_itens=None, ttl=None, ttl_negativo=None):
+        self.max_itens = max(1, max_itens or CACHE_EDICOES_CONFIG['max_itens'])
+        self.ttl = CACHE_EDICOES_CONFIG['ttl'] if ttl is None else ttl
+        self.ttl_negativo = CACHE_EDICOES_CONFIG['ttl_negativo'] if ttl_negativo is None else ttl_negativo
+        self._itens = OrderedDict()  # edicao -> (expira_em, info)
+        self._lock = threading.Lock()
+        self._metricas = {"acertos": 0, "acertos_negativos": 0, "falhas": 0, "expirados": 0, "descartados_lru": 0}
+
+    def obter(self, edicao):
+        """(True, info) se a edição está em cache e válida; (False, None) caso contrário"""
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(edicao, _AUSENTE)
+            if item is not _AUSENTE and item[0] <= agora:
+                del self._itens[edicao]
+                self._metricas["expirados"] += 1
+                item = _AUSENTE
+            if item is _AUSENTE:
+                self._metricas["falhas"] += 1
+                return False, None
+            self._itens.move_to_end(edicao)
+            self._metricas["acertos" if item[1] is not None else "acertos_negativos"] += 1
+            return True, item[1]
+
+    def guardar(self, edicao, info):
+        """Guarda o resultado da consulta (None = edição inexistente, com TTL negativo)"""
+        ttl = self.ttl if info is not None else self.ttl_negativo
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._itens[edicao] = (time.monotonic() + ttl, info)
+            self._itens.move_to_end(edicao)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self._metricas["descartados_lru"] += 1
+
+    def invalidar(self, edicao=None):
+        """Remove uma edição (ou tudo, sem argumento)"""
+        with self._lock:
+            if edicao is None:
+                self._itens.clear()
+            else:
+                self._itens.pop(edicao, None)
+
+    def metricas(self):
+        with self._lock:
+            consultas = self._metricas["acertos"] + self._metricas["acertos_negativos"] + self._metricas["falhas"]
+            acertos = self._metricas["acertos"] + self._metricas["acertos_negativos"]
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "ttl": self.ttl,
+                "ttl_negativo": self.ttl_negativo,
+                **self._metricas,
+                "taxa_acerto": round(acertos / consultas, 3) if consultas else 0.0,
+            }
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Single-flight de relatórios por edição + cache curto do resultado
+
+Pedidos simultâneos da mesma edição (webhook e botão "gerar relatório" do
+dashboard) esperam a execução que já está em andamento e recebem o mesmo
+resultado. Entre processos/containers a coordenação usa um lock de arquivo
+e um arquivo de resultado na pasta de downloads compartilhada; resultados
+recentes são servidos desse cache em vez de raspar o painel de novo.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: só coalescência dentro do processo
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+COALESCEDOR_CONFIG = {
+    'ttl': int(os.getenv('RELATORIO_CACHE_TTL', 300)),  # segundos
+}
+
+EXECUTADO = "executado"
+COALESCIDO = "coalescido"
+CACHE = "cache"
+
+
+class _EmAndamento:
+    """Execução líder de uma edição; os demais pedidos esperam o evento"""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class CoalescedorRelatorios:
+    """
+    Uso:
+        resultado, origem = coalescedor.executar(edicao, lambda: executar_relatorio(edicao).como_dict())
+    - produtor(): retorna o resultado como dict (JSON) com a chave "sucesso"
+    - origem: "executado", "coalescido" (pegou carona) ou "cache"
+    Só resultados com sucesso são cacheados; falhas podem ser repetidas na hora.
+    """
+
+    def __init__(self, pasta, ttl=None):
+        self.pasta = os.path.join(pasta, ".relatorios")
+        self.ttl = ttl if ttl is not None else COALESCEDOR_CONFIG['ttl']
+        self._lock = threading.Lock()
+        self._em_andamento = {}  # edicao -> _EmAndamento
+        self._cache = {}  # edicao -> (expira_em, resultado)
+        self._metricas = {"executados": 0, "coalescidos": 0, "cache_memoria": 0, "cache_arquivo": 0}
+
+    # -------------------- API --------------------
+    def executar(self, edicao, produtor):
+        edicao = str(edicao)
+
+        resultado = self._do_cache(edicao)
+        if resultado is not None:
+            return resultado, CACHE
+
+        with self._lock:
+            andamento = self._em_andamento.get(edicao)
+            lider = andamento is None
+            if lider:
+                andamento = self._em_andamento[edicao] = _EmAndamento()
+
+        if not lider:
+            logger.info(f"Relatório da edição {edicao} já em andamento - aguardando a mesma execução")
+            andamento.evento.wait()
+            self._metricas["coalescidos"] += 1
+            if andamento.erro is not None:
+                raise andamento.erro
+            return andamento.resultado, COALESCIDO
+
+        try:
+            andamento.resultado, origem = self._executar_lider(edicao, produtor)
+            return andamento.resultado, origem
+        except Exception as e:
+            andamento.erro = e
+            raise
+        finally:
+            with self._lock:
+                del self._em_andamento[edicao]
+            andamento.evento.set()
+
+    def invalidar(self, edicao):
+        edicao = str(edicao)
+        with self._lock:
+            self._cache.pop(edicao, None)
+        try:
+            os.remove(self._caminho_resultado(edicao))
+        except OSError:
+            pass
+
+    def em_andamento(self, edicao):
+        return str(edicao) in self._em_andamento
+
+    def metricas(self):
+        return {
+            "ttl": self.ttl,
+            "em_andamento": len(self._em_andamento),
+            "em_cache": len(self._cache),
+            **self._metricas,
+        }
+
+    # -------------------- execução líder --------------------
+    def _executar_lider(self, edicao, produtor):
+        with self._lock_arquivo(edicao):
+            # Outro processo pode ter terminado enquanto esperávamos o lock
+            resultado = self._ler_arquivo(edicao)
+            if resultado is not None:
+                self._metricas["coalescidos"] += 1
+                self._guardar_memoria(edicao, resultado)
+                logger.info(f"Relatório da edição {edicao} gerado por outro processo - reaproveitado")
+                return resultado, COALESCIDO
+
+            resultado = produtor()
+            self._metricas["executados"] += 1
+            if resultado and resultado.get("sucesso"):
+                self._guardar_memoria(edicao, resultado)
+                self._gravar_arquivo(edicao, resultado)
+            return resultado, EXECUTADO
+
+    def _lock_arquivo(self, edicao):
+        return _LockArquivo(os.path.join(self.pasta, f"relatorio-{edicao}.lock"))
+
+    # -------------------- cache --------------------
+    def _do_cache(self, edicao):
+        agora = time.time()
+        with self._lock:
+            item = self._cache.get(edicao)
+        if item and item[0] > agora and self._pdf_existe(item[1]):
+            self._metricas["cache_memoria"] += 1
+            return item[1]
+
+        resultado = self._ler_arquivo(edicao)
+        if resultado is not None:
+            self._metricas["cache_arquivo"] += 1
+            self._guardar_memoria(edicao, resultado)
+        return resultado
+
+    def _guardar_memoria(self, edicao, resultado):
+        with self._lock:
+            self._cache[edicao] = (time.time() + self.ttl, resultado)
+            # Limpeza preguiçosa dos itens vencidos
+            agora = time.time()
+            for chave in [k for k, (expira, _) in self._cache.items() if expira <= agora]:
+                del self._cache[chave]
+
+    def _caminho_resultado(self, edicao):
+        return os.path.join(self.pasta, f"relatorio-{edicao}.json")
+
+    def _ler_arquivo(self, edicao):
+        """Resultado gravado por qualquer processo, se ainda estiver no TTL e o PDF existir"""
+        try:
+            with open(self._caminho_resultado(edicao), encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if dados.get("gravado_em", 0) + self.ttl <= time.time():
+            return None
+        resultado = dados.get("resultado")
+        if not resultado or not self._pdf_existe(resultado):
+            return None
+        return resultado
+
+    def _gravar_arquivo(self, edicao, resultado):
+        arquivo = self._caminho_resultado(edicao)
+        temporario = f"{arquivo}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.pasta, exist_ok=True)
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump({"gravado_em": time.time(), "resultado": resultado}, f, default=str)
+            os.replace(temporario, arquivo)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o resultado da edição {edicao}: {e}")
+
+    @staticmethod
+    def _pdf_existe(resultado):
+        caminho = resultado.get("caminho_pdf")
+        return caminho is None or os.path.exists(caminho)
+
+
+class _LockArquivo:
+    """flock exclusivo (bloqueante) num arquivo da pasta compartilhada"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._arquivo = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return self
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        self._arquivo = open(self.caminho, "a")
+        fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._arquivo is not None:
+            fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_UN)
+            self._arquivo.close()
+            self._arquivo = None
+        return False
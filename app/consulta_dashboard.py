@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Consulta das extrações exibidas no dashboard, com a regra de visibilidade no banco
+
+Uma extração aparece se está com erro (status_rifa 'error' ou andamento 'X'),
+se ainda não chegou a 100% sem estar concluída, ou - encerrada - até 30
+minutos depois do fechamento (data_sorteio + horário da agenda de sorteios).
+Tudo isso é avaliado no MySQL, que só devolve as linhas exibidas; as
+rifas antigas já encerradas (a maior parte da tabela) nem saem do banco.
+
+A consulta é a união de duas partes que não se sobrepõem, cada uma
+coberta por um índice de migrations/001_indices_dashboard.sql:
+  - recentes: data_sorteio a partir do corte (ontem), onde o fechamento
+    + 30 min ainda pode estar no futuro - range em idx_extracoes_data_status
+  - pendentes: anteriores ao corte, só em andamento ou com erro - ranges em
+    idx_extracoes_status_andamento ('ativo', 'error' e 'concluído' + 'X')
+O horário de fechamento vem da agenda (já convertido, inclusive "h:mm AM/PM")
+como um CASE com parâmetros, sem interpretar texto de horário no SQL; a
+existência do horário continua vindo de premiacoes, como antes. Siglas com
+horário ilegível em premiacoes (já avisadas no log da agenda) continuam
+sempre visíveis quando encerradas; enquanto existirem, a parte pendentes
+também percorre as concluídas pelo índice de status.
+"""
+
+from datetime import timedelta
+
+JANELA_APOS_FECHAMENTO = timedelta(minutes=30)
+
+# andamento ('57%', '100%', 'X', vazio...) -> inteiro; o que não for número vale 0
+SQL_ANDAMENTO_NUMERICO = (
+    "CASE WHEN REPLACE(TRIM(ec.andamento), '%%', '') REGEXP '^[0-9]+$' "
+    "THEN CAST(REPLACE(TRIM(ec.andamento), '%%', '') AS UNSIGNED) ELSE 0 END"
+)
+
+_COLUNAS = f"""
+        ec.id,
+        ec.edicao,
+        ec.sigla_oficial,
+        ec.extracao,
+        ec.link,
+        ec.status_cadastro,
+        ec.status_link,
+        ec.error_msg,
+        ec.andamento,
+        ec.status_rifa,
+        ec.data_sorteio,
+        p.imagem_path,
+        {SQL_ANDAMENTO_NUMERICO} AS andamento_numerico"""
+
+# Encerrada: aparece até 30 min após o fechamento, se premiacoes tem horário para a
+# extração (sem linha ou horário vazio = não aparece) e a data do sorteio é conhecida.
+# Horário preenchido mas ilegível aparece sempre (como no cálculo antigo em Python).
+# CHAR_LENGTH e não != '': com PAD SPACE, '  ' = '' e o texto só de espaços sumiria
+SQL_ENCERRADA_VISIVEL = (
+    "(CHAR_LENGTH(p.horario) > 0 AND ec.data_sorteio IS NOT NULL AND ("
+    "{invalidas}TIMESTAMP(ec.data_sorteio, {horario}) + INTERVAL "
+    f"{int(JANELA_APOS_FECHAMENTO.total_seconds() // 60)} MINUTE >= %s))"
+)
+
+SQL_EXTRACOES_DASHBOARD = f"""
+    SELECT {_COLUNAS}
+    FROM extracoes_cadastro ec
+    LEFT JOIN premiacoes p ON ec.extracao = p.sigla
+    WHERE ec.data_sorteio >= %s
+    AND ec.status_rifa IN ('ativo', 'concluído', 'error')
+    AND ec.link != ''
+    AND (
+        ec.status_rifa = 'error'
+        OR ec.andamento = 'X'
+        OR (ec.status_rifa != 'concluído' AND {SQL_ANDAMENTO_NUMERICO} < 100)
+        OR {{encerrada_visivel}}
+    )
+    UNION ALL
+    SELECT {_COLUNAS}
+    FROM extracoes_cadastro ec
+    LEFT JOIN premiacoes p ON ec.extracao = p.sigla
+    WHERE (ec.status_rifa IN ('ativo', 'error') OR (ec.status_rifa = 'concluído' AND ec.andamento = 'X'){{status_invalidas}})
+    AND (ec.data_sorteio < %s OR ec.data_sorteio IS NULL)
+    AND ec.link != ''
+    AND (
+        ec.status_rifa = 'error'
+        OR ec.andamento = 'X'
+        OR {SQL_ANDAMENTO_NUMERICO} < 100{{antigas_invalidas}}
+    )
+    ORDER BY edicao ASC
+"""
+
+
+def data_corte(agora):
+    """
+    Primeiro dia cujo fechamento + 30 min ainda pode não ter passado
+    (horário do sorteio no fim do dia anterior, com a janela avançando sobre hoje)
+    """
+    return (agora - timedelta(days=1) - JANELA_APOS_FECHAMENTO).date()
+
+
+def _em(siglas):
+    return f"ec.extracao IN ({', '.join(['%s'] * len(siglas))})"
+
+
+def montar_consulta_extracoes(agora, horarios, siglas_horario_invalido=()):
+    """
+    SQL e parâmetros (pymysql) das extrações visíveis em `agora`
+    - agora: datetime no fuso local (o mesmo de data_sorteio e dos horários)
+    - horarios: sigla -> time (agenda_sorteios.horarios())
+    - siglas_horario_invalido: siglas com horário ilegível em premiacoes
+      (agenda_sorteios.siglas_horario_invalido()); encerradas continuam
+      aparecendo, em qualquer data
+    Extrações sem horário em premiacoes só aparecem enquanto em andamento.
+    """
+    agora = agora.replace(tzinfo=None, microsecond=0)
+    corte = data_corte(agora)
+    invalidas = sorted(siglas_horario_invalido)
+
+    parametros_horario = []
+    if horarios:
+        casos = " ".join("WHEN %s THEN CAST(%s AS TIME)" for _ in horarios)
+        horario = f"CASE ec.extracao {casos} END"
+        for sigla, hora in horarios.items():
+            parametros_horario += [sigla, hora.strftime('%H:%M:00')]
+    else:
+        horario = "NULL"
+
+    encerrada_visivel = SQL_ENCERRADA_VISIVEL.format(
+        invalidas=f"{_em(invalidas)} OR " if invalidas else "", horario=horario,
+    )
+    sql = SQL_EXTRACOES_DASHBOARD.format(
+        encerrada_visivel=encerrada_visivel,
+        status_invalidas=f" OR (ec.status_rifa = 'concluído' AND {_em(invalidas)})" if invalidas else "",
+        antigas_invalidas=(
+            f"\n        OR (CHAR_LENGTH(p.horario) > 0 AND ec.data_sorteio IS NOT NULL AND {_em(invalidas)})"
+            if invalidas else ""
+        ),
+    )
+    # Na ordem dos %s: parte recentes (corte, siglas ilegíveis, CASE, agora), depois pendentes
+    parametros = [corte, *invalidas, *parametros_horario, agora]
+    parametros += [*invalidas, corte, *invalidas]
+    return sql, parametros
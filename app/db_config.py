@@ -19,4 +19,12 @@ DB_CONFIG = {
     'port': int(os.getenv('DB_PORT', 3306)),
     'charset': os.getenv('DB_CHARSET', 'utf8mb4'),
     'autocommit': True
-} 
\ No newline at end of file
+} 
+
+# Configuração do pool de conexões
+DB_POOL_CONFIG = {
+    'min': int(os.getenv('DB_POOL_MIN', 1)),
+    'max': int(os.getenv('DB_POOL_MAX', 10)),
+    'tempo_ocioso': int(os.getenv('DB_POOL_IDLE_TIMEOUT', 300)),  # segundos
+    'tempo_espera': int(os.getenv('DB_POOL_WAIT_TIMEOUT', 10))    # segundos
+}
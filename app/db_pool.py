@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pool de conexões MySQL compartilhado pelos endpoints
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pymysql
+
+try:
+    from db_config import DB_POOL_CONFIG
+except ImportError:
+    DB_POOL_CONFIG = {'min': 1, 'max': 10, 'tempo_ocioso': 300, 'tempo_espera': 10}
+
+logger = logging.getLogger(__name__)
+
+
+class PoolEsgotado(Exception):
+    """Nenhuma conexão ficou disponível dentro do tempo de espera"""
+
+
+class PoolConexoes:
+    """
+    Pool de conexões com tamanho mínimo/máximo, verificação de saúde
+    no empréstimo, remoção de conexões ociosas e métricas de uso
+    """
+
+    def __init__(self, config, tamanho_min=1, tamanho_max=10,
+                 tempo_ocioso_max=300, tempo_espera=10, fabrica=None, erros_conexao=None):
+        self.config = dict(config)
+        self.tamanho_min = max(0, tamanho_min)
+        self.tamanho_max = max(1, tamanho_max, self.tamanho_min)
+        self.tempo_ocioso_max = tempo_ocioso_max
+        self.tempo_espera = tempo_espera
+        # Por padrão usa PyMySQL; quem usa mysql.connector passa a própria fábrica
+        self.fabrica = fabrica or pymysql.connect
+        # Erros que deixam a conexão inutilizável (descartada na devolução)
+        self.erros_conexao = erros_conexao or (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+        self._livres = deque()  # (conexao, instante_devolucao)
+        self._total = 0
+        self._cond = threading.Condition()
+        self._metricas = {
+            "criadas": 0,
+            "fechadas": 0,
+            "emprestimos": 0,
+            "reutilizadas": 0,
+            "falhas_saude": 0,
+            "removidas_ociosas": 0,
+            "esperas": 0,
+            "esgotamentos": 0,
+            "tempo_espera_total_ms": 0.0,
+        }
+
+    # -------------------- criação / descarte --------------------
+    def _criar(self):
+        conexao = self.fabrica(**self.config)
+        self._metricas["criadas"] += 1
+        return conexao
+
+    def _fechar(self, conexao):
+        try:
+            conexao.close()
+        except Exception:
+            pass
+        self._metricas["fechadas"] += 1
+
+    def _saudavel(self, conexao):
+        """Ping sem reconexão: conexão quebrada é descartada e substituída"""
+        try:
+            conexao.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _remover_ociosas(self):
+        """Fecha conexões paradas há mais que tempo_ocioso_max (mantendo o mínimo)"""
+        if not self.tempo_ocioso_max:
+            return
+        limite = time.monotonic() - self.tempo_ocioso_max
+        while self._livres and self._total > self.tamanho_min:
+            conexao, devolvida_em = self._livres[0]
+            if devolvida_em > limite:
+                break
+            self._livres.popleft()
+            self._total -= 1
+            self._metricas["removidas_ociosas"] += 1
+            self._fechar(conexao)
+
+    def preencher(self):
+        """Abre conexões até atingir o tamanho mínimo"""
+        with self._cond:
+            while self._total < self.tamanho_min:
+                try:
+                    conexao = self._criar()
+                except Exception as e:
+                    logger.warning(f"Não foi possível pré-abrir conexão do pool: {e}")
+                    break
+                self._total += 1
+                self._livres.append((conexao, time.monotonic()))
+
+    # -------------------- empréstimo / devolução --------------------
+    def emprestar(self):
+        """Retorna uma conexão saudável, criando uma nova se houver espaço"""
+        inicio = time.monotonic()
+        while True:
+            candidata = None
+            with self._cond:
+                self._remover_ociosas()
+                while not self._livres and self._total >= self.tamanho_max:
+                    restante = self.tempo_espera - (time.monotonic() - inicio)
+                    if restante <= 0:
+                        self._metricas["esgotamentos"] += 1
+                        raise PoolEsgotado(
+                            f"Pool esgotado: {self._total} conexões em uso (máximo {self.tamanho_max})"
+                        )
+                    self._metricas["esperas"] += 1
+                    self._cond.wait(restante)
+                if self._livres:
+                    candidata, _ = self._livres.pop()  # LIFO: a mais quente primeiro
+                else:
+                    self._total += 1  # reserva a vaga antes de abrir fora do lock
+
+            # Ping e abertura ficam fora do lock para não serializar os empréstimos
+            if candidata is not None:
+                if self._saudavel(candidata):
+                    with self._cond:
+                        self._metricas["reutilizadas"] += 1
+                        self._contabilizar_emprestimo(inicio)
+                    return candidata
+                with self._cond:
+                    self._metricas["falhas_saude"] += 1
+                    self._total -= 1
+                    self._fechar(candidata)
+                continue
+
+            try:
+                conexao = self._criar()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._contabilizar_emprestimo(inicio)
+            return conexao
+
+    def devolver(self, conexao, descartar=False):
+        """Devolve a conexão ao pool (ou descarta se estiver em estado duvidoso)"""
+        if not descartar:
+            try:
+                # Garante que nenhuma transação aberta vaze para o próximo uso
+                conexao.rollback()
+            except Exception:
+                descartar = True
+        with self._cond:
+            if descartar:
+                self._total -= 1
+                self._fechar(conexao)
+            else:
+                self._livres.append((conexao, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def conexao(self):
+        """
+        Uso:
+            with pool.conexao() as connection:
+                cursor = connection.cursor(DictCursor)
+        """
+        conexao = self.emprestar()
+        descartar = False
+        try:
+            yield conexao
+        except self.erros_conexao:
+            descartar = True
+            raise
+        finally:
+            self.devolver(conexao, descartar=descartar)
+
+    def _contabilizar_emprestimo(self, inicio):
+        self._metricas["emprestimos"] += 1
+        self._metricas["tempo_espera_total_ms"] += (time.monotonic() - inicio) * 1000
+
+    # -------------------- manutenção --------------------
+    def fechar_todas(self):
+        """Fecha as conexões livres (usado no shutdown)"""
+        with self._cond:
+            while self._livres:
+                conexao, _ = self._livres.popleft()
+                self._total -= 1
+                self._fechar(conexao)
+
+    def metricas(self):
+        """Retorna um retrato das métricas do pool"""
+        with self._cond:
+            self._remover_ociosas()
+            emprestimos = self._metricas["emprestimos"]
+            return {
+                "tamanho_min": self.tamanho_min,
+                "tamanho_max": self.tamanho_max,
+                "abertas": self._total,
+                "livres": len(self._livres),
+                "em_uso": self._total - len(self._livres),
+                **{k: v for k, v in self._metricas.items() if k != "tempo_espera_total_ms"},
+                "espera_media_ms": round(self._metricas["tempo_espera_total_ms"] / emprestimos, 2) if emprestimos else 0.0,
+            }
+
+
+def criar_pool_padrao(config, fabrica=None, erros_conexao=None):
+    """Cria um pool com os parâmetros definidos em DB_POOL_CONFIG"""
+    return PoolConexoes(
+        config=config,
+        tamanho_min=DB_POOL_CONFIG['min'],
+        tamanho_max=DB_POOL_CONFIG['max'],
+        tempo_ocioso_max=DB_POOL_CONFIG['tempo_ocioso'],
+        tempo_espera=DB_POOL_CONFIG['tempo_espera'],
+        fabrica=fabrica,
+        erros_conexao=erros_conexao,
+    )
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Difusão de eventos do dashboard via Server-Sent Events (SSE)
+
+Um único produtor consulta o snapshot das extrações e o status do monitor
+e envia apenas as diferenças para todos os navegadores conectados.
+"""
+
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def calcular_diferencas(anteriores, atuais, chave='edicao'):
+    """
+    Compara duas listas de extrações e retorna (adicionadas, alteradas, removidas)
+    - adicionadas/alteradas: registros completos
+    - removidas: apenas as chaves
+    """
+    antigos = {item[chave]: item for item in anteriores}
+    novos = {item[chave]: item for item in atuais}
+
+    adicionadas = [item for k, item in novos.items() if k not in antigos]
+    alteradas = [item for k, item in novos.items() if k in antigos and antigos[k] != item]
+    removidas = [k for k in antigos if k not in novos]
+    return adicionadas, alteradas, removidas
+
+
+def _campos_monitor(status):
+    """Campos do monitor que indicam mudança real (ignora minutos_desde_ultima)"""
+    if not status:
+        return None
+    return (status.get('ativo'), status.get('timestamp_ultima_atualizacao'), status.get('motivo'))
+
+
+class Assinante:
+    """Fila de eventos de um navegador conectado"""
+
+    def __init__(self, tamanho_fila=100):
+        self.fila = asyncio.Queue(maxsize=tamanho_fila)
+        self.precisa_snapshot = True  # recebe o estado completo ao conectar/ao atrasar
+
+    def entregar(self, evento):
+        if self.precisa_snapshot:
+            return  # o próximo envio será o snapshot completo
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento: descarta diffs acumulados e ressincroniza com snapshot
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            self.precisa_snapshot = True
+
+
+class DifusorEventos:
+    """
+    Produtor único com fan-out para todos os assinantes.
+    O laço só roda enquanto houver pelo menos um navegador conectado.
+    """
+
+    def __init__(self, obter_snapshot, obter_monitor, invalidar_snapshot=None,
+                 serializar=None, intervalo_extracoes=5, intervalo_monitor=10,
+                 intervalo_keepalive=15):
+        self.obter_snapshot = obter_snapshot
+        self.obter_monitor = obter_monitor
+        self.invalidar_snapshot = invalidar_snapshot
+        self.serializar = serializar
+        self.intervalo_extracoes = intervalo_extracoes
+        self.intervalo_monitor = intervalo_monitor
+        self.intervalo_keepalive = intervalo_keepalive
+
+        self._assinantes = set()
+        self._tarefa = None
+        self._loop = None
+        self._acordar = None
+
+        # Último estado difundido
+        self._etag = None
+        self._dados = None
+        self._monitor = None
+        self._ultima_consulta_monitor = 0.0
+        self._versao = 0  # versão do snapshot (SnapshotCache) já difundida
+
+    # -------------------- assinatura --------------------
+    def assinar(self):
+        """Registra um novo navegador e garante que o produtor esteja rodando"""
+        assinante = Assinante()
+        self._assinantes.add(assinante)
+        if self._tarefa is None or self._tarefa.done():
+            self._loop = asyncio.get_running_loop()
+            self._acordar = asyncio.Event()
+            self._tarefa = asyncio.create_task(self._produzir())
+        else:
+            self._acordar.set()  # envia o snapshot ao novo assinante sem esperar o intervalo
+        return assinante
+
+    def cancelar(self, assinante):
+        self._assinantes.discard(assinante)
+
+    def notificar(self):
+        """Acorda o produtor (pode ser chamado de qualquer thread, ex.: após gerar relatório)"""
+        if self._loop is not None and self._acordar is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._acordar.set)
+            except RuntimeError:
+                pass  # loop já encerrado
+
+    def metricas(self):
+        return {"assinantes": len(self._assinantes), "versao": self._versao}
+
+    # -------------------- produtor --------------------
+    async def _produzir(self):
+        logger.info("Produtor de eventos do dashboard iniciado")
+        try:
+            while self._assinantes:
+                try:
+                    await self._ciclo()
+                except Exception as e:
+                    logger.error(f"Erro no produtor de eventos: {e}")
+                self._acordar.clear()
+                try:
+                    await asyncio.wait_for(self._acordar.wait(), timeout=self.intervalo_extracoes)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            logger.info("Produtor de eventos do dashboard parado (sem assinantes)")
+
+    async def _ciclo(self):
+        agora = time.monotonic()
+        if self._monitor is None or agora - self._ultima_consulta_monitor >= self.intervalo_monitor:
+            self._ultima_consulta_monitor = agora
+            monitor = await asyncio.to_thread(self.obter_monitor)
+            if _campos_monitor(monitor) != _campos_monitor(self._monitor):
+                monitor_anterior = self._monitor
+                self._monitor = monitor
+                if monitor_anterior is not None:
+                    # Monitor gravou novos dados: força recálculo do snapshot
+                    if self.invalidar_snapshot:
+                        self.invalidar_snapshot()
+                    self._difundir('monitor', monitor)
+
+        snapshot = await asyncio.to_thread(self.obter_snapshot)
+        if snapshot.etag != self._etag:
+            dados_anteriores = self._dados
+            self._etag = snapshot.etag
+            self._dados = snapshot.dados
+            self._versao = snapshot.versao
+            if dados_anteriores is not None:
+                adicionadas, alteradas, removidas = calcular_diferencas(
+                    dados_anteriores.get('extracoes', []), snapshot.dados.get('extracoes', [])
+                )
+                self._difundir('extracoes', {
+                    "versao": self._versao,
+                    "etag": snapshot.etag,
+                    "data_recente": snapshot.dados.get('data_recente'),
+                    "data_sorteio": snapshot.dados.get('data_sorteio'),
+                    "total_ativas": snapshot.dados.get('total_ativas'),
+                    "ordem": [item['edicao'] for item in snapshot.dados.get('extracoes', [])],
+                    "adicionadas": adicionadas,
+                    "alteradas": alteradas,
+                    "removidas": removidas,
+                })
+
+        # Assinantes novos (ou atrasados) recebem o estado completo
+        for assinante in list(self._assinantes):
+            if assinante.precisa_snapshot:
+                assinante.precisa_snapshot = False
+                assinante.entregar(self._formatar('snapshot', {
+                    "versao": self._versao,
+                    "etag": self._etag,
+                    "extracoes": self._dados,
+                    "monitor": self._monitor,
+                }))
+
+    def _difundir(self, tipo, dados):
+        mensagem = self._formatar(tipo, dados)
+        for assinante in list(self._assinantes):
+            assinante.entregar(mensagem)
+
+    def _formatar(self, tipo, dados):
+        corpo = self.serializar(dados) if self.serializar else dados
+        if isinstance(corpo, bytes):
+            corpo = corpo.decode('utf-8')
+        return f"id: {self._versao}\nevent: {tipo}\ndata: {corpo}\n\n"
+
+    # -------------------- stream HTTP --------------------
+    async def stream(self, assinante, desconectado):
+        """
+        Gerador assíncrono de mensagens SSE para um assinante
+        - desconectado: corrotina que informa se o cliente fechou a conexão
+        """
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    mensagem = await asyncio.wait_for(assinante.fila.get(), timeout=self.intervalo_keepalive)
+                except asyncio.TimeoutError:
+                    if await desconectado():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield mensagem
+        finally:
+            self.cancelar(assinante)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fila de jobs de relatório do webhook
+
+A solicitação é enfileirada e recebe um ID na hora; um número fixo de
+trabalhadores (concorrência configurável) consome a fila. O estado e o
+resultado de cada job ficam disponíveis por um tempo para consulta em
+/jobs/{id}, junto com métricas de profundidade da fila e tempo de espera.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+# Configuração da fila (variáveis de ambiente)
+FILA_JOBS_CONFIG = {
+    'concorrencia': int(os.getenv('WEBHOOK_JOBS_CONCORRENCIA', 2)),
+    'max_fila': int(os.getenv('WEBHOOK_JOBS_MAX_FILA', 100)),
+    'retencao': int(os.getenv('WEBHOOK_JOBS_RETENCAO', 3600)),  # segundos
+}
+
+NA_FILA = "na_fila"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+
+# Tipos de job
+RELATORIO = "relatorio"
+LOTE = "lote"  # edicao = tupla de edições geradas numa única sessão do painel
+
+
+class FilaCheia(Exception):
+    """A fila atingiu o limite de jobs aguardando"""
+
+
+class Job:
+    """Um pedido de relatório e seu ciclo de vida"""
+
+    def __init__(self, edicao, origem=None, tipo=RELATORIO):
+        self.id = uuid.uuid4().hex
+        self.edicao = edicao
+        self.origem = origem
+        self.tipo = tipo
+        self.estado = NA_FILA
+        self.criado_em = time.time()
+        self.iniciado_em = None
+        self.finalizado_em = None
+        self.resultado = None
+        self.erro = None
+        self._concluido = asyncio.Event()
+
+    @property
+    def chave(self):
+        return (self.tipo, self.edicao)
+
+    @property
+    def finalizado(self):
+        return self.estado in (CONCLUIDO, FALHOU)
+
+    def tempo_espera(self):
+        fim = self.iniciado_em or time.time()
+        return fim - self.criado_em
+
+    def tempo_execucao(self):
+        if self.iniciado_em is None:
+            return None
+        return (self.finalizado_em or time.time()) - self.iniciado_em
+
+    def como_dict(self, incluir_resultado=True):
+        dados = {
+            "job_id": self.id,
+            "tipo": self.tipo,
+            "edicao": self.edicao,
+            "origem": self.origem,
+            "estado": self.estado,
+            "criado_em": self.criado_em,
+            "iniciado_em": self.iniciado_em,
+            "finalizado_em": self.finalizado_em,
+            "espera_s": round(self.tempo_espera(), 3),
+            "execucao_s": round(self.tempo_execucao(), 3) if self.iniciado_em else None,
+        }
+        if incluir_resultado:
+            dados["resultado"] = self.resultado
+            dados["erro"] = self.erro
+        return dados
+
+
+def _percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+class FilaJobs:
+    """
+    Fila assíncrona com trabalhadores de concorrência fixa
+    - executar(job): corrotina que roda o job e retorna um dict com "success"
+    """
+
+    def __init__(self, executar, concorrencia=None, max_fila=None, retencao=None, amostras=200):
+        self.executar = executar
+        self.concorrencia = concorrencia or FILA_JOBS_CONFIG['concorrencia']
+        self.max_fila = max_fila or FILA_JOBS_CONFIG['max_fila']
+        self.retencao = retencao or FILA_JOBS_CONFIG['retencao']
+
+        self._fila = None
+        self._trabalhadores = []
+        self._jobs = OrderedDict()  # id -> Job (ordem de criação)
+        self._ativos = {}  # (tipo, edicao) -> Job na fila/executando (um por edição)
+        self._executando = 0
+        self._esperas = deque(maxlen=amostras)
+        self._execucoes = deque(maxlen=amostras)
+        self._contadores = {"enfileirados": 0, "coalescidos": 0, "concluidos": 0, "falhas": 0, "rejeitados": 0}
+
+    # -------------------- ciclo de vida --------------------
+    async def iniciar(self):
+        if self._trabalhadores:
+            return
+        self._fila = asyncio.Queue(maxsize=self.max_fila)
+        self._trabalhadores = [
+            asyncio.create_task(self._trabalhar(i + 1), name=f"job-relatorio-{i + 1}")
+            for i in range(self.concorrencia)
+        ]
+        logger.info(f"Fila de jobs iniciada ({self.concorrencia} trabalhadores, até {self.max_fila} na fila)")
+
+    async def encerrar(self):
+        for tarefa in self._trabalhadores:
+            tarefa.cancel()
+        await asyncio.gather(*self._trabalhadores, return_exceptions=True)
+        self._trabalhadores = []
+
+    # -------------------- API --------------------
+    def enfileirar(self, edicao, origem=None, tipo=RELATORIO):
+        """
+        Cria o job e devolve na hora (levanta FilaCheia se não houver espaço)
+        Se a mesma edição (ou o mesmo lote) já está na fila ou executando, devolve esse job
+        """
+        self._limpar_antigos()
+        ativo = self.ativo(edicao, tipo)
+        if ativo is not None:
+            self._contadores["coalescidos"] += 1
+            logger.info(f"Edição {edicao} já tem o job {ativo.id} ({ativo.estado}) - pedido anexado a ele")
+            return ativo
+        job = Job(edicao, origem, tipo)
+        try:
+            self._fila.put_nowait(job)
+        except asyncio.QueueFull:
+            self._contadores["rejeitados"] += 1
+            raise FilaCheia(f"Fila de relatórios cheia ({self.max_fila} aguardando)")
+        self._jobs[job.id] = job
+        self._ativos[job.chave] = job
+        self._contadores["enfileirados"] += 1
+        logger.info(f"Job {job.id} enfileirado: edição {edicao} ({self._fila.qsize()} na fila)")
+        return job
+
+    def obter(self, job_id):
+        return self._jobs.get(job_id)
+
+    def ativo(self, edicao, tipo=RELATORIO):
+        """Job da edição que ainda está na fila ou executando (ou None)"""
+        return self._ativos.get((tipo, edicao))
+
+    async def aguardar(self, job, timeout=None):
+        """Espera o job terminar; retorna False se o timeout estourar antes"""
+        try:
+            await asyncio.wait_for(job._concluido.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def posicao(self, job):
+        """Posição do job entre os que ainda aguardam (1 = próximo)"""
+        if job.estado != NA_FILA:
+            return 0
+        aguardando = [j for j in self._jobs.values() if j.estado == NA_FILA]
+        return aguardando.index(job) + 1 if job in aguardando else 0
+
+    def metricas(self):
+        esperas = list(self._esperas)
+        execucoes = list(self._execucoes)
+        return {
+            "concorrencia": self.concorrencia,
+            "max_fila": self.max_fila,
+            "na_fila": self._fila.qsize() if self._fila else 0,
+            "executando": self._executando,
+            "jobs_retidos": len(self._jobs),
+            **self._contadores,
+            "espera_media_s": round(sum(esperas) / len(esperas), 3) if esperas else None,
+            "espera_p95_s": round(_percentil(esperas, 0.95), 3) if esperas else None,
+            "espera_max_s": round(max(esperas), 3) if esperas else None,
+            "execucao_media_s": round(sum(execucoes) / len(execucoes), 3) if execucoes else None,
+            "execucao_p95_s": round(_percentil(execucoes, 0.95), 3) if execucoes else None,
+        }
+
+    # -------------------- trabalhadores --------------------
+    async def _trabalhar(self, numero):
+        while True:
+            job = await self._fila.get()
+            job.estado = EXECUTANDO
+            job.iniciado_em = time.time()
+            self._executando += 1
+            self._esperas.append(job.tempo_espera())
+            logger.info(f"Trabalhador {numero} iniciou job {job.id} (edição {job.edicao}, esperou {job.tempo_espera():.1f}s)")
+            try:
+                resultado = await self.executar(job)
+                job.resultado = resultado
+                job.estado = CONCLUIDO if resultado and resultado.get("success") else FALHOU
+                if job.estado == FALHOU:
+                    job.erro = (resultado or {}).get("error")
+            except asyncio.CancelledError:
+                job.estado = FALHOU
+                job.erro = "Servidor encerrado durante a execução"
+                raise
+            except Exception as e:
+                logger.error(f"Erro no job {job.id}: {e}")
+                job.estado = FALHOU
+                job.erro = str(e)
+            finally:
+                job.finalizado_em = time.time()
+                self._ativos.pop(job.chave, None)
+                self._executando -= 1
+                self._execucoes.append(job.tempo_execucao())
+                self._contadores["concluidos" if job.estado == CONCLUIDO else "falhas"] += 1
+                job._concluido.set()
+                self._fila.task_done()
+                logger.info(f"Job {job.id} {job.estado} em {job.tempo_execucao():.1f}s")
+
+    def _limpar_antigos(self):
+        """Descarta jobs finalizados há mais que o tempo de retenção"""
+        limite = time.time() - self.retencao
+        for job_id in [j.id for j in self._jobs.values() if j.finalizado and j.finalizado_em < limite]:
+            del self._jobs[job_id]
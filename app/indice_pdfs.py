@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice em memória dos PDFs gerados na pasta de downloads
+
+Responde "existe PDF para a edição X?" sem montar slug nem fazer stat
+por linha. Atualizado por inotify (se inotify_simple estiver instalado),
+por uma nova varredura quando o mtime da pasta muda e pelo próprio
+gerador de relatórios via registrar().
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+logger = logging.getLogger(__name__)
+
+# relatorio-vendas-ppt-rj-edicao-6197.pdf -> 6197
+PADRAO_PDF = re.compile(r'^relatorio-vendas-.*-edicao-(\d+)\.pdf$')
+
+
+def edicao_do_arquivo(nome_arquivo):
+    """Extrai o número da edição do nome do PDF (ou None se não seguir o padrão)"""
+    match = PADRAO_PDF.match(nome_arquivo)
+    return int(match.group(1)) if match else None
+
+
+class IndicePDFs:
+    """Índice edição -> {nome_arquivo, caminho, tamanho, mtime}"""
+
+    def __init__(self, diretorio, intervalo_verificacao=2.0):
+        self.diretorio = diretorio
+        self.intervalo_verificacao = intervalo_verificacao
+        self._indice = {}
+        self._lock = threading.Lock()
+        self._mtime_pasta = None
+        self._ultima_verificacao = 0.0
+        self._observador = None
+
+    # -------------------- consulta --------------------
+    def obter(self, edicao):
+        """Retorna os dados do PDF da edição ou None"""
+        self._atualizar_se_necessario()
+        return self._indice.get(int(edicao))
+
+    def existe(self, edicao):
+        return self.obter(edicao) is not None
+
+    def listar(self):
+        self._atualizar_se_necessario()
+        return dict(self._indice)
+
+    # -------------------- atualização --------------------
+    def registrar(self, caminho):
+        """Inclui/atualiza um PDF recém-gerado (chamado pelo gerador de relatórios)"""
+        nome = os.path.basename(caminho)
+        edicao = edicao_do_arquivo(nome)
+        if edicao is None:
+            return
+        try:
+            info = os.stat(caminho)
+        except OSError:
+            self.remover(caminho)
+            return
+        with self._lock:
+            self._guardar(edicao, nome, caminho, info)
+
+    def remover(self, caminho):
+        nome = os.path.basename(caminho)
+        edicao = edicao_do_arquivo(nome)
+        with self._lock:
+            atual = self._indice.get(edicao)
+            if atual and atual['nome_arquivo'] == nome:
+                del self._indice[edicao]
+        if atual and atual['nome_arquivo'] == nome:
+            # Pode haver outro PDF da mesma edição: varre de novo na próxima consulta
+            self._mtime_pasta = None
+
+    def recarregar(self):
+        """Varre a pasta inteira e substitui o índice"""
+        novo = {}
+        try:
+            mtime_pasta = os.stat(self.diretorio).st_mtime_ns
+            with os.scandir(self.diretorio) as entradas:
+                for entrada in entradas:
+                    edicao = edicao_do_arquivo(entrada.name)
+                    if edicao is None or not entrada.is_file():
+                        continue
+                    info = entrada.stat()
+                    atual = novo.get(edicao)
+                    if atual is None or info.st_mtime > atual['mtime']:
+                        novo[edicao] = self._entrada(entrada.name, entrada.path, info)
+        except FileNotFoundError:
+            mtime_pasta = None
+        with self._lock:
+            self._indice = novo
+            self._mtime_pasta = mtime_pasta
+            self._ultima_verificacao = time.monotonic()
+        return len(novo)
+
+    def _atualizar_se_necessario(self):
+        """Fallback barato: um stat da pasta a cada intervalo; varre só se o mtime mudou"""
+        if self._observador is not None and self._mtime_pasta is not None:
+            return  # inotify mantém o índice em dia
+        agora = time.monotonic()
+        if self._mtime_pasta is not None and agora - self._ultima_verificacao < self.intervalo_verificacao:
+            return
+        try:
+            mtime_pasta = os.stat(self.diretorio).st_mtime_ns
+        except FileNotFoundError:
+            mtime_pasta = None
+        if mtime_pasta is None or mtime_pasta != self._mtime_pasta:
+            self.recarregar()
+        else:
+            self._ultima_verificacao = agora
+
+    def _guardar(self, edicao, nome, caminho, info):
+        atual = self._indice.get(edicao)
+        if atual is None or atual['nome_arquivo'] == nome or info.st_mtime >= atual['mtime']:
+            self._indice[edicao] = self._entrada(nome, caminho, info)
+
+    @staticmethod
+    def _entrada(nome, caminho, info):
+        return {
+            "nome_arquivo": nome,
+            "caminho": caminho,
+            "tamanho": info.st_size,
+            "mtime": info.st_mtime,
+        }
+
+    # -------------------- inotify --------------------
+    def iniciar_observador(self):
+        """Inicia thread de inotify; sem inotify_simple fica só o fallback por mtime"""
+        if INotify is None:
+            logger.info("inotify_simple não instalado - índice de PDFs usará verificação por mtime")
+            self.recarregar()
+            return False
+        if self._observador is not None:
+            return True
+        os.makedirs(self.diretorio, exist_ok=True)
+        # Watch registrado antes da varredura para não perder arquivos criados no meio
+        inotify = INotify()
+        mascara = (inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO |
+                   inotify_flags.DELETE | inotify_flags.MOVED_FROM)
+        inotify.add_watch(self.diretorio, mascara)
+        self.recarregar()
+        self._observador = threading.Thread(target=self._observar, args=(inotify,), name="indice-pdfs", daemon=True)
+        self._observador.start()
+        logger.info(f"Observando PDFs via inotify em {self.diretorio}")
+        return True
+
+    def _observar(self, inotify):
+        while True:
+            try:
+                for evento in inotify.read():
+                    if not evento.name.endswith('.pdf'):
+                        continue
+                    caminho = os.path.join(self.diretorio, evento.name)
+                    if evento.mask & (inotify_flags.DELETE | inotify_flags.MOVED_FROM):
+                        self.remover(caminho)
+                    else:
+                        self.registrar(caminho)
+            except Exception as e:
+                logger.error(f"Erro no observador de PDFs: {e}")
+                time.sleep(1)
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gravação em lote de relatorios_vendas
+
+As linhas são preparadas por coluna a partir do DataFrame tipado
+(leitura_csv) e entregues em tuplas, bloco a bloco, direto ao gravador.
+Em vez de um INSERT (e uma ida e volta ao MySQL remoto) por compra, as
+linhas vão em lotes de executemany (o conector reescreve em INSERT de
+várias linhas) ou, opcionalmente, por LOAD DATA LOCAL INFILE a partir de
+um arquivo temporário. Os commits são feitos a cada bloco de linhas, ou
+uma vez só por quem chama (confirmar=False): a importação de uma edição
+grava as vendas e o registro pai numa única transação.
+
+Edições já importadas são sincronizadas por delta (DeltaVendas): cada
+compra tem uma chave estável (telefone, data, horacompra) e só as chaves
+cujas linhas mudaram são regravadas, numa única transação. Compras que
+sumiram do export só são apagadas com RELATORIO_BANCO_DELTA_REMOVER.
+"""
+
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import time as hora_do_dia, timedelta
+from itertools import islice, repeat
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+INGESTAO_CONFIG = {
+    'lote': int(os.getenv('RELATORIO_BANCO_LOTE', 1000)),                # linhas por executemany
+    'commit_a_cada': int(os.getenv('RELATORIO_BANCO_COMMIT', 5000)),     # linhas por commit
+    'load_data': os.getenv('RELATORIO_BANCO_LOAD_DATA', 'false').lower() in ('1', 'true', 'sim'),
+    # Edição já importada: sincroniza por delta (false = mantém o comportamento JA_EXISTE)
+    'delta': os.getenv('RELATORIO_BANCO_DELTA', 'true').lower() in ('1', 'true', 'sim'),
+    # Apaga do banco as compras ausentes do CSV (export truncado apagaria vendas reais)
+    'delta_remover': os.getenv('RELATORIO_BANCO_DELTA_REMOVER', 'false').lower() in ('1', 'true', 'sim'),
+}
+
+COLUNAS_VENDAS = (
+    "nome", "telefone", "edicao", "extracao", "qtd", "total", "data", "horacompra",
+    "valor_cota", "aprovado_por", "host_pagamento", "numeros",
+)
+
+SQL_INSERT_VENDAS = (
+    f"INSERT INTO relatorios_vendas ({', '.join(COLUNAS_VENDAS)}) "
+    f"VALUES ({', '.join(['%s'] * len(COLUNAS_VENDAS))})"
+)
+
+SQL_SELECT_VENDAS = f"SELECT {', '.join(COLUNAS_VENDAS)} FROM relatorios_vendas WHERE edicao = %s"
+
+# <=> (igualdade que aceita NULL): data/horacompra ficam nulas em datas inválidas
+SQL_DELETE_CHAVE_VENDAS = (
+    "DELETE FROM relatorios_vendas "
+    "WHERE edicao = %s AND telefone <=> %s AND data <=> %s AND horacompra <=> %s"
+)
+
+SQL_LOAD_DATA_VENDAS = (
+    "LOAD DATA LOCAL INFILE %s INTO TABLE relatorios_vendas CHARACTER SET utf8mb4 "
+    "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+    f"({', '.join(COLUNAS_VENDAS)})"
+)
+
+
+# -------------------- preparação --------------------
+def _texto(serie):
+    """Como str(valor).strip() linha a linha (ausente vira "nan")"""
+    return serie.astype("string").fillna("nan").str.strip().to_numpy(dtype=object)
+
+
+def resumo_vendas(df):
+    """
+    (total_cotas, maior_data) do relatório; linhas sem quantidade válida
+    ficam fora das duas contas. maior_data é None se não houver data válida
+    """
+    quantidades = df["Quantidade"]
+    com_qtd = quantidades.notna()
+    total_cotas = int(np.trunc(quantidades[com_qtd]).sum())
+    maior_data = df["Data da Compra"][com_qtd].max()
+    return total_cotas, (None if pd.isna(maior_data) else maior_data.to_pydatetime())
+
+
+def linhas_vendas(df, edicao, extracao, log=None, bloco=5000):
+    """
+    Gera as tuplas de relatorios_vendas (ordem de COLUNAS_VENDAS) em ordem
+    crescente de data da compra - datas inválidas primeiro, como NULL.
+    Tudo é calculado por coluna; só cada bloco vira objetos Python.
+    """
+    momentos = df["Data da Compra"].to_numpy(dtype="datetime64[us]")
+    ordem = np.argsort(momentos.view("i8"), kind="stable")  # NaT é o menor inteiro
+    momentos = momentos[ordem]
+
+    invalidas = int(np.isnat(momentos).sum())
+    if invalidas and log is not None:
+        log.warning(f"{invalidas} registro(s) com data/hora inválida - data e horacompra ficam nulas")
+
+    nomes = _texto(df["Nome"])[ordem]
+    telefones = _texto(df["Telefone"])[ordem]
+    aprovado_por = _texto(df["Aprovado por"])[ordem]
+    host_pagamento = _texto(df["Host do Pagamento"])[ordem]
+    numeros = _texto(df["Números"])[ordem]
+    quantidades = np.trunc(df["Quantidade"].fillna(0).to_numpy(dtype=float)).astype(np.int64)[ordem]
+    totais = df["Valor"].fillna(0.0).to_numpy(dtype=float)[ordem]
+    # valor_cota = total ÷ quantidade (0 quando a quantidade não é positiva)
+    valores_cota = np.divide(totais, quantidades, out=np.zeros(len(totais)), where=quantidades > 0)
+
+    for inicio in range(0, len(ordem), bloco):
+        fatia = slice(inicio, inicio + bloco)
+        datas_hora = momentos[fatia].astype(object)  # datetime ou None (NaT)
+        yield from zip(
+            nomes[fatia], telefones[fatia], repeat(edicao), repeat(extracao),
+            quantidades[fatia].tolist(), totais[fatia].tolist(),
+            momentos[fatia].astype("datetime64[D]").tolist(),
+            [None if m is None else m.time() for m in datas_hora],
+            valores_cota[fatia].tolist(),
+            aprovado_por[fatia], host_pagamento[fatia], numeros[fatia],
+        )
+
+
+# -------------------- gravação --------------------
+def _blocos(linhas, tamanho):
+    iterador = iter(linhas)
+    while True:
+        bloco = list(islice(iterador, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
+
+def _campo_tsv(valor):
+    """Valor no formato do LOAD DATA (\\N para NULL, escapes de tab/quebra/barra)"""
+    if valor is None:
+        return "\\N"
+    texto = valor.isoformat() if hasattr(valor, "isoformat") else str(valor)
+    return texto.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class GravadorVendas:
+    """
+    Uso:
+        gravador = GravadorVendas(conn, log)
+        inseridas = gravador.gravar(linhas)   # iterável de tuplas na ordem de COLUNAS_VENDAS
+    - conn: conexão mysql.connector com autocommit desligado
+      (e allow_local_infile=True para o modo LOAD DATA)
+    """
+
+    def __init__(self, conn, log, lote=None, commit_a_cada=None, load_data=None):
+        self.conn = conn
+        self.log = log
+        self.lote = lote or INGESTAO_CONFIG['lote']
+        self.commit_a_cada = max(commit_a_cada or INGESTAO_CONFIG['commit_a_cada'], self.lote)
+        self.load_data = INGESTAO_CONFIG['load_data'] if load_data is None else load_data
+        self.segundos = 0.0
+
+    @staticmethod
+    def conexao_kwargs(load_data=None):
+        """Parâmetros extras de mysql.connector.connect para o modo escolhido"""
+        load_data = INGESTAO_CONFIG['load_data'] if load_data is None else load_data
+        return {'allow_local_infile': True} if load_data else {}
+
+    def gravar(self, linhas, confirmar=True):
+        """
+        Insere todas as linhas com commit a cada bloco; retorna o total inserido
+        - confirmar=False: não faz commit (quem chama fecha a transação)
+        """
+        inicio = time.perf_counter()
+        total = 0
+        cursor = self.conn.cursor()
+        try:
+            for bloco in _blocos(linhas, self.commit_a_cada):
+                if self.load_data:
+                    self._carregar_arquivo(cursor, bloco)
+                else:
+                    for parte in _blocos(bloco, self.lote):
+                        cursor.executemany(SQL_INSERT_VENDAS, parte)
+                if confirmar:
+                    self.conn.commit()
+                total += len(bloco)
+        finally:
+            cursor.close()
+            self.segundos = time.perf_counter() - inicio
+
+        modo = "LOAD DATA" if self.load_data else f"executemany (lotes de {self.lote})"
+        vazao = total / self.segundos if self.segundos > 0 else 0
+        self.log.info(f"{total} linhas gravadas em {self.segundos:.2f}s via {modo} ({vazao:.0f} linhas/s)")
+        return total
+
+    def _carregar_arquivo(self, cursor, bloco):
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".tsv", delete=False) as arquivo:
+            for linha in bloco:
+                arquivo.write("\t".join(_campo_tsv(valor) for valor in linha))
+                arquivo.write("\n")
+        try:
+            cursor.execute(SQL_LOAD_DATA_VENDAS, (arquivo.name,))
+        finally:
+            os.remove(arquivo.name)
+
+
+# -------------------- delta (edição já importada) --------------------
+def _hora(valor):
+    """TIME do conector (timedelta) ou do CSV (time) -> time"""
+    if isinstance(valor, timedelta):
+        segundos = int(valor.total_seconds())
+        return hora_do_dia(segundos // 3600 % 24, segundos // 60 % 60, segundos % 60)
+    return valor
+
+
+def _normalizar(linha):
+    """
+    Linha de relatorios_vendas -> (chave, valores) comparável entre banco e CSV
+    A chave estável da compra é (telefone, data, horacompra); dinheiro é
+    comparado em centavos inteiros e a quantidade como inteiro
+    """
+    nome, telefone, _, extracao, qtd, total, data, hora, valor_cota, aprovado_por, host_pagamento, numeros = linha
+    return (
+        telefone, data, _hora(hora),
+        nome, extracao, int(qtd or 0), round(float(total or 0) * 100), round(float(valor_cota or 0) * 100),
+        aprovado_por, host_pagamento, numeros,
+    )
+
+
+class DeltaVendas:
+    """
+    Diferença entre as vendas gravadas de uma edição e as do CSV atual
+    As linhas são comparadas como multiconjunto, então compras repetidas
+    na mesma chave (mesmo telefone no mesmo segundo) são casadas pelo
+    conteúdo, não pela posição. Uma chave com qualquer diferença é
+    regravada inteira: apaga as linhas antigas da chave e insere as atuais -
+    a escrita é proporcional ao delta.
+    Sem remover, compras antigas sem par no CSV ficam no banco: a chave que
+    sumiu do export não é tocada e, numa chave regravada, essas linhas são
+    inseridas de volta junto com as atuais.
+    - existentes: iterável de tuplas lidas do banco; atuais: lista de tuplas do CSV
+    - remover: apaga as compras que sumiram do export (padrão: INGESTAO_CONFIG['delta_remover'])
+    - inseridas: compras novas; atualizadas: compras que mudaram;
+      removidas: compras apagadas por terem sumido do export;
+      mantidas: compras que sumiram do export mas ficaram no banco (sem remover)
+    """
+
+    def __init__(self, existentes, atuais, remover=None):
+        self.remover = INGESTAO_CONFIG['delta_remover'] if remover is None else remover
+        existentes = list(existentes)
+        normalizadas_banco = list(map(_normalizar, existentes))
+        banco = Counter(normalizadas_banco)
+        normalizadas = list(map(_normalizar, atuais))
+        csv = Counter(normalizadas)
+
+        # Linhas sem par idêntico do outro lado, contadas por chave
+        # (diferença de items() é feita em C: só as linhas divergentes passam pelo laço)
+        sem_par = Counter()
+        for linha, quantas in banco.items() - csv.items():
+            sem_par[linha] = max(quantas - csv.get(linha, 0), 0)
+        sobra_antigas = Counter()
+        for linha, quantas in sem_par.items():
+            sobra_antigas[linha[:3]] += quantas
+        sobra_novas = Counter()
+        for linha, quantas in csv.items() - banco.items():
+            sobra_novas[linha[:3]] += max(quantas - banco.get(linha, 0), 0)
+        sobra_antigas, sobra_novas = +sobra_antigas, +sobra_novas  # descarta zeros
+        alteradas = sobra_antigas.keys() | sobra_novas.keys()
+
+        self.inseridas = self.atualizadas = self.removidas = self.mantidas = 0
+        ausentes = Counter()
+        for chave in alteradas:
+            pares = min(sobra_antigas[chave], sobra_novas[chave])
+            self.atualizadas += pares
+            self.inseridas += sobra_novas[chave] - pares
+            ausentes[chave] = sobra_antigas[chave] - pares
+        ausentes = +ausentes
+
+        if self.remover:
+            self.removidas = sum(ausentes.values())
+            regravar, manter = alteradas, {}
+        else:
+            self.mantidas = sum(ausentes.values())
+            regravar = {chave for chave in alteradas if sobra_novas[chave]}
+            manter = {chave: quantas for chave, quantas in ausentes.items() if chave in regravar}
+
+        chaves_banco = {linha[:3] for linha in banco}
+        self.chaves_apagar = [chave for chave in regravar if chave in chaves_banco]
+        self.linhas_novas = [linha for linha, n in zip(atuais, normalizadas) if n[:3] in regravar]
+        if manter:
+            # Linhas antigas sem par nas chaves regravadas voltam como estavam
+            for linha, n in zip(existentes, normalizadas_banco):
+                if manter.get(n[:3]) and sem_par[n]:
+                    manter[n[:3]] -= 1
+                    sem_par[n] -= 1
+                    self.linhas_novas.append(linha)
+
+    @property
+    def vazio(self):
+        return not self.chaves_apagar and not self.linhas_novas
+
+    def resumo(self):
+        if self.remover:
+            return f"{self.inseridas} nova(s), {self.atualizadas} alterada(s), {self.removidas} removida(s)"
+        return f"{self.inseridas} nova(s), {self.atualizadas} alterada(s), {self.mantidas} ausente(s) do export mantida(s)"
+
+
+def ler_vendas(conn, edicao, bloco=5000):
+    """Vendas já gravadas da edição (tuplas na ordem de COLUNAS_VENDAS)"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SQL_SELECT_VENDAS, (edicao,))
+        while True:
+            linhas = cursor.fetchmany(bloco)
+            if not linhas:
+                return
+            yield from linhas
+    finally:
+        cursor.close()
+
+
+def aplicar_delta(conn, delta, edicao, log):
+    """
+    Apaga as chaves alteradas (e as removidas, com delta.remover) e insere
+    as linhas atuais delas, sem commit (a transação é fechada por quem chama)
+    """
+    cursor = conn.cursor()
+    try:
+        if delta.chaves_apagar:
+            cursor.executemany(
+                SQL_DELETE_CHAVE_VENDAS,
+                [(edicao, telefone, data, hora) for telefone, data, hora in delta.chaves_apagar],
+            )
+    finally:
+        cursor.close()
+    if delta.linhas_novas:
+        GravadorVendas(conn, log).gravar(delta.linhas_novas, confirmar=False)
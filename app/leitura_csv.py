@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura tipada do CSV do Relatório de Vendas (uma vez por execução)
+
+Lê só as colunas usadas pelo PDF e pelo banco, já com os tipos certos:
+categorias para "Aprovado por"/"Host do Pagamento", datetime para
+"Data da Compra" e números para "Quantidade"/"Valor". O mesmo DataFrame
+é compartilhado entre a etapa do PDF e a do banco. Com pyarrow instalado
+o parse usa o motor multithread do Arrow; sem ele, o motor C do pandas.
+"""
+
+import logging
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - só para saber se o motor está disponível
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# Motor de parse: "pyarrow" (padrão quando instalado) ou "c"
+CSV_ENGINE = os.getenv('RELATORIO_CSV_ENGINE', 'pyarrow' if pyarrow is not None else 'c')
+
+FORMATO_DATA_COMPRA = "%d/%m/%Y, %H:%M:%S"
+
+COLUNAS_TEXTO = ["Nome", "Telefone", "Números"]
+COLUNAS_CATEGORIA = ["Aprovado por", "Host do Pagamento"]
+COLUNAS_RELATORIO = COLUNAS_TEXTO + ["Quantidade", "Valor", "Data da Compra"] + COLUNAS_CATEGORIA
+
+
+def converter_data_compra(textos):
+    """
+    "dd/mm/aaaa, hh:mm:ss" -> datetime (NaT quando inválido)
+    O layout fixo do painel é reordenado para ISO ("aaaa-mm-dd hh:mm:ss"),
+    que o pandas converte em lote; to_datetime com o formato brasileiro
+    cai no strptime linha a linha. O que não casar com o layout fixo passa
+    pelo parse estrito com o formato completo.
+    """
+    textos = textos.str.strip()
+    layout = (
+        (textos.str.len() == 20)
+        & (textos.str[2] == "/") & (textos.str[5] == "/") & (textos.str[10:12] == ", ")
+    )
+    iso = textos.str[6:10] + "-" + textos.str[3:5] + "-" + textos.str[:2] + " " + textos.str[12:]
+    resultado = pd.to_datetime(iso.where(layout), format="%Y-%m-%d %H:%M:%S", errors="coerce")
+
+    restantes = resultado.isna() & textos.notna()
+    if restantes.any():
+        resultado[restantes] = pd.to_datetime(textos[restantes], format=FORMATO_DATA_COMPRA, errors="coerce")
+    return resultado
+
+
+def _motor():
+    if CSV_ENGINE == 'pyarrow' and pyarrow is None:
+        logger.warning("RELATORIO_CSV_ENGINE=pyarrow mas pyarrow não está instalado - usando o motor C")
+        return 'c'
+    return CSV_ENGINE
+
+
+def carregar_relatorio_vendas(caminho_csv):
+    """
+    Lê o CSV exportado pelo painel com as colunas e tipos do relatório
+    - Quantidade/Valor: numéricos (NaN quando inválidos; Valor aceita vírgula decimal)
+    - Data da Compra: datetime (NaT quando fora do formato "dd/mm/aaaa, hh:mm:ss")
+    - Aprovado por/Host do Pagamento: category
+    - Nome/Telefone/Números: texto como veio no arquivo
+    """
+    # Tudo como texto no parse; a conversão abaixo é vetorizada e tolerante
+    df = pd.read_csv(
+        caminho_csv,
+        sep=';',
+        encoding='utf-8',
+        usecols=COLUNAS_RELATORIO,
+        dtype=str,
+        engine=_motor(),
+    )
+    df = df[COLUNAS_RELATORIO]
+
+    df["Quantidade"] = pd.to_numeric(df["Quantidade"].str.strip(), errors="coerce")
+    df["Valor"] = pd.to_numeric(df["Valor"].str.strip().str.replace(",", ".", regex=False), errors="coerce")
+    df["Data da Compra"] = converter_data_compra(df["Data da Compra"])
+    for coluna in COLUNAS_CATEGORIA:
+        df[coluna] = df[coluna].astype("category")
+    return df
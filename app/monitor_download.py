@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detecção do CSV baixado pelo Chrome por evento (inotify) em pasta exclusiva do job
+
+O Chrome grava o download como <nome>.crdownload e renomeia ao concluir;
+observando IN_MOVED_TO / IN_CLOSE_WRITE numa pasta vazia criada para o job,
+o CSV é entregue assim que fica completo, sem varrer a pasta de downloads.
+Sem inotify_simple, cai para uma verificação da pasta do job a cada 100 ms.
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+from navegador_pool import definir_pasta_download
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_VERIFICACAO = 0.1  # fallback sem inotify
+
+
+def download_completo(nome):
+    """CSV final (o parcial do Chrome termina em .crdownload)"""
+    return nome.lower().endswith('.csv') and not nome.startswith('.')
+
+
+class MonitorDownload:
+    """
+    Uso:
+        monitor = MonitorDownload(navegador, CAMINHO_DOWNLOADS, edicao)
+        monitor.iniciar()          # antes do clique que dispara o download
+        ...                        # clique
+        caminho = monitor.aguardar(timeout=20)
+        monitor.encerrar()
+    """
+
+    def __init__(self, navegador, caminho_downloads, identificador):
+        self.navegador = navegador
+        self.caminho_downloads = caminho_downloads
+        self.pasta_job = os.path.join(caminho_downloads, f".download-{identificador}-{os.getpid()}-{threading.get_ident()}")
+        self._inotify = None
+
+    def iniciar(self):
+        """Cria a pasta do job, registra o watch e aponta os downloads do Chrome para ela"""
+        shutil.rmtree(self.pasta_job, ignore_errors=True)
+        os.makedirs(self.pasta_job, exist_ok=True)
+        if INotify is not None:
+            # Watch registrado antes de redirecionar o download para não perder o evento
+            self._inotify = INotify()
+            self._inotify.add_watch(self.pasta_job, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+        definir_pasta_download(self.navegador, self.pasta_job)
+
+    def aguardar(self, timeout=20, ao_atrasar=None, atraso=None):
+        """
+        Bloqueia até o CSV completo aparecer na pasta do job e o move para a pasta de downloads
+        - ao_atrasar: callback chamado uma vez após `atraso` segundos (ex.: forçar download via JS)
+        Retorna o caminho final do CSV ou None no timeout
+        """
+        inicio = time.monotonic()
+        limite = inicio + timeout
+        atrasou = False
+        nome = self._procurar()  # download pode ter terminado antes de começarmos a esperar
+        while nome is None:
+            agora = time.monotonic()
+            if agora >= limite:
+                return None
+            espera = limite - agora
+            if ao_atrasar and not atrasou and atraso is not None:
+                if agora - inicio >= atraso:
+                    atrasou = True
+                    ao_atrasar()
+                else:
+                    espera = min(espera, inicio + atraso - agora)
+            nome = self._esperar_evento(espera)
+
+        logger.info(f"Download concluído em {time.monotonic() - inicio:.2f}s: {nome}")
+        destino = os.path.join(self.caminho_downloads, nome)
+        os.replace(os.path.join(self.pasta_job, nome), destino)
+        return destino
+
+    def encerrar(self):
+        """Fecha o watch e remove a pasta do job (restos de downloads parciais)"""
+        if self._inotify is not None:
+            try:
+                self._inotify.close()
+            except OSError:
+                pass
+            self._inotify = None
+        shutil.rmtree(self.pasta_job, ignore_errors=True)
+
+    def _esperar_evento(self, segundos):
+        if self._inotify is None:
+            time.sleep(min(segundos, INTERVALO_VERIFICACAO))
+            return self._procurar()
+        for evento in self._inotify.read(timeout=max(1, int(segundos * 1000))):
+            if download_completo(evento.name):
+                return evento.name
+        return None
+
+    def _procurar(self):
+        try:
+            with os.scandir(self.pasta_job) as entradas:
+                for entrada in entradas:
+                    if download_completo(entrada.name) and entrada.is_file():
+                        return entrada.name
+        except FileNotFoundError:
+            pass
+        return None
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Criação do Chrome headless e pool de navegadores pré-aquecidos
+
+Cada trabalhador é um Chrome já aberto (e autenticado, se houver callback
+de login) que os jobs de relatório emprestam e devolvem. Trabalhadores são
+reciclados após N jobs, quando a memória cresce demais ou quando falham
+na verificação de saúde.
+"""
+
+import glob
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_CHROMEDRIVER = os.getenv('CHROMEDRIVER_PATH', "/usr/local/bin/chromedriver")
+
+# Configuração do pool (variáveis de ambiente)
+NAVEGADOR_POOL_CONFIG = {
+    'tamanho': int(os.getenv('NAVEGADOR_POOL_TAMANHO', 1)),
+    'max_jobs': int(os.getenv('NAVEGADOR_MAX_JOBS', 20)),
+    'max_memoria_mb': int(os.getenv('NAVEGADOR_MAX_MEMORIA_MB', 1500)),
+    'tempo_espera': int(os.getenv('NAVEGADOR_TEMPO_ESPERA', 300)),  # segundos
+}
+
+
+class PoolNavegadoresEsgotado(Exception):
+    """Nenhum navegador ficou livre dentro do tempo de espera"""
+
+
+# -------------------- CRIAÇÃO DO CHROME --------------------
+def criar_opcoes_chrome(caminho_downloads, pasta_perfil=None):
+    """Opções do Chrome headless usadas pelo relatório (Docker/Coolify)"""
+    chrome_opts = Options()
+    chrome_opts.add_argument("--headless=new")
+    chrome_opts.add_argument("--disable-gpu")
+    chrome_opts.add_argument("--no-sandbox")
+    chrome_opts.add_argument("--disable-dev-shm-usage")
+    chrome_opts.add_argument("--window-size=1920,1080")
+
+    # Configurações específicas para download no Selenium Grid
+    chrome_opts.add_argument(f"--download.default_directory={caminho_downloads}")
+    chrome_opts.add_argument("--download.prompt_for_download=false")
+    chrome_opts.add_argument("--download.directory_upgrade=true")
+    chrome_opts.add_argument("--safebrowsing.enabled=false")
+
+    # Configurações adicionais para robustez
+    chrome_opts.add_argument("--disable-web-security")
+    chrome_opts.add_argument("--allow-running-insecure-content")
+    chrome_opts.add_argument("--disable-features=VizDisplayCompositor")
+    chrome_opts.add_argument("--disable-extensions")
+    chrome_opts.add_argument("--disable-plugins")
+    chrome_opts.add_argument("--disable-images")
+
+    if pasta_perfil:
+        chrome_opts.add_argument(f"--user-data-dir={pasta_perfil}")
+
+    chrome_opts.add_experimental_option("excludeSwitches", ["enable-logging"])
+    chrome_opts.add_experimental_option("useAutomationExtension", False)
+    chrome_opts.add_experimental_option("prefs", {
+        "download.default_directory": caminho_downloads,
+        "download.prompt_for_download": False,
+        "download.directory_upgrade": True,
+        "safebrowsing.enabled": False,
+        "profile.default_content_setting_values.automatic_downloads": 1
+    })
+    return chrome_opts
+
+
+def criar_navegador(caminho_downloads, pasta_perfil=None):
+    """
+    Inicia o Chrome headless
+    - Estratégia 1: ChromeDriver local (como no monitorAndamento.py)
+    - Estratégia 2: webdriver-manager como fallback
+    """
+    chrome_opts = criar_opcoes_chrome(caminho_downloads, pasta_perfil)
+    try:
+        service = Service(CAMINHO_CHROMEDRIVER)
+        navegador = webdriver.Chrome(service=service, options=chrome_opts)
+        logger.info("ChromeDriver local funcionando")
+        return navegador
+    except Exception as e:
+        logger.warning(f"Erro ao conectar com ChromeDriver local: {e} - tentando webdriver-manager")
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    service = Service(ChromeDriverManager().install())
+    navegador = webdriver.Chrome(service=service, options=chrome_opts)
+    logger.info("ChromeDriver via webdriver-manager funcionando")
+    return navegador
+
+
+def definir_pasta_download(navegador, pasta):
+    """Redireciona os downloads de um Chrome já aberto (via DevTools)"""
+    os.makedirs(pasta, exist_ok=True)
+    navegador.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "allow", "downloadPath": pasta})
+
+
+def memoria_navegador_mb(navegador):
+    """Soma o RSS do chromedriver e de todos os processos filhos (Chrome); None se indisponível"""
+    try:
+        pid_raiz = navegador.service.process.pid
+    except Exception:
+        return None
+
+    total_kb = 0
+    pendentes = [pid_raiz]
+    try:
+        while pendentes:
+            pid = pendentes.pop()
+            with open(f"/proc/{pid}/status") as f:
+                for linha in f:
+                    if linha.startswith("VmRSS:"):
+                        total_kb += int(linha.split()[1])
+                        break
+            for arquivo in glob.glob(f"/proc/{pid}/task/*/children"):
+                with open(arquivo) as f:
+                    pendentes.extend(int(p) for p in f.read().split())
+    except (OSError, ValueError):
+        if total_kb == 0:
+            return None
+    return total_kb / 1024
+
+
+# -------------------- POOL --------------------
+class TrabalhadorNavegador:
+    """Um Chrome do pool e seus contadores"""
+
+    def __init__(self, identificador, navegador):
+        self.identificador = identificador
+        self.navegador = navegador
+        self.jobs = 0
+        self.criado_em = time.monotonic()
+
+
+class PoolNavegadores:
+    """
+    Pool de navegadores de tamanho fixo
+    - autenticar(navegador): chamado ao criar cada trabalhador (login no painel)
+    - Reciclagem após max_jobs, acima de max_memoria_mb ou quando falha
+    """
+
+    def __init__(self, caminho_downloads, tamanho=None, max_jobs=None, max_memoria_mb=None,
+                 tempo_espera=None, autenticar=None, fabrica=None, pasta_perfis=None):
+        self.caminho_downloads = caminho_downloads
+        self.tamanho = tamanho or NAVEGADOR_POOL_CONFIG['tamanho']
+        self.max_jobs = max_jobs or NAVEGADOR_POOL_CONFIG['max_jobs']
+        self.max_memoria_mb = max_memoria_mb or NAVEGADOR_POOL_CONFIG['max_memoria_mb']
+        self.tempo_espera = tempo_espera or NAVEGADOR_POOL_CONFIG['tempo_espera']
+        self.autenticar = autenticar
+        self.fabrica = fabrica or criar_navegador
+        self.pasta_perfis = pasta_perfis
+
+        self._livres = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._total = 0
+        self._proximo_id = 1
+        self._encerrado = False
+        self._metricas = {
+            "criados": 0,
+            "reciclados_jobs": 0,
+            "reciclados_memoria": 0,
+            "reciclados_falha": 0,
+            "emprestimos": 0,
+        }
+
+    # -------------------- ciclo de vida do trabalhador --------------------
+    def _criar_trabalhador(self):
+        with self._lock:
+            identificador = self._proximo_id
+            self._proximo_id += 1
+        pasta_perfil = os.path.join(self.pasta_perfis, f"navegador-{identificador}") if self.pasta_perfis else None
+        if pasta_perfil:
+            navegador = self.fabrica(self.caminho_downloads, pasta_perfil=pasta_perfil)
+        else:
+            navegador = self.fabrica(self.caminho_downloads)
+        try:
+            if self.autenticar:
+                self.autenticar(navegador)
+        except Exception:
+            self._fechar_navegador(navegador)
+            raise
+        self._metricas["criados"] += 1
+        logger.info(f"Navegador {identificador} pronto no pool")
+        return TrabalhadorNavegador(identificador, navegador)
+
+    @staticmethod
+    def _fechar_navegador(navegador):
+        try:
+            navegador.quit()
+        except Exception:
+            pass
+
+    def _saudavel(self, trabalhador):
+        try:
+            trabalhador.navegador.execute_script("return 1")
+            return bool(trabalhador.navegador.window_handles)
+        except Exception:
+            return False
+
+    def _descartar(self, trabalhador, motivo):
+        logger.info(f"Reciclando navegador {trabalhador.identificador} ({motivo}, {trabalhador.jobs} jobs)")
+        self._fechar_navegador(trabalhador.navegador)
+        with self._lock:
+            self._total -= 1
+
+    # -------------------- API --------------------
+    def iniciar(self):
+        """Pré-lança (e autentica) todos os navegadores do pool"""
+        while True:
+            with self._lock:
+                if self._total >= self.tamanho:
+                    break
+                self._total += 1
+            try:
+                self._livres.put(self._criar_trabalhador())
+            except Exception as e:
+                with self._lock:
+                    self._total -= 1
+                logger.error(f"Falha ao pré-lançar navegador do pool: {e}")
+                break
+
+    def emprestar(self):
+        """Retorna um trabalhador saudável (cria/recicla se necessário)"""
+        limite = time.monotonic() + self.tempo_espera
+        while True:
+            try:
+                trabalhador = self._livres.get_nowait()
+            except queue.Empty:
+                trabalhador = None
+                criar = False
+                with self._lock:
+                    if self._total < self.tamanho:
+                        self._total += 1
+                        criar = True
+                if criar:
+                    try:
+                        trabalhador = self._criar_trabalhador()
+                    except Exception:
+                        with self._lock:
+                            self._total -= 1
+                        raise
+                else:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        raise PoolNavegadoresEsgotado(f"Nenhum navegador livre em {self.tempo_espera}s")
+                    try:
+                        trabalhador = self._livres.get(timeout=restante)
+                    except queue.Empty:
+                        continue
+
+            if self._saudavel(trabalhador):
+                self._metricas["emprestimos"] += 1
+                return trabalhador
+            self._metricas["reciclados_falha"] += 1
+            self._descartar(trabalhador, "falha na verificação de saúde")
+
+    def devolver(self, trabalhador, falhou=False):
+        """Devolve o trabalhador; recicla se atingiu limites ou se o job falhou"""
+        trabalhador.jobs += 1
+        motivo = None
+        if self._encerrado:
+            motivo = "pool encerrado"
+        elif falhou:
+            motivo = "falha no job"
+            self._metricas["reciclados_falha"] += 1
+        elif trabalhador.jobs >= self.max_jobs:
+            motivo = "limite de jobs"
+            self._metricas["reciclados_jobs"] += 1
+        else:
+            memoria = memoria_navegador_mb(trabalhador.navegador)
+            if memoria is not None and memoria > self.max_memoria_mb:
+                motivo = f"memória {memoria:.0f} MB"
+                self._metricas["reciclados_memoria"] += 1
+
+        if motivo:
+            self._descartar(trabalhador, motivo)
+        else:
+            self._livres.put(trabalhador)
+
+    @contextmanager
+    def navegador(self):
+        """
+        Uso:
+            with pool.navegador() as navegador:
+                ...
+        """
+        trabalhador = self.emprestar()
+        falhou = False
+        try:
+            yield trabalhador.navegador
+        except Exception:
+            falhou = True
+            raise
+        finally:
+            self.devolver(trabalhador, falhou=falhou)
+
+    def encerrar(self):
+        """Fecha todos os navegadores livres"""
+        self._encerrado = True
+        while True:
+            try:
+                trabalhador = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            self._descartar(trabalhador, "pool encerrado")
+
+    def metricas(self):
+        return {
+            "tamanho": self.tamanho,
+            "abertos": self._total,
+            "livres": self._livres.qsize(),
+            "max_jobs": self.max_jobs,
+            "max_memoria_mb": self.max_memoria_mb,
+            **self._metricas,
+        }
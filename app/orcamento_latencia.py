@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orçamento de latência por etapa de uma execução de relatório
+
+Mede o tempo real de cada etapa e compara com o orçamento esperado,
+para que o tempo total reflita a resposta do painel e não esperas fixas.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class OrcamentoLatencia:
+    """Cronometra etapas nomeadas e gera o relatório orçado x realizado"""
+
+    def __init__(self, orcamentos=None):
+        self.orcamentos = dict(orcamentos or {})
+        self.etapas = []  # (nome, segundos)
+        self.inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nome, time.perf_counter() - inicio)
+
+    def registrar(self, nome, segundos):
+        """Registra uma etapa cronometrada por fora (ex.: blocos try longos)"""
+        self.etapas.append((nome, segundos))
+
+    def total(self):
+        return time.perf_counter() - self.inicio
+
+    def estouros(self):
+        """Etapas que passaram do orçamento"""
+        return [
+            (nome, segundos, self.orcamentos[nome])
+            for nome, segundos in self.etapas
+            if nome in self.orcamentos and segundos > self.orcamentos[nome]
+        ]
+
+    def como_dict(self):
+        return {
+            "total_s": round(self.total(), 3),
+            "etapas": [
+                {
+                    "etapa": nome,
+                    "segundos": round(segundos, 3),
+                    "orcamento_s": self.orcamentos.get(nome),
+                    "estourou": nome in self.orcamentos and segundos > self.orcamentos[nome],
+                }
+                for nome, segundos in self.etapas
+            ],
+        }
+
+    def linhas_relatorio(self):
+        """Linhas prontas para log: etapa, realizado, orçamento e status"""
+        linhas = ["ORCAMENTO DE LATENCIA (realizado / orcado):"]
+        for nome, segundos in self.etapas:
+            orcado = self.orcamentos.get(nome)
+            if orcado is None:
+                linhas.append(f"   - {nome:<18} {segundos:7.2f}s")
+            else:
+                status = "ESTOUROU" if segundos > orcado else "ok"
+                linhas.append(f"   - {nome:<18} {segundos:7.2f}s / {orcado:5.1f}s  {status}")
+        linhas.append(f"   = total              {self.total():7.2f}s")
+        return linhas
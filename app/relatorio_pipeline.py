@@ -0,0 +1,1238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline do relatório de vendas como API importável
+
+Etapas: baixar CSV do painel -> transformar -> gerar PDF -> inserir no banco.
+Os servidores chamam executar_relatorio() no próprio processo (ou com um
+navegador emprestado do pool) e recebem um ResultadoRelatorio estruturado,
+sem subir um interpretador novo nem procurar "PDF gerado:" no stdout.
+O relatorio_v2_vps.py continua existindo como CLI fino sobre este módulo.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import mysql.connector
+import numpy as np
+import pandas as pd
+import unidecode
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+try:
+    from db_config import DB_CONFIG
+except ImportError:
+    # Fallback para configuração direta se não conseguir importar
+    DB_CONFIG = {
+        'host': os.getenv('DB_HOST', 'pma.linksystems.com.br'),
+        'user': os.getenv('DB_USER', 'adseg'),
+        'password': os.getenv('DB_PASSWORD', 'Define@4536#8521'),
+        'database': os.getenv('DB_NAME', 'litoral'),
+        'port': int(os.getenv('DB_PORT', 3306)),
+        'charset': os.getenv('DB_CHARSET', 'utf8mb4'),
+        'autocommit': True,
+        'raise_on_warnings': True
+    }
+
+from navegador_pool import PoolNavegadores, criar_navegador
+from sessao_painel import carregar_sessao, salvar_sessao, restaurar_sessao, descartar_sessao
+from orcamento_latencia import OrcamentoLatencia
+from monitor_download import MonitorDownload
+from leitura_csv import carregar_relatorio_vendas
+from renderizadores_pdf import obter_renderizador
+from agenda_sorteios import agenda_sorteios
+from cache_artefatos import CACHE_ARTEFATOS_CONFIG, CacheArtefatos, chave_artefato
+from ingestao_vendas import (
+    INGESTAO_CONFIG, DeltaVendas, GravadorVendas, aplicar_delta, ler_vendas, linhas_vendas, resumo_vendas,
+)
+
+# =============================================================================
+# Configurações de Login (seguindo padrão MIGRACAO_ENV_CONSOLIDADO)
+# =============================================================================
+LOGIN_CONFIG = {
+    "url": os.getenv("LOGIN_URL", "https://painel.litoraldasorte.com"),
+    "email": os.getenv("LOGIN_EMAIL"),
+    "password": os.getenv("LOGIN_PASSWORD")
+}
+
+# =============================================================================
+# Configurações de Caminhos para Docker
+# =============================================================================
+CAMINHO_DOWNLOADS = os.getenv('DOWNLOAD_PATH', os.path.join(os.getcwd(), "downloads"))
+CAMINHO_LOGS = "/app/logs"
+
+# =============================================================================
+# Esperas por condição (tempo limite de cada etapa, em segundos)
+# =============================================================================
+TEMPOS_LIMITE = {
+    "pagina_login": 15,
+    "pos_login": 20,
+    "popup": 5,
+    "overlays": 3,
+    "menu": 10,
+    "pagina_sorteios": 15,
+    "resultado_busca": 15,
+    "dom_estavel": 5,
+    "relatorio_vendas": 10,
+    "titulo": 5,
+}
+INTERVALO_ESPERA = 0.1  # polling das condições (o padrão do Selenium é 0.5s)
+TEMPO_LIMITE_DOWNLOAD = 20
+
+# Orçamento de latência esperado por etapa (relatado ao final da execução)
+ORCAMENTO_ETAPAS = {
+    "navegador": 5,
+    "sessao": 12,
+    "busca": 6,
+    "relatorio_vendas": 5,
+    "download": 10,
+    "cache_pdf": 1,
+    "processamento": 5,
+    "pdf": 5,
+    "banco": 10,
+}
+
+XPATH_CAMPO_BUSCA = "//input[@placeholder='Pesquisar por título do sorteio...']"
+XPATH_POPUP_ENTENDI = "//button[normalize-space(text())='Entendi']"
+XPATH_MENU_SORTEIOS = '//*[@id="root"]/div/div/div/div/div/div/div[1]/div[2]/div/div/div/div[2]/ul[1]/div[2]/div[2]/span'
+
+
+class ErroRelatorio(Exception):
+    """Falha em uma etapa do pipeline (etapa fica registrada no resultado)"""
+
+    def __init__(self, mensagem, etapa=None):
+        super().__init__(mensagem)
+        self.etapa = etapa
+
+
+class EdicaoNaoEncontrada(ErroRelatorio):
+    """A busca do painel não retornou a edição"""
+
+
+# -------------------- CONFIGURAÇÃO DE LOGS --------------------
+_logs_configurados = False
+_lock_logs = threading.Lock()
+
+
+def configurar_logs():
+    """
+    Configura (uma vez por processo) os logs detalhado e geral
+    A edição entra no formato via LoggerAdapter, então várias execuções
+    no mesmo processo compartilham os handlers
+    """
+    global _logs_configurados
+    log_detalhado = logging.getLogger('relatorio_v2_vps')
+    log_geral = logging.getLogger('logs_geral')
+    with _lock_logs:
+        if _logs_configurados:
+            return log_detalhado, log_geral
+        os.makedirs(CAMINHO_LOGS, exist_ok=True)
+
+        log_detalhado.setLevel(logging.DEBUG)
+        handler_detalhado = logging.FileHandler(
+            os.path.join(CAMINHO_LOGS, 'relatorio_v2_vps.log'),
+            encoding='utf-8'
+        )
+        handler_detalhado.setFormatter(logging.Formatter(
+            '%(asctime)s - [EDICAO %(edicao)s] - %(levelname)s - %(message)s'
+        ))
+        log_detalhado.addHandler(handler_detalhado)
+
+        # Log geral apenas para erros (seguindo padrão existente)
+        log_geral.setLevel(logging.ERROR)
+        handler_geral = logging.FileHandler(
+            os.path.join(CAMINHO_LOGS, 'logs_geral.log'),
+            encoding='utf-8'
+        )
+        handler_geral.setFormatter(logging.Formatter(
+            '%(asctime)s - [RELATORIO_V2_VPS] - [EDICAO %(edicao)s] - ERROR - %(message)s'
+        ))
+        log_geral.addHandler(handler_geral)
+        _logs_configurados = True
+    return log_detalhado, log_geral
+
+
+class LogRelatorio:
+    """log_info / log_warning / log_error de uma edição (ecoar=True imprime no console, como no CLI)"""
+
+    def __init__(self, edicao, ecoar=False):
+        log_detalhado, log_geral = configurar_logs()
+        self.detalhado = logging.LoggerAdapter(log_detalhado, {"edicao": edicao})
+        self.geral = logging.LoggerAdapter(log_geral, {"edicao": edicao})
+        self.ecoar = ecoar
+
+    def info(self, mensagem):
+        if self.ecoar:
+            print(mensagem)
+        self.detalhado.info(mensagem)
+
+    def warning(self, mensagem):
+        if self.ecoar:
+            print(f"AVISO: {mensagem}")
+        self.detalhado.warning(mensagem)
+
+    def error(self, mensagem):
+        if self.ecoar:
+            print(f"ERRO: {mensagem}")
+        self.detalhado.error(mensagem)
+        self.geral.error(mensagem)
+
+
+# -------------------- RESULTADO --------------------
+class ResultadoRelatorio:
+    """Resultado estruturado de uma execução do pipeline"""
+
+    def __init__(self, edicao):
+        self.edicao = str(edicao)
+        self.sucesso = False
+        self.etapa_falha = None
+        self.erro = None
+        self.titulo = None
+        self.caminho_csv = None
+        self.caminho_pdf = None
+        self.pdf_em_cache = False  # PDF reaproveitado: CSV igual ao da última geração
+        self.linhas_csv = 0
+        self.compradores = 0
+        self.status_banco = None  # INSERIDO, ATUALIZADO, JA_EXISTE ou FALHA
+        self.linhas_inseridas = 0
+        self.orcamento = None
+
+    def como_dict(self):
+        return {
+            "edicao": self.edicao,
+            "sucesso": self.sucesso,
+            "etapa_falha": self.etapa_falha,
+            "erro": self.erro,
+            "titulo": self.titulo,
+            "caminho_pdf": self.caminho_pdf,
+            "nome_pdf": os.path.basename(self.caminho_pdf) if self.caminho_pdf else None,
+            "pdf_em_cache": self.pdf_em_cache,
+            "linhas_csv": self.linhas_csv,
+            "compradores": self.compradores,
+            "status_banco": self.status_banco,
+            "linhas_inseridas": self.linhas_inseridas,
+            "orcamento": self.orcamento.como_dict() if self.orcamento else None,
+        }
+
+
+# -------------------- NAVEGAÇÃO NO PAINEL --------------------
+class PainelSorteios:
+    """Automação do painel (login, busca da edição e download do CSV) sobre um navegador já aberto"""
+
+    def __init__(self, navegador, log, caminho_downloads=None):
+        self.navegador = navegador
+        self.log = log
+        self.caminho_downloads = caminho_downloads or CAMINHO_DOWNLOADS
+        self.url_sorteios = None
+
+    # -------------------- esperas --------------------
+    def aguardar(self, condicao, etapa):
+        """WebDriverWait com o tempo limite da etapa e polling curto"""
+        return WebDriverWait(self.navegador, TEMPOS_LIMITE[etapa], poll_frequency=INTERVALO_ESPERA).until(condicao)
+
+    def aguardar_dom_estavel(self, etapa="dom_estavel", janela=0.3):
+        """
+        Aguarda o documento carregar e o DOM parar de mudar por `janela` segundos
+        (substitui pausas fixas depois de cliques que abrem menus/diálogos)
+        """
+        estado = {"assinatura": None, "desde": 0.0}
+
+        def estavel(driver):
+            assinatura = driver.execute_script(
+                "return document.readyState + ':' + document.getElementsByTagName('*').length;"
+            )
+            agora = datetime.now().timestamp()
+            if assinatura != estado["assinatura"]:
+                estado["assinatura"] = assinatura
+                estado["desde"] = agora
+                return False
+            return assinatura.startswith("complete") and agora - estado["desde"] >= janela
+
+        try:
+            self.aguardar(estavel, etapa)
+        except TimeoutException:
+            self.log.warning("DOM não estabilizou no tempo limite - seguindo mesmo assim")
+
+    # -------------------- robustez --------------------
+    def fechar_popup(self):
+        """Fecha popup inicial se aparecer (sem esperar o tempo limite quando a página já está pronta)"""
+        try:
+            # Termina assim que o popup OU o menu de sorteios estiver disponível
+            self.aguardar(
+                lambda d: d.find_elements(By.XPATH, XPATH_POPUP_ENTENDI) or d.find_elements(By.XPATH, XPATH_MENU_SORTEIOS),
+                "popup"
+            )
+            botoes = self.navegador.find_elements(By.XPATH, XPATH_POPUP_ENTENDI)
+            if not botoes:
+                self.log.info("Pop-up não apareceu.")
+                return
+            self.aguardar(EC.element_to_be_clickable((By.XPATH, XPATH_POPUP_ENTENDI)), "popup").click()
+            self.aguardar(EC.invisibility_of_element_located((By.CSS_SELECTOR, "div.MuiDialog-container")), "popup")
+            self.log.info("Pop-up fechado.")
+        except TimeoutException:
+            self.log.info("Pop-up não apareceu.")
+
+    def limpar_overlays(self):
+        """Remove overlays que bloqueiam cliques"""
+        try:
+            body = self.navegador.find_element(By.TAG_NAME, "body")
+            for _ in range(3):
+                body.send_keys(Keys.ESCAPE)
+            self.navegador.execute_script("""
+                document.querySelectorAll('div.MuiBackdrop-root').forEach(function(backdrop){
+                    if(backdrop.style.opacity!=='0'){
+                        backdrop.remove();
+                    }
+                });
+            """)
+            # Pronto quando não resta nenhum backdrop visível
+            self.aguardar(
+                lambda d: not d.execute_script(
+                    "return Array.from(document.querySelectorAll('div.MuiBackdrop-root'))"
+                    ".some(function(b){ return b.offsetParent !== null && getComputedStyle(b).opacity !== '0'; });"
+                ),
+                "overlays"
+            )
+            self.log.info("Overlays removidos")
+        except TimeoutException:
+            self.log.warning("Aviso limpeza: overlay ainda visível após o tempo limite")
+        except Exception as e:
+            self.log.warning(f"Aviso limpeza: {e}")
+
+    def limpar_campo_busca(self):
+        """Limpa completamente o campo de busca"""
+        try:
+            campo = self.aguardar(EC.element_to_be_clickable((By.XPATH, XPATH_CAMPO_BUSCA)), "pagina_sorteios")
+            campo.click()
+            campo.send_keys(Keys.CONTROL + "a")
+            campo.send_keys(Keys.DELETE)
+            self.navegador.execute_script("arguments[0].value = '';", campo)
+            self.navegador.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }));", campo)
+            self.aguardar(lambda d: campo.get_attribute("value") == "", "pagina_sorteios")
+            self.log.info("Campo de busca limpo")
+            return True
+        except Exception as e:
+            self.log.error(f"Erro ao limpar campo: {e}")
+            return False
+
+    def capturar_titulo_robusto(self, edicao):
+        """Captura título com múltiplas tentativas"""
+        seletores_titulo = [
+            # Seletor principal
+            '//*[@id="root"]/div/main/div/div/div[2]/div[1]/div[1]/div/div/div[1]/div[2]/div/div/div/div/div/div/div/div[1]/div/div[1]/div/h4',
+            # Seletores alternativos
+            "//h4[contains(@class, 'MuiTypography')]",
+            "//div[contains(@class, 'MuiGrid')]//h4",
+            "//h4",
+            "//div[@role='dialog']//h4"
+        ]
+
+        # Aguarda algum título renderizar antes de testar os seletores
+        try:
+            self.aguardar(EC.presence_of_element_located((By.XPATH, "//h4")), "titulo")
+        except TimeoutException:
+            self.log.warning("Nenhum título (h4) apareceu no tempo limite")
+
+        for i, seletor in enumerate(seletores_titulo):
+            try:
+                titulo_elem = self.navegador.find_element(By.XPATH, seletor)
+                titulo = titulo_elem.text.strip()
+                if titulo and len(titulo) > 10:  # Título válido deve ter mais de 10 caracteres
+                    self.log.info(f"Titulo capturado (seletor {i+1}): {titulo}")
+                    return titulo
+            except Exception as e:
+                self.log.warning(f"Seletor {i+1} falhou: {e}")
+                continue
+
+        self.log.error(f"Não foi possível capturar título para edição {edicao}")
+        return None
+
+    def forcar_download_javascript(self):
+        """Tenta disparar o download clicando em links de CSV (baseado no projeto de referência)"""
+        self.log.info("Tentando forçar download via JavaScript...")
+        try:
+            self.navegador.execute_script("""
+                // Forçar download via JavaScript
+                var links = document.querySelectorAll('a[href*=".csv"], a[download], button[onclick*="download"]');
+                for(var i=0; i<links.length; i++) {
+                    if(links[i].href && (links[i].href.includes('download') || links[i].href.includes('.csv'))) {
+                        links[i].click();
+                        console.log('Download forçado via JavaScript');
+                        break;
+                    }
+                }
+            """)
+            self.log.info("JavaScript de download executado")
+        except Exception as e:
+            self.log.warning(f"Erro no JavaScript de download: {e}")
+
+    def detectar_arquivo_baixado_robusto(self, monitor, nome_esperado, edicao):
+        """
+        Aguarda o CSV na pasta exclusiva do job (evento de fim de escrita)
+        - Qualquer CSV completo na pasta do job é o download desta edição,
+          mesmo que o nome divirja do esperado
+        """
+        self.log.info("Aguardando download por evento...")
+        self.log.info(f"Arquivo esperado: {nome_esperado}")
+        self.log.info(f"Pasta do job: {monitor.pasta_job}")
+
+        arquivo_encontrado = monitor.aguardar(
+            timeout=TEMPO_LIMITE_DOWNLOAD,
+            ao_atrasar=self.forcar_download_javascript,
+            atraso=TEMPO_LIMITE_DOWNLOAD / 2,
+        )
+
+        if not arquivo_encontrado:
+            self.log.error(f"CSV não baixou: {edicao}")
+            # Debug: o que ficou na pasta do job (ex.: .crdownload incompleto)
+            try:
+                restos = os.listdir(monitor.pasta_job)
+                if restos:
+                    self.log.warning("Arquivos na pasta do job:")
+                    for arq in restos:
+                        self.log.warning(f"   - {arq}")
+                else:
+                    self.log.warning("Nenhum arquivo chegou na pasta do job")
+            except Exception as e:
+                self.log.warning(f"Erro ao listar arquivos para debug: {e}")
+            return None
+
+        nome_arquivo = os.path.basename(arquivo_encontrado)
+        if nome_arquivo != nome_esperado:
+            self.log.info(f"Nome divergente do esperado: {nome_arquivo}")
+        return arquivo_encontrado
+
+    # -------------------- sessão --------------------
+    def fazer_login_completo(self):
+        """Login com credenciais e navegação pelo menu até a página de sorteios"""
+        navegador = self.navegador
+        navegador.get(LOGIN_CONFIG["url"])
+        campo_email = self.aguardar(EC.element_to_be_clickable((By.NAME, "email")), "pagina_login")
+        navegador.execute_script("window.print = function(){};")
+
+        self.log.info("FAZENDO LOGIN...")
+        campo_email.send_keys(LOGIN_CONFIG["email"])
+        navegador.find_element(By.NAME, "password").send_keys(LOGIN_CONFIG["password"])
+        navegador.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+        # Login concluído quando o formulário sai da tela
+        self.aguardar(EC.staleness_of(campo_email), "pos_login")
+
+        self.fechar_popup()
+        self.limpar_overlays()
+
+        # Navegar para sorteios com robustez
+        try:
+            menu = self.aguardar(EC.element_to_be_clickable((By.XPATH, XPATH_MENU_SORTEIOS)), "menu")
+            navegador.execute_script("arguments[0].scrollIntoView(true);", menu)
+            navegador.execute_script("arguments[0].click();", menu)
+            self.aguardar(EC.presence_of_element_located((By.XPATH, XPATH_CAMPO_BUSCA)), "pagina_sorteios")
+            self.log.info("Navegacao para sorteios concluida")
+
+            # DEBUG: Verificar se chegamos na página correta
+            self.log.info(f"URL atual após navegação: {navegador.current_url}")
+            self.log.info(f"Título da página: {navegador.title}")
+
+        except Exception as e:
+            self.log.error(f"Erro ao navegar para sorteios: {e}")
+            raise
+
+    def sessao_ativa(self):
+        """Confirma que a página de sorteios abriu autenticada (campo de busca presente)"""
+        try:
+            self.aguardar(EC.presence_of_element_located((By.XPATH, XPATH_CAMPO_BUSCA)), "pagina_sorteios")
+            return "login" not in self.navegador.current_url.lower()
+        except TimeoutException:
+            return False
+
+    def garantir_sessao(self):
+        """Abre a página de sorteios reaproveitando a sessão salva ou fazendo login completo"""
+        if not LOGIN_CONFIG["email"] or not LOGIN_CONFIG["password"]:
+            self.log.error("Credenciais de login não encontradas no arquivo .env")
+            self.log.error("Verifique se LOGIN_EMAIL e LOGIN_PASSWORD estão definidos")
+            raise ErroRelatorio("Credenciais de login não configuradas", etapa="sessao")
+
+        sessao = carregar_sessao()
+        if sessao:
+            self.log.info("SESSAO SALVA ENCONTRADA - abrindo sorteios direto...")
+            if restaurar_sessao(self.navegador, sessao) and self.sessao_ativa():
+                self.navegador.execute_script("window.print = function(){};")
+                self.limpar_overlays()
+                self.log.info(f"Sessão reutilizada - login dispensado ({self.navegador.current_url})")
+                self.url_sorteios = self.navegador.current_url
+                return
+            self.log.warning("Sessão salva não é mais aceita pelo painel - fazendo login completo")
+            descartar_sessao()
+
+        self.fazer_login_completo()
+        self.url_sorteios = self.navegador.current_url
+        salvar_sessao(self.navegador, self.navegador.current_url)
+
+    def voltar_sorteios(self):
+        """
+        Volta para a listagem de sorteios entre edições do lote, sem novo login
+        Se a sessão caiu no meio do lote, refaz garantir_sessao
+        """
+        if self.url_sorteios:
+            self.navegador.get(self.url_sorteios)
+            if self.sessao_ativa():
+                self.navegador.execute_script("window.print = function(){};")
+                self.limpar_overlays()
+                return
+            self.log.warning("Sessão expirou durante o lote - autenticando de novo")
+        self.garantir_sessao()
+
+    # -------------------- download do CSV --------------------
+    def baixar_csv(self, edicao, orcamento, log=None):
+        """
+        Busca a edição, abre o Relatório de Vendas e aguarda o CSV
+        - log: log da edição (no lote o painel é compartilhado entre edições)
+        Retorna (titulo, caminho_csv); levanta ErroRelatorio/EdicaoNaoEncontrada
+        """
+        if log is not None:
+            self.log = log
+        navegador = self.navegador
+
+        # Limpar campo de busca antes de usar
+        self.limpar_campo_busca()
+
+        # DEBUG: Verificar se estamos na página correta antes de buscar
+        self.log.info(f"URL antes de buscar campo: {navegador.current_url}")
+        self.log.info(f"Título antes de buscar campo: {navegador.title}")
+
+        self.log.info(f"BUSCANDO EDICAO {edicao}...")
+        with orcamento.etapa("busca"):
+            # Botão da listagem anterior: a busca só terminou quando ele sair do DOM
+            botoes_anteriores = navegador.find_elements(By.XPATH, "//button[@aria-label='Compras']")
+            busca = navegador.find_element(By.XPATH, XPATH_CAMPO_BUSCA)
+            busca.clear()
+            busca.send_keys(edicao)
+
+            # Verificar se existe botão de relatórios (indicador de que a edição foi encontrada)
+            try:
+                self.log.info("Aguardando resultados da busca...")
+                if botoes_anteriores:
+                    try:
+                        self.aguardar(EC.staleness_of(botoes_anteriores[0]), "resultado_busca")
+                    except TimeoutException:
+                        pass  # listagem já filtrada (mesmo primeiro item) - segue para a verificação abaixo
+                self.aguardar(
+                    EC.presence_of_element_located((By.XPATH, f"//*[not(self::input)][contains(text(), '{edicao}')]")),
+                    "resultado_busca"
+                )
+                botao_compras = self.aguardar(EC.element_to_be_clickable((By.XPATH, "//button[@aria-label='Compras']")), "resultado_busca")
+                self.log.info("Edição encontrada! Acessando relatórios...")
+                botao_compras.click()
+                self.aguardar_dom_estavel()
+            except TimeoutException:
+                self.log.error(f"Edição {edicao} não foi encontrada no sistema!")
+                self.log.error("A edição pode não existir ou estar inativa.")
+                raise EdicaoNaoEncontrada(f"Edição {edicao} não foi encontrada no sistema!", etapa="busca")
+
+        # Downloads deste job vão para uma pasta exclusiva observada por evento
+        monitor_download = MonitorDownload(navegador, self.caminho_downloads, edicao)
+        monitor_download.iniciar()
+        try:
+            # Navegar para relatório de vendas
+            with orcamento.etapa("relatorio_vendas"):
+                ac = ActionChains(navegador)
+                for _ in range(6):
+                    ac.send_keys(Keys.TAB)
+                ac.send_keys(Keys.ENTER).perform()
+
+                try:
+                    self.aguardar(
+                        EC.element_to_be_clickable((By.XPATH, "//li//div[contains(text(), 'Relatório de Vendas')]")),
+                        "relatorio_vendas"
+                    ).click()
+                    self.log.info("Relatorio de vendas selecionado")
+                except Exception as e:
+                    self.log.error(f"Erro ao selecionar relatório de vendas: {e}")
+                    raise
+
+            # Capturar título com detecção robusta
+            titulo = self.capturar_titulo_robusto(edicao)
+            if not titulo:
+                raise ErroRelatorio(f"Não foi possível capturar título para edição {edicao}", etapa="relatorio_vendas")
+
+            slug = unidecode.unidecode(titulo.lower().replace(" ", "-"))
+            nome_csv = f"relatorio-vendas-{slug}.csv"
+            self.log.info(f"Arquivo esperado: {nome_csv}")
+
+            # Detectar arquivo baixado com método robusto
+            with orcamento.etapa("download"):
+                caminho_csv = self.detectar_arquivo_baixado_robusto(monitor_download, nome_csv, edicao)
+        finally:
+            monitor_download.encerrar()
+
+        if not caminho_csv:
+            raise ErroRelatorio(f"CSV não baixou: {edicao}", etapa="download")
+
+        self.log.info("Download detectado com sucesso!")
+        return titulo, caminho_csv
+
+
+# -------------------- TRANSFORMAÇÃO --------------------
+def criptografar_telefones(telefones):
+    """Mascara telefones no formato "(11) 91234-5678" (15 caracteres) -> "(11) 91***-**78" """
+    telefones = telefones.astype(str)
+    return telefones.str.slice_replace(7, 13, "***-**").where(telefones.str.len() == 15, telefones)
+
+
+def juntar_numeros(telefone_codigos, numeros, total_telefones):
+    """
+    Números de cada telefone sem repetição, em ordem numérica, unidos por ", "
+    - telefone_codigos: código (0..total_telefones-1) do telefone de cada linha
+    - numeros: Series com "1, 2, 3" por linha
+    Explode tudo em um número por posição e ordena/deduplica de uma vez com
+    chaves inteiras (em vez de split/set/sort em Python grupo a grupo);
+    strip e int() só rodam uma vez por número distinto.
+    Retorna lista alinhada aos códigos ("" para telefone sem números)
+    """
+    textos = numeros.astype(str).tolist()
+    tamanhos = np.fromiter((t.count(",") + 1 for t in textos), dtype=np.int64, count=len(textos))
+    telefone_codigos = np.repeat(telefone_codigos, tamanhos)
+
+    # " 12" e "12" viram o mesmo número depois do strip
+    brutos_codigos, brutos = pd.factorize(np.array(",".join(textos).split(",") if textos else [], dtype=object))
+    distintos_codigos, distintos = pd.factorize(np.array([str(n).strip() for n in brutos], dtype=object))
+    numero_codigos = distintos_codigos[brutos_codigos]
+    distintos = np.asarray(distintos, dtype=object)
+    vazios = distintos == ""
+    valores = np.array([0 if vazio else int(n) for n, vazio in zip(distintos, vazios)], dtype=np.int64)
+
+    # Posição de cada número distinto na ordem numérica
+    total_distintos = max(len(distintos), 1)
+    por_valor = np.argsort(valores, kind="stable")
+    posicao = np.empty(len(distintos), dtype=np.int64)
+    posicao[por_valor] = np.arange(len(distintos))
+
+    # Chave única (telefone, posição): uma ordenação agrupa, ordena e expõe os repetidos
+    validos = ~vazios[numero_codigos]
+    chaves = np.sort(telefone_codigos[validos] * total_distintos + posicao[numero_codigos[validos]])
+    chaves = chaves[np.r_[True, chaves[1:] != chaves[:-1]]] if len(chaves) else chaves
+    telefone_codigos = chaves // total_distintos
+    valores_ordenados = distintos[por_valor[chaves % total_distintos]].tolist()
+
+    limites = np.searchsorted(telefone_codigos, np.arange(total_telefones + 1)).tolist()
+    return [", ".join(valores_ordenados[limites[i]:limites[i + 1]]) for i in range(total_telefones)]
+
+
+def agrupar_compradores(df):
+    """Uma linha por telefone: nome, telefone mascarado e números ordenados"""
+    df = df[["Nome", "Telefone", "Números"]].dropna(subset=["Telefone"])
+
+    # Códigos na ordem do groupby("Telefone") (telefones ordenados)
+    codigos, telefones = pd.factorize(df["Telefone"], sort=True)
+
+    # Primeiro nome não nulo de cada telefone
+    com_nome = np.flatnonzero(df["Nome"].notna().to_numpy())
+    primeira_linha = np.full(len(telefones), -1, dtype=np.int64)
+    primeira_linha[codigos[com_nome][::-1]] = com_nome[::-1]
+    nomes = df["Nome"].take(np.maximum(primeira_linha, 0)).reset_index(drop=True).mask(primeira_linha < 0)
+
+    agrupado = pd.DataFrame({
+        "Nome": nomes,
+        "Telefone": criptografar_telefones(pd.Series(telefones)),
+        "Números": juntar_numeros(codigos, df["Números"], len(telefones)),
+    })
+    return agrupado.sort_values("Nome")
+
+
+# ================== INSERÇÃO NO BANCO DE DADOS ==================
+# Lógica de inserção baseada na estrutura robusta do alimenta_relatorios_vendas.py
+# ==================================================================
+
+def extrair_sigla_do_arquivo(caminho_csv, log):
+    """Extrai a sigla do nome do arquivo CSV aplicando as regras corretas"""
+    try:
+        nome_arquivo = os.path.basename(caminho_csv)
+
+        # Remove prefixo e sufixo
+        if nome_arquivo.startswith("relatorio-vendas-"):
+            nome_sem_prefixo = nome_arquivo[17:]  # Remove "relatorio-vendas-"
+            nome_sem_sufixo = nome_sem_prefixo.replace(".csv", "")  # Remove ".csv"
+
+            # Converter hífens para espaços e deixar em maiúsculo
+            texto_processado = nome_sem_sufixo.replace("-", " ").upper()
+
+            # Aplicar as regras de extração
+            if " RJ " in texto_processado:
+                # Se contém "RJ", a sigla é o que vem antes de "RJ"
+                sigla = texto_processado.split(" RJ ")[0].strip()
+            elif " EDICAO " in texto_processado:
+                # Se não contém "RJ", a sigla é o que vem antes de "EDICAO"
+                sigla = texto_processado.split(" EDICAO ")[0].strip()
+            else:
+                return None
+
+            log.info(f"Sigla extraída do arquivo: '{sigla}'")
+            return sigla
+
+    except Exception as e:
+        log.error(f"Erro ao extrair sigla do arquivo: {e}")
+
+    return None
+
+
+def obter_horario_por_extracao(sigla_extraida, log):
+    """
+    Retorna o horário específico baseado na extração/sigla
+    A agenda de sorteios procura a sigla oficial em qualquer posição,
+    sempre a mais longa (PTN/PTV/PTM nunca são confundidas com PT)
+    """
+    sigla = sigla_extraida.upper().strip()
+
+    extracao_base = agenda_sorteios.procurar_sigla(sigla)
+    if extracao_base:
+        horario = agenda_sorteios.horario(extracao_base).strftime("%H:%M:%S")
+        log.info(f"Horario definido para '{sigla}': {horario} (baseado em '{extracao_base}')")
+        return horario
+
+    # Se não encontrar correspondência, retornar horário padrão
+    log.warning(f"Extração não reconhecida '{sigla}', usando horário padrão: 12:00:00")
+    return '12:00:00'
+
+
+def calcular_dados_pai(df_banco, sigla_extraida, log):
+    """(total_cotas, data) do registro em relatorios_importados"""
+    total_cotas, maior_data = resumo_vendas(df_banco)
+
+    # Se não conseguiu extrair nenhuma data, usar data atual
+    if maior_data is None:
+        maior_data = datetime.now()
+
+    # Obter horário específico baseado na extração
+    horario_extracao = obter_horario_por_extracao(sigla_extraida, log)
+
+    # Combinar a maior data com o horário da extração
+    data_final = datetime.combine(maior_data.date(), datetime.strptime(horario_extracao, "%H:%M:%S").time())
+    return total_cotas, data_final
+
+
+def atualizar_edicao_importada(conn, df_banco, edicao_converter, sigla_extraida, log):
+    """
+    Sincroniza por delta uma edição que já está em relatorios_importados:
+    insere compras novas, regrava as alteradas (as que sumiram do export só
+    são apagadas com RELATORIO_BANCO_DELTA_REMOVER) e recalcula
+    total_cotas/data do pai - tudo numa transação só
+    Retorna (status, linhas_gravadas) com status ATUALIZADO ou JA_EXISTE (sem mudanças)
+    """
+    cursor = conn.cursor()
+    try:
+        # Trava o pai: duas sincronizações da mesma edição não se intercalam
+        cursor.execute("SELECT total_cotas FROM relatorios_importados WHERE edicao = %s FOR UPDATE", (edicao_converter,))
+        cursor.fetchall()
+
+        atuais = list(linhas_vendas(df_banco, edicao_converter, sigla_extraida, log))
+        delta = DeltaVendas(ler_vendas(conn, edicao_converter), atuais)
+        if delta.mantidas:
+            log.warning(f"Edição {edicao_converter}: {delta.mantidas} compra(s) do banco ausente(s) do CSV atual - "
+                        f"mantidas (seriam apagadas com RELATORIO_BANCO_DELTA_REMOVER=true)")
+        if delta.vazio:
+            conn.rollback()
+            log.info(f"Edição {edicao_converter} já importada e sem mudanças no CSV. Nada será alterado.")
+            return "JA_EXISTE", 0
+
+        log.info(f"Edição {edicao_converter} já importada - aplicando delta: {delta.resumo()}")
+        aplicar_delta(conn, delta, edicao_converter, log)
+        total_cotas, data_final = calcular_dados_pai(df_banco, sigla_extraida, log)
+        cursor.execute(
+            "UPDATE relatorios_importados SET total_cotas = %s, data = %s WHERE edicao = %s",
+            (total_cotas, data_final, edicao_converter),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        log.warning(f"Delta da edição {edicao_converter} desfeito - banco mantido como estava")
+        raise
+    finally:
+        cursor.close()
+
+    log.info(f"Registro pai atualizado em relatorios_importados: edicao {edicao_converter}, total_cotas={total_cotas}")
+    return "ATUALIZADO", len(delta.linhas_novas)
+
+
+def inserir_dados_banco_integrado(caminho_csv, edicao_converter, log, df_banco=None):
+    """
+    Insere dados no banco de dados diretamente (sem dependência externa)
+    - df_banco: DataFrame já carregado por carregar_relatorio_vendas (evita reler o CSV)
+    Retorna (status, linhas_gravadas) com status INSERIDO, ATUALIZADO (delta
+    numa edição já importada), JA_EXISTE ou FALHA
+    """
+    try:
+        log.info("INICIANDO INSERCAO NO BANCO DE DADOS...")
+
+        # Extrair sigla do nome do arquivo
+        sigla_extraida = extrair_sigla_do_arquivo(caminho_csv, log)
+
+        if not sigla_extraida:
+            log.error("Não foi possível extrair a sigla do arquivo. Verifique o nome do arquivo CSV.")
+            return "FALHA", 0
+
+        # 1) Conexão ao MySQL (transação explícita: filhas e pai confirmados juntos)
+        conn = mysql.connector.connect(**DB_CONFIG, **GravadorVendas.conexao_kwargs())
+        conn.autocommit = False
+        cursor = conn.cursor()
+
+        # Horários das extrações (premiacoes), se a agenda do processo venceu
+        agenda_sorteios.atualizar_se_vencida(conn)
+
+        # Verifica se já existe registro para esta edição em relatorios_importados
+        sql_check = "SELECT COUNT(*) FROM relatorios_importados WHERE edicao = %s"
+        cursor.execute(sql_check, (edicao_converter,))
+        existe = cursor.fetchone()[0]
+
+        if existe != 0 and not INGESTAO_CONFIG['delta']:
+            log.info(f"Edição {edicao_converter} já existe em relatorios_importados. Nada será inserido.")
+            return "JA_EXISTE", 0
+
+        # 2) CSV tipado (o mesmo frame usado no PDF; lido aqui se o PDF veio do cache)
+        if df_banco is None:
+            df_banco = carregar_relatorio_vendas(caminho_csv)
+
+        if existe != 0:
+            return atualizar_edicao_importada(conn, df_banco, edicao_converter, sigla_extraida, log)
+
+        # 3) Total de cotas e data do pai (maior data do CSV + horário da extração)
+        total_cotas, data_final = calcular_dados_pai(df_banco, sigla_extraida, log)
+
+        # 4) Uma transação só: limpeza de órfãs, filhas em lote e o registro pai -
+        # a edição nunca fica com vendas gravadas sem o pai (nem se o processo morrer)
+        sql_insert_rel = """
+            INSERT INTO relatorios_importados (edicao, total_cotas, data, Extracao)
+            VALUES (%s, %s, %s, %s)
+        """
+        try:
+            # Filhas sem o pai deixadas por versões que confirmavam por bloco seriam duplicadas
+            cursor.execute("DELETE FROM relatorios_vendas WHERE edicao = %s", (edicao_converter,))
+            if cursor.rowcount:
+                log.warning(f"{cursor.rowcount} linhas de uma importação incompleta da edição {edicao_converter} - removidas antes de inserir")
+
+            # Linhas preparadas por coluna e geradas em ordem de data da compra, bloco a bloco
+            linhas = linhas_vendas(df_banco, edicao_converter, sigla_extraida, log)
+            total_inseridos = GravadorVendas(conn, log).gravar(linhas, confirmar=False)
+            cursor.execute(sql_insert_rel, (edicao_converter, total_cotas, data_final, sigla_extraida))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            log.warning(f"Inserção interrompida - nada da edição {edicao_converter} foi gravado")
+            raise
+
+        log.info(f"Registro pai criado em relatorios_importados: edicao {edicao_converter}, total_cotas={total_cotas}")
+        log.info(f"{total_inseridos} linhas inseridas em 'relatorios_vendas' com sucesso!")
+        log.info("Dados salvos no banco com sucesso!")
+        return "INSERIDO", total_inseridos
+
+    except mysql.connector.Error as err:
+        log.error(f"Erro ao conectar ou inserir no banco: {err}")
+        return "FALHA", 0
+
+    except Exception as e:
+        log.error(f"Erro ao processar dados para banco: {e}")
+        return "FALHA", 0
+
+    finally:
+        if 'conn' in locals() and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+
+# -------------------- PIPELINE --------------------
+class PipelineRelatorio:
+    """
+    Execução do relatório de uma edição, etapa por etapa
+    - navegador: Chrome já aberto (ex.: emprestado do PoolNavegadores);
+      se omitido, um navegador próprio é criado e fechado ao final
+    - ecoar: imprime o log no console (modo CLI)
+    """
+
+    def __init__(self, edicao, navegador=None, ecoar=False, caminho_downloads=None):
+        self.edicao = str(edicao)
+        self.navegador = navegador
+        self.navegador_proprio = navegador is None
+        self.caminho_downloads = caminho_downloads or CAMINHO_DOWNLOADS
+        self.log = LogRelatorio(self.edicao, ecoar=ecoar)
+        self.orcamento = OrcamentoLatencia(ORCAMENTO_ETAPAS)
+        self.resultado = ResultadoRelatorio(self.edicao)
+        self.resultado.orcamento = self.orcamento
+        self.dados = None  # DataFrame do CSV, lido uma vez na transformação
+        self.cache_artefatos = CacheArtefatos(self.caminho_downloads) if CACHE_ARTEFATOS_CONFIG['ativo'] else None
+        self.chave_pdf = None
+
+    # -------------------- etapas --------------------
+    def baixar_csv(self, painel=None):
+        """
+        Etapa 1: sessão no painel, busca da edição e download do CSV
+        - painel: PainelSorteios já autenticado (modo lote) - pula navegador e sessão
+        """
+        if painel is not None:
+            titulo, caminho_csv = painel.baixar_csv(self.edicao, self.orcamento, log=self.log)
+            self.resultado.titulo = titulo
+            self.resultado.caminho_csv = caminho_csv
+            return titulo, caminho_csv
+
+        if self.navegador is None:
+            with self.orcamento.etapa("navegador"):
+                try:
+                    self.navegador = criar_navegador(self.caminho_downloads)
+                except Exception as e:
+                    self.log.error(f"Erro ao detectar ChromeDriver: {e}")
+                    raise ErroRelatorio(f"Erro ao iniciar o navegador: {e}", etapa="navegador")
+            self.log.info("ChromeDriver inicializado")
+
+        self.log.info("CONECTANDO AO PAINEL...")
+        painel = PainelSorteios(self.navegador, self.log, self.caminho_downloads)
+        # Reutiliza a sessão salva quando válida; senão faz login completo
+        with self.orcamento.etapa("sessao"):
+            painel.garantir_sessao()
+
+        titulo, caminho_csv = painel.baixar_csv(self.edicao, self.orcamento)
+        self.resultado.titulo = titulo
+        self.resultado.caminho_csv = caminho_csv
+        return titulo, caminho_csv
+
+    def consultar_cache_pdf(self, titulo, caminho_csv):
+        """
+        Etapa 2a: PDF já gerado para este mesmo CSV (e título/renderizador)?
+        Em caso de acerto preenche o resultado e dispensa transformar/renderizar
+        """
+        renderizador = obter_renderizador(self.caminho_downloads, self.log)
+        if self.cache_artefatos is None or renderizador is None:
+            return False
+        with self.orcamento.etapa("cache_pdf"):
+            self.chave_pdf = chave_artefato(caminho_csv, titulo, renderizador.versao)
+            artefato = self.cache_artefatos.obter(self.edicao, self.chave_pdf)
+        if artefato is None:
+            return False
+
+        self.log.info(f"CSV sem alterações desde a última geração - reaproveitando {artefato['caminho_pdf']}")
+        resultado = self.resultado
+        resultado.caminho_pdf = artefato["caminho_pdf"]
+        resultado.pdf_em_cache = True
+        resultado.linhas_csv = artefato.get("linhas_csv", 0)
+        resultado.compradores = artefato.get("compradores", 0)
+        return True
+
+    def transformar(self, caminho_csv):
+        """Etapa 2: lê o CSV (uma vez, tipado) e agrupa os compradores"""
+        self.log.info("INICIANDO PROCESSAMENTO DO CSV...")
+        with self.orcamento.etapa("processamento"):
+            df = carregar_relatorio_vendas(caminho_csv)
+            self.dados = df  # compartilhado com a etapa do banco
+            self.log.info(f"CSV carregado: {len(df)} linhas encontradas")
+            self.log.info("PROCESSANDO DADOS...")
+            agrupado = agrupar_compradores(df)
+        self.resultado.linhas_csv = len(df)
+        self.resultado.compradores = len(agrupado)
+        return agrupado
+
+    def renderizar_pdf(self, titulo, agrupado, caminho_csv):
+        """Etapa 3: gera o PDF ao lado do CSV (None se RENDERIZADOR_PDF=wkhtmltopdf e ele não existir)"""
+        renderizador = obter_renderizador(self.caminho_downloads, self.log)
+        if renderizador is None:
+            self.log.warning("PDF não foi gerado - wkhtmltopdf não encontrado")
+            return None
+        self.log.info(f"CRIANDO PDF ({renderizador.nome})...")
+        with self.orcamento.etapa("pdf"):
+            caminho_pdf = renderizador.renderizar(titulo, agrupado, caminho_csv.replace(".csv", ".pdf"))
+        self.log.info("PDF GERADO COM SUCESSO!")
+        self.resultado.caminho_pdf = caminho_pdf
+        if self.cache_artefatos is not None and self.chave_pdf is not None:
+            self.cache_artefatos.registrar(
+                self.edicao, self.chave_pdf, caminho_pdf,
+                linhas_csv=self.resultado.linhas_csv, compradores=self.resultado.compradores,
+            )
+        return caminho_pdf
+
+    def inserir_banco(self, caminho_csv):
+        """Etapa 4: grava relatorios_importados + relatorios_vendas (delta se a edição já existe)"""
+        with self.orcamento.etapa("banco"):
+            status, linhas = inserir_dados_banco_integrado(caminho_csv, self.edicao, self.log, self.dados)
+        self.resultado.status_banco = status
+        self.resultado.linhas_inseridas = linhas
+        if status == "FALHA":
+            self.log.error("Falha na inserção no banco de dados")
+        elif status == "ATUALIZADO":
+            self.log.info(f"Edição já existia no banco - {linhas} linhas regravadas pelo delta")
+        elif status == "JA_EXISTE":
+            self.log.info("Edição já existe no banco - nenhum dado inserido")
+        return status
+
+    # -------------------- execução completa --------------------
+    def executar(self):
+        """Roda as quatro etapas; nunca levanta exceção nem encerra o processo"""
+        self.iniciar_log()
+        if self.baixar(None):
+            return self.processar()
+        self.finalizar()
+        return self.resultado
+
+    def iniciar_log(self):
+        self.log.info("=== INICIANDO RELATORIO V2 DOCKER ===")
+        self.log.info("Python executado: " + sys.executable)
+        self.log.info(f"EDICAO SOLICITADA: {self.edicao}")
+        self.log.info("INICIANDO PROCESSAMENTO...")
+
+    def baixar(self, painel):
+        """Etapa 1 com captura de erro; retorna True se o CSV foi baixado"""
+        try:
+            self.baixar_csv(painel)
+            return True
+        except ErroRelatorio as e:
+            self._registrar_falha(e.etapa or "download", e)
+        except Exception as e:
+            self.log.error(f"Erro crítico durante automação: {e}")
+            self._registrar_falha("download", e)
+        return False
+
+    def processar(self):
+        """
+        Etapas 2-4 sobre o CSV já baixado e finalização
+        (no modo lote roda em outra thread enquanto o próximo download acontece)
+        """
+        resultado = self.resultado
+        titulo, caminho_csv = resultado.titulo, resultado.caminho_csv
+        etapa = "processamento"
+        try:
+            if not self.consultar_cache_pdf(titulo, caminho_csv):
+                agrupado = self.transformar(caminho_csv)
+
+                etapa = "pdf"
+                self.renderizar_pdf(titulo, agrupado, caminho_csv)
+
+            etapa = "banco"
+            self.inserir_banco(caminho_csv)
+
+            resultado.sucesso = True
+        except ErroRelatorio as e:
+            self._registrar_falha(e.etapa or etapa, e)
+        except Exception as e:
+            self.log.error(f"Erro no processamento do CSV: {e}")
+            self._registrar_falha(etapa, e)
+        finally:
+            self.finalizar()
+        return resultado
+
+    def _registrar_falha(self, etapa, erro):
+        self.resultado.etapa_falha = etapa
+        self.resultado.erro = str(erro)
+
+    def finalizar(self):
+        """Remove o CSV temporário, fecha o navegador próprio e registra o resumo"""
+        resultado = self.resultado
+        self.dados = None
+        try:
+            if resultado.caminho_csv and os.path.exists(resultado.caminho_csv):
+                os.remove(resultado.caminho_csv)
+                self.log.info("CSV temporário removido.")
+        except OSError as e:
+            self.log.warning(f"Não foi possível remover o CSV: {e}")
+
+        if self.navegador_proprio and self.navegador is not None:
+            try:
+                self.navegador.quit()
+            except Exception:
+                pass
+            self.navegador = None
+
+        if not resultado.sucesso:
+            self.log.error(f"Relatório da edição {self.edicao} falhou na etapa '{resultado.etapa_falha}': {resultado.erro}")
+            return
+
+        self.log.info("=== RELATORIO V2 DOCKER CONCLUÍDO COM SUCESSO ===")
+        if resultado.pdf_em_cache:
+            self.log.info(f"PDF reaproveitado (CSV sem alterações): {resultado.caminho_pdf}")
+        elif resultado.caminho_pdf:
+            self.log.info(f"PDF gerado: {resultado.caminho_pdf}")
+        else:
+            self.log.warning("PDF não foi gerado - wkhtmltopdf não encontrado")
+
+        if resultado.status_banco == "INSERIDO":
+            self.log.info("Dados inseridos no banco de dados com sucesso!")
+        elif resultado.status_banco == "ATUALIZADO":
+            self.log.info("Edição já existia no banco - vendas sincronizadas com o CSV atual")
+        elif resultado.status_banco == "JA_EXISTE":
+            self.log.info("Edição já existia no banco - nenhum dado novo inserido")
+        else:
+            self.log.warning("Houve problemas na insercao no banco de dados")
+
+        for linha in self.orcamento.linhas_relatorio():
+            self.log.info(linha)
+
+
+# -------------------- LOTE --------------------
+LOTE_MAX_EDICOES = int(os.getenv('LOTE_MAX_EDICOES', 200))
+
+
+def interpretar_edicoes(argumentos):
+    """
+    Converte argumentos em lista de edições sem repetição, na ordem dada
+    Aceita números, intervalos "6100-6150" e listas separadas por vírgula
+    """
+    unicas = {}
+    for argumento in argumentos:
+        for parte in str(argumento).split(","):
+            parte = parte.strip()
+            if not parte:
+                continue
+            if "-" in parte:
+                inicio, fim = (int(x) for x in parte.split("-", 1))
+                passo = 1 if fim >= inicio else -1
+                # Tamanho conferido antes de expandir: "0-1000000000" não chega a virar lista
+                if abs(fim - inicio) + 1 > LOTE_MAX_EDICOES - len(unicas):
+                    raise ValueError(f"Intervalo {parte} excede o limite de {LOTE_MAX_EDICOES} edições por lote")
+                unicas.update(dict.fromkeys(range(inicio, fim + passo, passo)))
+            else:
+                unicas[int(parte)] = None
+            if len(unicas) > LOTE_MAX_EDICOES:
+                raise ValueError(f"Lote com {len(unicas)} edições excede o limite de {LOTE_MAX_EDICOES}")
+    return [str(e) for e in unicas]
+
+
+def executar_lote(edicoes, navegador=None, ecoar=False, pool=None):
+    """
+    Gera relatórios de várias edições com uma única sessão no painel
+    - Downloads em sequência no mesmo navegador (um login só)
+    - pool: PoolNavegadores do servidor - o navegador é emprestado dele
+      pelo lote inteiro em vez de um Chrome novo
+    - CSV -> PDF -> banco de cada edição roda numa thread de processamento
+      enquanto o download da próxima edição acontece
+    Retorna dict com os resultados por edição e a vazão do lote
+    """
+    edicoes = [str(e) for e in edicoes]
+    log = LogRelatorio(f"LOTE {edicoes[0]}..{edicoes[-1]}" if edicoes else "LOTE", ecoar=ecoar)
+    inicio = time.perf_counter()
+    navegador_proprio = navegador is None and pool is None
+    trabalhador = None
+    falhou = False
+    resultados = []
+    tempo_sessao = None
+
+    log.info(f"=== INICIANDO LOTE DE {len(edicoes)} EDIÇÕES ===")
+    processamento = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lote-processamento")
+    pendentes = []
+    try:
+        if navegador_proprio:
+            navegador = criar_navegador(CAMINHO_DOWNLOADS)
+            log.info("ChromeDriver inicializado")
+        elif navegador is None:
+            trabalhador = pool.emprestar()
+            navegador = trabalhador.navegador
+            log.info(f"Navegador {trabalhador.identificador} emprestado do pool")
+
+        painel = PainelSorteios(navegador, log)
+        inicio_sessao = time.perf_counter()
+        painel.garantir_sessao()
+        tempo_sessao = time.perf_counter() - inicio_sessao
+
+        for posicao, edicao in enumerate(edicoes, start=1):
+            log.info(f"--- Lote {posicao}/{len(edicoes)}: edição {edicao} ---")
+            if posicao > 1:
+                painel.voltar_sorteios()
+            pipeline = PipelineRelatorio(edicao, navegador=navegador, ecoar=ecoar)
+            pipeline.iniciar_log()
+            if pipeline.baixar(painel):
+                pendentes.append(processamento.submit(pipeline.processar))
+            else:
+                falhou = True  # o navegador segue no lote, mas não volta para o pool
+                pipeline.finalizar()
+            resultados.append(pipeline.resultado)
+    except Exception as e:
+        falhou = True
+        log.error(f"Lote interrompido: {e}")
+        for edicao in edicoes[len(resultados):]:
+            resultado = ResultadoRelatorio(edicao)
+            resultado.etapa_falha = "sessao" if tempo_sessao is None else "download"
+            resultado.erro = f"Lote interrompido: {e}"
+            resultados.append(resultado)
+    finally:
+        # Aguarda o processamento das edições já baixadas
+        for futuro in pendentes:
+            futuro.result()
+        processamento.shutdown(wait=True)
+        if trabalhador is not None:
+            pool.devolver(trabalhador, falhou=falhou)
+        elif navegador_proprio and navegador is not None:
+            try:
+                navegador.quit()
+            except Exception:
+                pass
+
+    total = time.perf_counter() - inicio
+    sucessos = sum(1 for r in resultados if r.sucesso)
+    downloads = [
+        segundos for r in resultados if r.orcamento
+        for nome, segundos in r.orcamento.etapas if nome in ("busca", "relatorio_vendas", "download")
+    ]
+    vazao = {
+        "edicoes": len(resultados),
+        "sucessos": sucessos,
+        "falhas": len(resultados) - sucessos,
+        "total_s": round(total, 3),
+        "sessao_s": round(tempo_sessao, 3) if tempo_sessao is not None else None,
+        "media_por_edicao_s": round(total / len(resultados), 3) if resultados else None,
+        "painel_por_edicao_s": round(sum(downloads) / len(resultados), 3) if resultados else None,
+        "edicoes_por_minuto": round(len(resultados) / total * 60, 2) if total > 0 else None,
+    }
+    log.info(f"=== LOTE CONCLUÍDO: {sucessos}/{len(resultados)} com sucesso em {total:.1f}s "
+             f"({vazao['edicoes_por_minuto']} edições/min) ===")
+    for r in resultados:
+        status = "OK" if r.sucesso else f"FALHOU em {r.etapa_falha}: {r.erro}"
+        log.info(f"   - edição {r.edicao}: {status}")
+    return {
+        "sucesso": sucessos == len(resultados) and bool(resultados),
+        "resultados": [r.como_dict() for r in resultados],
+        "vazao": vazao,
+    }
+
+
+def executar_relatorio(edicao, navegador=None, ecoar=False, pool=None):
+    """
+    Gera o relatório de uma edição no processo atual e retorna o ResultadoRelatorio
+    - pool: PoolNavegadores do servidor - o job empresta um Chrome já
+      autenticado em vez de abrir um e fazer login
+    Uso:
+        resultado = executar_relatorio(6197, pool=pool_navegadores)
+        if resultado.sucesso: resultado.caminho_pdf
+    """
+    if navegador is not None or pool is None:
+        return PipelineRelatorio(edicao, navegador=navegador, ecoar=ecoar).executar()
+
+    try:
+        trabalhador = pool.emprestar()
+    except Exception as e:
+        # Sem navegador livre no tempo de espera, ou falha ao abrir/autenticar um novo
+        resultado = ResultadoRelatorio(str(edicao))
+        resultado.etapa_falha = getattr(e, "etapa", None) or "navegador"
+        resultado.erro = str(e)
+        LogRelatorio(str(edicao)).error(f"Nenhum navegador do pool disponível: {e}")
+        return resultado
+
+    # executar() não lança exceção: a falha vem no resultado, e um navegador que
+    # passou por um job com falha (travado, deslogado...) é reciclado, não reaproveitado
+    resultado = None
+    try:
+        resultado = PipelineRelatorio(edicao, navegador=trabalhador.navegador, ecoar=ecoar).executar()
+        return resultado
+    finally:
+        pool.devolver(trabalhador, falhou=resultado is None or not resultado.sucesso)
+
+
+def autenticar_navegador(navegador):
+    """Login do PoolNavegadores: cada Chrome novo já entra no pool com sessão no painel"""
+    PainelSorteios(navegador, LogRelatorio("POOL")).garantir_sessao()
+
+
+def criar_pool_navegadores(tamanho=None):
+    """Pool de navegadores do servidor (um por processo), autenticados no painel"""
+    return PoolNavegadores(CAMINHO_DOWNLOADS, tamanho=tamanho, autenticar=autenticar_navegador)
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Renderizadores do PDF do relatório (tabela de compradores)
+
+Dois backends com a mesma interface (renderizar(titulo, agrupado, caminho_pdf)):
+- "wkhtmltopdf": HTML + wkhtmltopdf via pdfkit (layout original, um processo
+  WebKit por relatório, memória proporcional à tabela inteira)
+- "streaming": escritor de PDF em Python puro, sem dependências, que monta
+  a mesma tabela (cores, larguras, zebra, cabeçalho repetido) e grava cada
+  página no arquivo assim que ela fecha - memória limitada a uma página
+
+Escolha por RENDERIZADOR_PDF: "wkhtmltopdf", "streaming" ou "auto"
+(padrão: wkhtmltopdf quando instalado, senão streaming).
+"""
+
+import logging
+import os
+import threading
+import unicodedata
+import zlib
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+try:
+    import pdfkit
+except ImportError:
+    pdfkit = None
+
+logger = logging.getLogger(__name__)
+
+RENDERIZADOR_PDF = os.getenv('RENDERIZADOR_PDF', 'auto').lower()
+CAMINHO_WKHTMLTOPDF = os.getenv('WKHTMLTOPDF_PATH', "/usr/bin/wkhtmltopdf")
+
+
+class RenderizadorPDF(ABC):
+    """Interface: nome, versao (entra na chave de cache dos artefatos) e renderizar()"""
+
+    nome = None
+    versao = None
+
+    @abstractmethod
+    def renderizar(self, titulo, agrupado, caminho_pdf):
+        """Grava o PDF da tabela em caminho_pdf e retorna o caminho"""
+
+
+# -------------------- wkhtmltopdf --------------------
+def montar_html(titulo, agrupado):
+    return f"""
+<html><head><meta charset="utf-8"><style>
+ body{{font-family:Arial,sans-serif;margin:0;padding:0}}
+ h1{{
+     text-align:center;
+     margin:25px 0 15px 0;
+     font-size:24pt;
+     font-weight:bold;
+     color:#0d47a1;
+ }}
+ table{{width:100%;border-collapse:collapse}}
+ colgroup {{
+     width:100%;
+ }}
+ th,td{{border:1px solid #ddd;padding:8px}}
+ th{{
+     background:#6495ED;           /* cabeçalho */
+     color:#fff;
+     text-align:center;
+     font-size:18pt;               /* +2 pt */
+ }}
+ td{{font-size:16pt}}              /* +1 pt */
+ td:nth-child(2),th:nth-child(2){{text-align:center}}
+ th:first-child,td:first-child{{width:48%;white-space:normal;word-wrap:break-word}}
+ th:nth-child(2),td:nth-child(2){{width:20%}}
+ th:nth-child(3),td:nth-child(3){{width:32%;text-align:center}}
+ tr:nth-child(even) td{{background:#f6f6f6}}  /* zebra */
+</style></head><body>
+<h1>{titulo}</h1>
+{agrupado.to_html(index=False, border=0)}
+</body></html>
+"""
+
+
+def localizar_wkhtmltopdf():
+    """Configuração do pdfkit com o wkhtmltopdf encontrado; None se não houver"""
+    if pdfkit is None:
+        return None
+    if os.path.exists(CAMINHO_WKHTMLTOPDF):
+        logger.info("wkhtmltopdf encontrado no caminho padrão")
+        return pdfkit.configuration(wkhtmltopdf=CAMINHO_WKHTMLTOPDF)
+
+    # Tentar encontrar em outros caminhos comuns
+    caminhos_wkhtml = [
+        "/usr/bin/wkhtmltopdf",
+        "/usr/local/bin/wkhtmltopdf",
+        "/opt/wkhtmltopdf/bin/wkhtmltopdf",
+        "wkhtmltopdf"  # Se estiver no PATH
+    ]
+    for caminho in caminhos_wkhtml:
+        if os.path.exists(caminho) or caminho == "wkhtmltopdf":
+            try:
+                config_pdf = pdfkit.configuration(wkhtmltopdf=caminho)
+            except OSError:
+                continue
+            logger.info(f"wkhtmltopdf encontrado em: {caminho}")
+            return config_pdf
+    return None
+
+
+class RenderizadorWkhtmltopdf(RenderizadorPDF):
+    """HTML da tabela convertido pelo wkhtmltopdf (layout de referência)"""
+
+    nome = "wkhtmltopdf"
+    versao = "wkhtmltopdf-1"
+
+    def __init__(self, config_pdf, pasta_temporaria):
+        self.config_pdf = config_pdf
+        self.pasta_temporaria = pasta_temporaria
+
+    def renderizar(self, titulo, agrupado, caminho_pdf):
+        # Nome temporário único: várias execuções podem rodar no mesmo processo
+        tmp_html = os.path.join(self.pasta_temporaria, f"relatorio_temp_{os.getpid()}_{threading.get_ident()}.html")
+        with open(tmp_html, "w", encoding="utf-8") as f:
+            f.write(montar_html(titulo, agrupado))
+        try:
+            pdfkit.from_file(tmp_html, caminho_pdf, configuration=self.config_pdf)
+        finally:
+            os.remove(tmp_html)
+        return caminho_pdf
+
+
+# -------------------- streaming (Python puro) --------------------
+# Larguras das fontes padrão do PDF (AFM, milésimos do corpo) para ASCII 32..126
+_LARGURAS_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_LARGURAS_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+_FONTES = {"F1": _LARGURAS_HELVETICA, "F2": _LARGURAS_HELVETICA_BOLD}  # F1 normal, F2 negrito
+
+# O wkhtmltopdf desenha a página de 1024 px de largura a 96 dpi encolhida para
+# caber no A4; o mesmo fator aplicado aos tamanhos do CSS dá a mesma proporção
+ESCALA = 0.78
+PX = 0.75 * ESCALA  # 1 px do CSS em pontos do PDF
+
+PAGINA_LARGURA, PAGINA_ALTURA = 595.28, 841.89  # A4
+MARGEM = 28.35  # 10 mm (padrão do wkhtmltopdf)
+FONTE_TITULO, FONTE_CABECALHO, FONTE_CELULA = 24 * ESCALA, 18 * ESCALA, 16 * ESCALA
+ALTURA_LINHA = 1.15  # line-height "normal" da Arial
+PADDING = 8 * PX
+BORDA = 1 * PX
+LARGURAS_COLUNAS = (0.48, 0.20, 0.32)
+ALINHAMENTOS = ("esquerda", "centro", "centro")
+
+COR_TITULO = (0x0d / 255, 0x47 / 255, 0xa1 / 255)
+COR_CABECALHO = (0x64 / 255, 0x95 / 255, 0xed / 255)
+COR_ZEBRA = (0xf6 / 255,) * 3
+COR_BORDA = (0xdd / 255,) * 3
+
+
+def _largura_caractere(caractere, tabela):
+    """Acentuados medem como a letra base; o resto fora do ASCII como a letra n"""
+    codigo = ord(caractere)
+    if not 32 <= codigo <= 126:
+        base = unicodedata.normalize("NFD", caractere)[0]
+        codigo = ord(base) if 32 <= ord(base) <= 126 else ord("n")
+    return tabela[codigo - 32]
+
+
+class _Larguras(dict):
+    """Largura (milésimos do corpo) por caractere, preenchida sob demanda"""
+
+    def __init__(self, tabela):
+        super().__init__((chr(32 + i), largura) for i, largura in enumerate(tabela))
+        self.tabela = tabela
+
+    def __missing__(self, caractere):
+        largura = self[caractere] = _largura_caractere(caractere, self.tabela)
+        return largura
+
+
+_LARGURAS = {fonte: _Larguras(tabela) for fonte, tabela in _FONTES.items()}
+
+
+@lru_cache(maxsize=200_000)
+def _largura(texto, fonte, tamanho):
+    """Largura do texto em pontos"""
+    return sum(map(_LARGURAS[fonte].__getitem__, texto)) * tamanho / 1000
+
+
+def _quebrar(texto, fonte, tamanho, largura):
+    """
+    Quebra em linhas nos espaços, como o navegador (espaços repetidos colapsam);
+    palavras maiores que a coluna são partidas (word-wrap: break-word)
+    """
+    espaco = _largura(" ", fonte, tamanho)
+    linhas, atual, largura_atual = [], [], 0.0
+    for palavra in texto.split():
+        largura_palavra = _largura(palavra, fonte, tamanho)
+        nova = largura_atual + espaco + largura_palavra if atual else largura_palavra
+        if nova <= largura:
+            atual.append(palavra)
+            largura_atual = nova
+            continue
+        if atual:
+            linhas.append(" ".join(atual))
+        while largura_palavra > largura and len(palavra) > 1:
+            corte = len(palavra) - 1
+            while corte > 1 and _largura(palavra[:corte], fonte, tamanho) > largura:
+                corte -= 1
+            linhas.append(palavra[:corte])
+            palavra = palavra[corte:]
+            largura_palavra = _largura(palavra, fonte, tamanho)
+        atual, largura_atual = [palavra], largura_palavra
+    linhas.append(" ".join(atual))
+    return linhas
+
+
+def _texto_pdf(texto):
+    """String literal do PDF em WinAnsiEncoding"""
+    dados = texto.encode("cp1252", errors="replace")
+    return b"(" + dados.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _cor(rgb, operador):
+    return f"{rgb[0]:.3f} {rgb[1]:.3f} {rgb[2]:.3f} {operador}"
+
+
+class _EscritorPDF:
+    """Grava objetos PDF direto no arquivo, guardando só os offsets para o xref"""
+
+    PAGINAS = 1
+    CATALOGO = 2
+    FONTE_NORMAL = 3
+    FONTE_NEGRITO = 4
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self.offsets = {}
+        self.proximo = 5
+        self.paginas = []
+        self.arquivo.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._objeto(self.FONTE_NORMAL, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        self._objeto(self.FONTE_NEGRITO, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+
+    def _objeto(self, numero, corpo):
+        self.offsets[numero] = self.arquivo.tell()
+        self.arquivo.write(f"{numero} 0 obj\n".encode() + corpo + b"\nendobj\n")
+
+    def _novo_numero(self):
+        numero = self.proximo
+        self.proximo += 1
+        return numero
+
+    def pagina(self, conteudo):
+        """Comprime e grava o conteúdo de uma página"""
+        dados = zlib.compress(conteudo, 6)
+        fluxo = self._novo_numero()
+        self._objeto(fluxo, f"<< /Length {len(dados)} /Filter /FlateDecode >>\nstream\n".encode() + dados + b"\nendstream")
+        pagina = self._novo_numero()
+        self._objeto(pagina, (
+            f"<< /Type /Page /Parent {self.PAGINAS} 0 R /MediaBox [0 0 {PAGINA_LARGURA} {PAGINA_ALTURA}] "
+            f"/Resources << /Font << /F1 {self.FONTE_NORMAL} 0 R /F2 {self.FONTE_NEGRITO} 0 R >> >> "
+            f"/Contents {fluxo} 0 R >>"
+        ).encode())
+        self.paginas.append(pagina)
+
+    def fechar(self, titulo):
+        filhos = " ".join(f"{p} 0 R" for p in self.paginas)
+        self._objeto(self.PAGINAS, f"<< /Type /Pages /Kids [{filhos}] /Count {len(self.paginas)} >>".encode())
+        self._objeto(self.CATALOGO, f"<< /Type /Catalog /Pages {self.PAGINAS} 0 R >>".encode())
+        info = self._novo_numero()
+        self._objeto(info, b"<< /Title " + _texto_pdf(titulo) + b" /Producer (relatorio_pipeline) >>")
+
+        inicio_xref = self.arquivo.tell()
+        linhas = [f"xref\n0 {self.proximo}\n", "0000000000 65535 f \n"]
+        for numero in range(1, self.proximo):
+            linhas.append(f"{self.offsets[numero]:010d} 00000 n \n")
+        linhas.append(f"trailer\n<< /Size {self.proximo} /Root {self.CATALOGO} 0 R /Info {info} 0 R >>\n")
+        linhas.append(f"startxref\n{inicio_xref}\n%%EOF\n")
+        self.arquivo.write("".join(linhas).encode())
+
+
+class _TabelaPDF:
+    """
+    Estado de um único render (página atual, posição, conteúdo pendente)
+    Criado dentro de renderizar(): o renderizador é compartilhado pelo
+    processo e vários relatórios podem ser desenhados ao mesmo tempo
+    """
+
+    def __init__(self, escritor, colunas, titulos_colunas):
+        self.escritor = escritor
+        self.colunas = colunas
+        self.titulos_colunas = titulos_colunas
+        self.conteudo = []
+        self.y = PAGINA_ALTURA - MARGEM
+        self.so_cabecalho = False
+
+    def desenhar(self, titulo, agrupado):
+        # Título (só na primeira página), como o <h1>
+        self.y -= 25 * PX
+        for linha in _quebrar(titulo, "F2", FONTE_TITULO, PAGINA_LARGURA - 2 * MARGEM):
+            self.y -= FONTE_TITULO * ALTURA_LINHA
+            largura = _largura(linha, "F2", FONTE_TITULO)
+            self._texto(linha, "F2", FONTE_TITULO, (PAGINA_LARGURA - largura) / 2, self.y, COR_TITULO)
+        self.y -= 15 * PX
+        self._cabecalho()
+
+        for indice, valores in enumerate(agrupado.itertuples(index=False, name=None)):
+            celulas = [self._celula(v, col) for col, v in enumerate(valores)]
+            self._linha(celulas, COR_ZEBRA if indice % 2 == 1 else None)
+
+        self.escritor.pagina("\n".join(self.conteudo).encode("latin-1"))
+
+    def _celula(self, valor, coluna):
+        texto = "NaN" if valor is None or valor != valor else str(valor)  # to_html mostra NaN
+        return _quebrar(texto, "F1", FONTE_CELULA, self.colunas[coluna][1] - 2 * PADDING)
+
+    def _nova_pagina(self):
+        """Grava a página atual e começa outra repetindo o cabeçalho (como o thead no wkhtmltopdf)"""
+        self.escritor.pagina("\n".join(self.conteudo).encode("latin-1"))
+        self.conteudo = []
+        self.y = PAGINA_ALTURA - MARGEM
+        self._cabecalho()
+
+    def _cabecalho(self):
+        celulas = [
+            _quebrar(texto, "F2", FONTE_CABECALHO, largura - 2 * PADDING)
+            for texto, (_, largura) in zip(self.titulos_colunas, self.colunas)
+        ]
+        altura = max(len(c) for c in celulas) * FONTE_CABECALHO * ALTURA_LINHA + 2 * PADDING
+        self._caixa(altura, celulas, "F2", FONTE_CABECALHO, COR_CABECALHO, (1, 1, 1), ("centro",) * 3)
+        self.so_cabecalho = True
+
+    def _linha(self, celulas, fundo):
+        """
+        Desenha uma linha da tabela; se não couber, vai inteira para a próxima
+        página - só é partida quando é maior que uma página
+        """
+        entrelinha = FONTE_CELULA * ALTURA_LINHA
+        while celulas:
+            total = max(len(c) for c in celulas)
+            cabem = int((self.y - MARGEM - 2 * PADDING) // entrelinha)
+            if cabem < total and (not self.so_cabecalho or cabem < 1):
+                self._nova_pagina()
+                continue
+            usar = min(total, cabem)
+            self._caixa(usar * entrelinha + 2 * PADDING, [c[:usar] for c in celulas],
+                        "F1", FONTE_CELULA, fundo, (0, 0, 0), ALINHAMENTOS)
+            self.so_cabecalho = False
+            celulas = [c[usar:] for c in celulas] if usar < total else []
+
+    def _caixa(self, altura, celulas, fonte, tamanho, fundo, cor_texto, alinhamentos):
+        topo = self.y
+        base = topo - altura
+        comandos = self.conteudo
+        if fundo is not None:
+            comandos.append(_cor(fundo, "rg"))
+            comandos.append(f"{MARGEM:.2f} {base:.2f} {PAGINA_LARGURA - 2 * MARGEM:.2f} {altura:.2f} re f")
+        comandos.append(f"{_cor(COR_BORDA, 'RG')} {BORDA:.2f} w")
+        for x, largura in self.colunas:
+            comandos.append(f"{x:.2f} {base:.2f} {largura:.2f} {altura:.2f} re S")
+        entrelinha = tamanho * ALTURA_LINHA
+        for (x, largura), linhas, alinhamento in zip(self.colunas, celulas, alinhamentos):
+            y = topo - PADDING
+            for linha in linhas:
+                y -= entrelinha
+                if alinhamento == "centro":
+                    x_texto = x + (largura - _largura(linha, fonte, tamanho)) / 2
+                else:
+                    x_texto = x + PADDING
+                self._texto(linha, fonte, tamanho, x_texto, y + (entrelinha - tamanho) / 2 + tamanho * 0.21, cor_texto)
+        self.y = base
+
+    def _texto(self, texto, fonte, tamanho, x, y, cor):
+        self.conteudo.append(
+            f"BT {_cor(cor, 'rg')} /{fonte} {tamanho:.2f} Tf {x:.2f} {y:.2f} Td "
+            + _texto_pdf(texto).decode("latin-1") + " Tj ET"
+        )
+
+
+class RenderizadorStreaming(RenderizadorPDF):
+    """
+    Tabela desenhada direto em PDF, página a página, com o layout do HTML:
+    título azul centralizado, cabeçalho azul repetido em cada página,
+    colunas 48/20/32%, bordas cinza, zebra nas linhas pares e quebra de texto
+    Sem estado por relatório: seguro para renders simultâneos na mesma instância
+    """
+
+    nome = "streaming"
+    versao = "streaming-1"
+
+    def __init__(self):
+        largura_util = PAGINA_LARGURA - 2 * MARGEM
+        colunas = []
+        x = MARGEM
+        for proporcao in LARGURAS_COLUNAS:
+            colunas.append((x, largura_util * proporcao))
+            x += largura_util * proporcao
+        self.colunas = tuple(colunas)
+
+    def renderizar(self, titulo, agrupado, caminho_pdf):
+        temporario = f"{caminho_pdf}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporario, "wb") as arquivo:
+                escritor = _EscritorPDF(arquivo)
+                tabela = _TabelaPDF(escritor, self.colunas, [str(c) for c in agrupado.columns])
+                tabela.desenhar(str(titulo), agrupado)
+                escritor.fechar(str(titulo))
+            os.replace(temporario, caminho_pdf)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        return caminho_pdf
+
+
+# -------------------- seleção --------------------
+_renderizador = None
+_renderizador_resolvido = False
+_lock = threading.Lock()
+
+
+def obter_renderizador(pasta_temporaria, log=None):
+    """
+    Renderizador configurado em RENDERIZADOR_PDF (resolvido uma vez por processo)
+    Retorna None só se "wkhtmltopdf" for exigido e não estiver instalado
+    """
+    global _renderizador, _renderizador_resolvido
+    log = log or logger
+    with _lock:
+        if _renderizador_resolvido:
+            return _renderizador
+
+        renderizador = None
+        if RENDERIZADOR_PDF in ("auto", "wkhtmltopdf"):
+            config_pdf = localizar_wkhtmltopdf()
+            if config_pdf is not None:
+                renderizador = RenderizadorWkhtmltopdf(config_pdf, pasta_temporaria)
+            elif RENDERIZADOR_PDF == "wkhtmltopdf":
+                log.warning("wkhtmltopdf não encontrado. PDF não será gerado.")
+            else:
+                log.warning("wkhtmltopdf não encontrado - usando o renderizador streaming")
+        if renderizador is None and RENDERIZADOR_PDF in ("auto", "streaming"):
+            renderizador = RenderizadorStreaming()
+        if renderizador is None and RENDERIZADOR_PDF not in ("auto", "wkhtmltopdf", "streaming"):
+            log.warning(f"RENDERIZADOR_PDF '{RENDERIZADOR_PDF}' desconhecido - usando streaming")
+            renderizador = RenderizadorStreaming()
+
+        if renderizador is not None:
+            log.info(f"Renderizador de PDF: {renderizador.nome}")
+        _renderizador = renderizador
+        _renderizador_resolvido = True
+        return renderizador
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistência da sessão autenticada do painel Litoral da Sorte
+
+Guarda cookies e localStorage após um login completo para que as próximas
+execuções abram direto a página de sorteios enquanto a sessão for válida.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+SESSAO_CONFIG = {
+    'pasta': os.getenv('PAINEL_PERFIL_DIR', os.path.join(os.getcwd(), "perfil_painel")),
+    'validade_horas': float(os.getenv('PAINEL_SESSAO_VALIDADE_HORAS', 8)),
+}
+
+
+def caminho_sessao(pasta=None):
+    return os.path.join(pasta or SESSAO_CONFIG['pasta'], "sessao_painel.json")
+
+
+def _origem(url):
+    partes = urlsplit(url)
+    return f"{partes.scheme}://{partes.netloc}"
+
+
+def salvar_sessao(navegador, url_sorteios, pasta=None):
+    """Grava cookies + localStorage da sessão atual (escrita atômica)"""
+    try:
+        cookies = navegador.get_cookies()
+        local_storage = navegador.execute_script(
+            "var d = {}; for (var i = 0; i < localStorage.length; i++) {"
+            " var k = localStorage.key(i); d[k] = localStorage.getItem(k); } return d;"
+        ) or {}
+    except Exception as e:
+        logger.warning(f"Não foi possível capturar a sessão do painel: {e}")
+        return False
+
+    agora = time.time()
+    expira_em = agora + SESSAO_CONFIG['validade_horas'] * 3600
+    # Se algum cookie expira antes, a sessão expira junto
+    expiracoes = [c['expiry'] for c in cookies if c.get('expiry')]
+    if expiracoes:
+        expira_em = min(expira_em, min(expiracoes))
+
+    sessao = {
+        "salva_em": agora,
+        "expira_em": expira_em,
+        "origem": _origem(url_sorteios),
+        "url_sorteios": url_sorteios,
+        "cookies": cookies,
+        "local_storage": local_storage,
+    }
+
+    arquivo = caminho_sessao(pasta)
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    temporario = f"{arquivo}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(sessao, f)
+    os.replace(temporario, arquivo)
+    logger.info(f"Sessão do painel salva ({len(cookies)} cookies, expira em {(expira_em - agora) / 3600:.1f}h)")
+    return True
+
+
+def carregar_sessao(pasta=None):
+    """Retorna a sessão salva se ainda estiver dentro da validade, senão None"""
+    arquivo = caminho_sessao(pasta)
+    try:
+        with open(arquivo, encoding="utf-8") as f:
+            sessao = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if sessao.get("expira_em", 0) <= time.time():
+        logger.info("Sessão do painel expirada")
+        return None
+    return sessao
+
+
+def descartar_sessao(pasta=None):
+    """Remove a sessão salva (ex.: painel rejeitou os cookies)"""
+    try:
+        os.remove(caminho_sessao(pasta))
+    except OSError:
+        pass
+
+
+def restaurar_sessao(navegador, sessao):
+    """
+    Injeta cookies e localStorage e abre direto a página de sorteios
+    Retorna False se não foi possível restaurar (chamador faz login completo)
+    """
+    try:
+        # Cookies só podem ser definidos estando no domínio
+        navegador.get(sessao["origem"])
+        for cookie in sessao.get("cookies", []):
+            cookie = {k: v for k, v in cookie.items() if k in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")}
+            try:
+                navegador.add_cookie(cookie)
+            except Exception:
+                cookie.pop("sameSite", None)
+                cookie.pop("domain", None)
+                navegador.add_cookie(cookie)
+        for chave, valor in sessao.get("local_storage", {}).items():
+            navegador.execute_script("localStorage.setItem(arguments[0], arguments[1]);", chave, valor)
+        navegador.get(sessao["url_sorteios"])
+        return True
+    except Exception as e:
+        logger.warning(f"Falha ao restaurar sessão do painel: {e}")
+        return False
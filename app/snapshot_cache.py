@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de snapshot compartilhado entre todos os clientes do dashboard
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+
+def _serializar_padrao(dados):
+    return json.dumps(dados, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+
+
+class Snapshot:
+    """Resultado pronto para servir: dados, corpo serializado, ETag e versão"""
+
+    __slots__ = ('dados', 'corpo', 'etag', 'versao', 'gerado_em')
+
+    def __init__(self, dados, corpo, etag, versao, gerado_em):
+        self.dados = dados
+        self.corpo = corpo
+        self.etag = etag
+        self.versao = versao
+        self.gerado_em = gerado_em
+
+
+class SnapshotCache:
+    """
+    Calcula o snapshot no máximo uma vez por intervalo (ttl) e o serve
+    a todos os clientes. Requisições simultâneas com o cache vencido
+    aguardam um único cálculo em vez de consultarem o banco cada uma.
+    """
+
+    def __init__(self, produtor, ttl=10, serializar=None):
+        self.produtor = produtor
+        self.ttl = ttl
+        self.serializar = serializar or _serializar_padrao
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._geracao = 0  # incrementada a cada invalidação
+        self._versao = 0  # incrementada apenas quando o conteúdo muda
+        self._ultima_etag = None
+
+    def _valido(self, snapshot):
+        return snapshot is not None and (time.monotonic() - snapshot.gerado_em) < self.ttl
+
+    def obter(self):
+        """Retorna o snapshot atual, recalculando se estiver vencido ou invalidado"""
+        snapshot = self._snapshot
+        if self._valido(snapshot):
+            return snapshot
+
+        with self._lock:
+            # Outro thread pode ter recalculado enquanto esperávamos o lock
+            snapshot = self._snapshot
+            if self._valido(snapshot):
+                return snapshot
+
+            geracao = self._geracao
+            dados = self.produtor()
+            corpo = self.serializar(dados)
+            etag = '"' + hashlib.sha256(corpo).hexdigest()[:32] + '"'
+            if etag != self._ultima_etag:
+                self._ultima_etag = etag
+                self._versao += 1
+            snapshot = Snapshot(dados, corpo, etag, self._versao, time.monotonic())
+            # Só publica se ninguém invalidou durante o cálculo
+            if geracao == self._geracao:
+                self._snapshot = snapshot
+            return snapshot
+
+    def invalidar(self):
+        """Descarta o snapshot atual; o próximo acesso recalcula"""
+        self._geracao += 1
+        self._snapshot = None
+
+
+def etag_corresponde(if_none_match, etag):
+    """Verifica se o cabeçalho If-None-Match contém a ETag informada"""
+    if not if_none_match or not etag:
+        return False
+    for candidata in if_none_match.split(','):
+        candidata = candidata.strip()
+        if candidata == '*':
+            return True
+        if candidata.startswith('W/'):
+            candidata = candidata[2:]
+        if candidata == etag:
+            return True
+    return False
@@ -1,17 +1,19 @@
 from fastapi import FastAPI, HTTPException, Body, UploadFile, File, Form, Query, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from typing import Optional, List
 import os
 import sys
+import json
 import subprocess
 import logging
+import threading
 from pymysql.cursors import DictCursor
 import pymysql
-from datetime import datetime, timedelta
+from datetime import datetime
 from dotenv import load_dotenv
-import unidecode
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -36,8 +38,44 @@ except ImportError:
         'autocommit': True
     }
 
+from db_pool import criar_pool_padrao
+from snapshot_cache import SnapshotCache, etag_corresponde
+from eventos_dashboard import DifusorEventos
+from indice_pdfs import IndicePDFs
+from relatorio_pipeline import executar_relatorio, criar_pool_navegadores
+from coalescedor_relatorios import CoalescedorRelatorios
+from agenda_sorteios import agenda_sorteios
+from consulta_dashboard import montar_consulta_extracoes
+
+# Pool compartilhado: evita handshake TCP+TLS+auth a cada requisição do dashboard
+db_pool = criar_pool_padrao(DB_CONFIG)
+
+# Índice dos PDFs da pasta downloads (compartilhada com o container do webhook)
+CAMINHO_DOWNLOADS = os.getenv('DOWNLOAD_PATH', os.path.join(os.getcwd(), "downloads"))
+indice_pdfs = IndicePDFs(CAMINHO_DOWNLOADS)
+
+# Uma execução por edição (inclusive entre este container e o do webhook) + cache curto do resultado
+coalescedor_relatorios = CoalescedorRelatorios(CAMINHO_DOWNLOADS)
+
+# Chrome(s) já autenticados no painel, emprestados aos relatórios (NAVEGADOR_POOL_TAMANHO)
+pool_navegadores = criar_pool_navegadores()
+
 app = FastAPI(title="Dashboard API", version="1.0.0")
 
+@app.on_event("startup")
+def iniciar_pool():
+    """Pré-abre as conexões mínimas do pool, carrega o índice de PDFs e aquece os navegadores"""
+    db_pool.preencher()
+    indice_pdfs.iniciar_observador()
+    # Chrome + login levam alguns segundos: aquece em segundo plano sem atrasar o startup
+    threading.Thread(target=pool_navegadores.iniciar, name="pool-navegadores", daemon=True).start()
+
+@app.on_event("shutdown")
+def encerrar_pool():
+    """Fecha as conexões livres do pool e os navegadores"""
+    db_pool.fechar_todas()
+    pool_navegadores.encerrar()
+
 # Servir arquivos estáticos
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -46,153 +84,68 @@ def serve_dashboard():
     """Serve a página principal do dashboard"""
     return FileResponse("static/dashboard.html")
 
-@app.get("/api/dashboard/extracoes-recentes")
-def obter_extracoes_recentes():
+def calcular_extracoes_recentes():
     """
     Retorna apenas as extrações ATIVAS para exibir no dashboard
-    - Filtra apenas rifas com status_rifa = 'ativo'
-    - Remove rifas que atingiram 100% há mais de 11 horas do horário de fechamento
-    - Independente da data
+    - Rifas em andamento ou com erro, independente da data
+    - Rifas em 100%/concluídas só até 30 minutos após o horário de fechamento
+    - Filtro feito no banco (consulta_dashboard.montar_consulta_extracoes)
     """
     try:
-        connection = pymysql.connect(**DB_CONFIG)
-        cursor = connection.cursor(DictCursor)
-        
-        # Buscar todas as extrações ativas (sem filtro de data)
-        cursor.execute("""
-            SELECT 
-                ec.id,
-                ec.edicao,
-                ec.sigla_oficial,
-                ec.extracao,
-                ec.link,
-                ec.status_cadastro,
-                ec.status_link,
-                ec.error_msg,
-                ec.andamento,
-                ec.status_rifa,
-                ec.data_sorteio,
-                p.horario
-            FROM extracoes_cadastro ec
-            LEFT JOIN premiacoes p ON ec.extracao = p.sigla
-            WHERE ec.status_rifa IN ('ativo', 'concluído', 'error')
-            AND ec.link IS NOT NULL 
-            AND ec.link != ''
-            ORDER BY ec.edicao ASC
-        """)
-        
-        extracoes_raw = cursor.fetchall()
-        extracoes_validas = []
-        
         # Configurar timezone local (America/Sao_Paulo)
         import pytz
         tz_local = pytz.timezone('America/Sao_Paulo')
         agora = datetime.now(tz_local)
         
-        for extracao in extracoes_raw:
-            andamento_raw = extracao['andamento'] if extracao and 'andamento' in extracao else None
-            if andamento_raw and isinstance(andamento_raw, str) and andamento_raw.strip():
-                extracao['andamento_percentual'] = andamento_raw
-            else:
-                extracao['andamento_percentual'] = '0%'
-                
-            tem_erro_x = extracao['andamento_percentual'] == 'X'
-            percentual_str = extracao['andamento_percentual'].replace('%', '')
-            
-            try:
-                if tem_erro_x:
-                    extracao['andamento_numerico'] = 0
+        with db_pool.conexao() as connection:
+            # Horários de fechamento já convertidos (agenda recarregada de premiacoes por intervalo)
+            agenda_sorteios.atualizar_se_vencida(connection)
+            cursor = connection.cursor(DictCursor)
+        
+            # Regra de exibição avaliada no banco: só voltam as extrações visíveis agora
+            sql, parametros = montar_consulta_extracoes(
+                agora, agenda_sorteios.horarios(), agenda_sorteios.siglas_horario_invalido()
+            )
+            cursor.execute(sql, parametros)
+        
+            extracoes_validas = list(cursor.fetchall())
+        
+            for extracao in extracoes_validas:
+                andamento_raw = extracao['andamento'] if extracao and 'andamento' in extracao else None
+                if andamento_raw and isinstance(andamento_raw, str) and andamento_raw.strip():
+                    extracao['andamento_percentual'] = andamento_raw
                 else:
-                    extracao['andamento_numerico'] = int(percentual_str)
-            except:
-                extracao['andamento_numerico'] = 0
+                    extracao['andamento_percentual'] = '0%'
                 
-            if (extracao.get('status_rifa') == 'error' if extracao else False) or tem_erro_x:
-                extracao['deve_exibir'] = True
-            elif extracao['andamento_numerico'] < 100 and (extracao.get('status_rifa') != 'concluído' if extracao else True):
-                extracao['deve_exibir'] = True
-            else:
-                data_sorteio = extracao['data_sorteio'] if extracao and 'data_sorteio' in extracao else None
-                horario_str = extracao['horario'] if extracao and 'horario' in extracao else None
-                
-                if horario_str and data_sorteio:
-                    try:
-                        if isinstance(data_sorteio, str):
-                            data_obj = datetime.strptime(data_sorteio, '%Y-%m-%d')
-                        else:
-                            from datetime import date
-                            if isinstance(data_sorteio, date):
-                                data_obj = datetime.combine(data_sorteio, datetime.min.time())
-                            else:
-                                data_obj = data_sorteio
-                                
-                        horario_clean = horario_str.strip()
-                        if 'AM' in horario_clean or 'PM' in horario_clean:
-                            time_obj = datetime.strptime(horario_clean, '%I:%M %p')
-                            hora = time_obj.hour
-                            minuto = time_obj.minute
-                        else:
-                            horario_parts = horario_clean.split(':')
-                            hora = int(horario_parts[0])
-                            minuto = int(horario_parts[1]) if len(horario_parts) > 1 else 0
-                            
-                        fechamento = data_obj.replace(hour=hora, minute=minuto, second=0)
-                        # Garantir que o fechamento tenha timezone info
-                        if fechamento.tzinfo is None:
-                            fechamento = tz_local.localize(fechamento)
-                        
-                        limite_exibicao = fechamento + timedelta(minutes=30)  # 30 minutos após fechamento
-                        extracao['deve_exibir'] = agora <= limite_exibicao
-                    except Exception as e:
-                        print(f"Erro ao processar horário para edição {extracao['edicao'] if extracao and 'edicao' in extracao else ''}: {e}")
-                        extracao['deve_exibir'] = True
-                else:
-                    extracao['deve_exibir'] = False
-                    
-            if extracao['deve_exibir']:
                 tem_erro_x = extracao['andamento_percentual'] == 'X'
+                extracao['andamento_numerico'] = int(extracao['andamento_numerico'] or 0)
+                extracao['deve_exibir'] = True
                 extracao['tem_erro'] = (extracao['status_cadastro'] == 'error' if extracao and 'status_cadastro' in extracao else False) or (extracao.get('status_rifa') == 'error' if extracao else False) or tem_erro_x
                 extracao['status_rifa_atual'] = extracao.get('status_rifa', 'ativo') if extracao else 'ativo'
-                
-                cursor.execute("""
-                    SELECT imagem_path 
-                    FROM premiacoes 
-                    WHERE sigla = %s 
-                    LIMIT 1
-                """, (extracao['extracao'] if extracao and 'extracao' in extracao else None,))
-                
-                premiacao = cursor.fetchone()
-                if premiacao and 'imagem_path' in premiacao and premiacao['imagem_path']:
-                    extracao['imagem_path'] = premiacao['imagem_path']
-                else:
+            
+                # imagem_path já vem do LEFT JOIN com premiacoes (sem consulta por linha)
+                if not extracao.get('imagem_path'):
                     extracao['imagem_path'] = None
-                    
+                
                 if extracao['andamento_numerico'] == 100:
-                    titulo_simulado = f"{extracao['sigla_oficial']} RJ Edição {extracao['edicao']}" if extracao and 'sigla_oficial' in extracao and 'edicao' in extracao else ''
-                    titulo_modificado = unidecode.unidecode(titulo_simulado.lower().replace(" ", "-"))
-                    nome_arquivo = f"relatorio-vendas-{titulo_modificado}.pdf"
-                    caminho_pdf = os.path.join(os.getcwd(), "downloads", nome_arquivo)
-                    extracao['tem_pdf'] = os.path.exists(caminho_pdf)
+                    extracao['tem_pdf'] = indice_pdfs.existe(extracao['edicao'])
                 else:
                     extracao['tem_pdf'] = False
-                    
-                extracoes_validas.append(extracao)
                 
-        data_atual = datetime.now(tz_local)
-        dias_semana = {
-            0: 'Segunda-feira',
-            1: 'Terça-feira', 
-            2: 'Quarta-feira',
-            3: 'Quinta-feira',
-            4: 'Sexta-feira',
-            5: 'Sábado',
-            6: 'Domingo'
-        }
-        dia_semana = dias_semana[data_atual.weekday()]
-        data_formatada = f"{dia_semana}, {data_atual.strftime('%d/%m/%Y')}"
+            data_atual = datetime.now(tz_local)
+            dias_semana = {
+                0: 'Segunda-feira',
+                1: 'Terça-feira', 
+                2: 'Quarta-feira',
+                3: 'Quinta-feira',
+                4: 'Sexta-feira',
+                5: 'Sábado',
+                6: 'Domingo'
+            }
+            dia_semana = dias_semana[data_atual.weekday()]
+            data_formatada = f"{dia_semana}, {data_atual.strftime('%d/%m/%Y')}"
         
-        cursor.close()
-        connection.close()
+            cursor.close()
         
         return {
             "data_recente": data_formatada,
@@ -203,6 +156,28 @@ def obter_extracoes_recentes():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar extrações ativas: {str(e)}")
 
+def _serializar_json(dados):
+    return json.dumps(jsonable_encoder(dados), ensure_ascii=False).encode('utf-8')
+
+# Snapshot único servido a todos os clientes (recalculado no máximo uma vez por intervalo)
+snapshot_extracoes = SnapshotCache(
+    calcular_extracoes_recentes,
+    ttl=float(os.getenv('DASHBOARD_SNAPSHOT_TTL', 10)),
+    serializar=_serializar_json
+)
+
+@app.get("/api/dashboard/extracoes-recentes")
+def obter_extracoes_recentes(request: Request):
+    """
+    Retorna o snapshot das extrações ativas com ETag
+    - Clientes que enviam If-None-Match com a ETag atual recebem 304 sem corpo
+    """
+    snapshot = snapshot_extracoes.obter()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "X-Dashboard-Versao": str(snapshot.versao)}
+    if etag_corresponde(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.corpo, media_type="application/json", headers=headers)
+
 @app.post("/api/dashboard/enviar-link-edicao/{edicao}")
 def enviar_link_edicao(edicao: int):
     """
@@ -210,41 +185,40 @@ def enviar_link_edicao(edicao: int):
     """
     try:
         # Buscar informações da edição
-        connection = pymysql.connect(**DB_CONFIG)
-        cursor = connection.cursor(DictCursor)
-        
-        cursor.execute("""
-            SELECT 
-                id,
-                edicao,
-                sigla_oficial,
-                extracao,
-                link
-            FROM extracoes_cadastro 
-            WHERE edicao = %s
-            LIMIT 1
-        """, (edicao,))
-        
-        extracao = cursor.fetchone()
-        
-        if not extracao:
-            raise HTTPException(status_code=404, detail=f"Edição {edicao} não encontrada")
-        
-        # Buscar imagem da premiação
-        cursor.execute("""
-            SELECT imagem_path 
-            FROM premiacoes 
-            WHERE sigla = %s 
-            LIMIT 1
-        """, (extracao['extracao'],))
-        premiacao = cursor.fetchone()
-        if premiacao and premiacao['imagem_path']:
-            extracao['imagem_path'] = premiacao['imagem_path']
-        else:
-            extracao['imagem_path'] = None
+        with db_pool.conexao() as connection:
+            cursor = connection.cursor(DictCursor)
+        
+            cursor.execute("""
+                SELECT 
+                    id,
+                    edicao,
+                    sigla_oficial,
+                    extracao,
+                    link
+                FROM extracoes_cadastro 
+                WHERE edicao = %s
+                LIMIT 1
+            """, (edicao,))
+        
+            extracao = cursor.fetchone()
+        
+            if not extracao:
+                raise HTTPException(status_code=404, detail=f"Edição {edicao} não encontrada")
+        
+            # Buscar imagem da premiação
+            cursor.execute("""
+                SELECT imagem_path 
+                FROM premiacoes 
+                WHERE sigla = %s 
+                LIMIT 1
+            """, (extracao['extracao'],))
+            premiacao = cursor.fetchone()
+            if premiacao and premiacao['imagem_path']:
+                extracao['imagem_path'] = premiacao['imagem_path']
+            else:
+                extracao['imagem_path'] = None
         
-        cursor.close()
-        connection.close()
+            cursor.close()
         
         # Executar o script de envio para esta edição específica
         script_path = os.path.join("scripts", "novo_chamadas_group_latest.py")
@@ -262,6 +236,9 @@ def enviar_link_edicao(edicao: int):
             timeout=60,  # 1 minuto timeout
             env=os.environ.copy()
         )
+        # Status de envio pode ter mudado: próximo acesso recalcula o snapshot
+        snapshot_extracoes.invalidar()
+        difusor_eventos.notificar()
         
         if resultado.returncode == 0:
             return {
@@ -287,99 +264,70 @@ def enviar_link_edicao(edicao: int):
 def gerar_relatorio(edicao: int):
     """Endpoint para gerar relatório PDF de uma edição que atingiu 100%"""
     try:
-        connection = pymysql.connect(**DB_CONFIG)
-        cursor = connection.cursor(DictCursor)
-        cursor.execute("""
-            SELECT andamento, sigla_oficial 
-            FROM extracoes_cadastro 
-            WHERE edicao = %s
-        """, (edicao,))
-        result = cursor.fetchone()
-        cursor.close()
-        connection.close()
+        with db_pool.conexao() as connection:
+            cursor = connection.cursor(DictCursor)
+            cursor.execute("""
+                SELECT andamento, sigla_oficial 
+                FROM extracoes_cadastro 
+                WHERE edicao = %s
+            """, (edicao,))
+            result = cursor.fetchone()
+            cursor.close()
         
         andamento = result['andamento'] if result and 'andamento' in result else None
         if not result or not andamento or andamento.strip() != '100%':
             raise HTTPException(status_code=400, detail="Relatório só pode ser gerado para rifas 100% vendidas")
             
-        script_path = "relatorio_v2_vps.py"
-        if not os.path.exists(script_path):
-            raise HTTPException(status_code=404, detail="Script de relatório não encontrado")
-            
         logger.info(f"Iniciando geração de relatório para edição {edicao}")
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        
-        result_proc = subprocess.run(
-            [sys.executable, script_path, str(edicao)],
-            cwd=os.getcwd(),
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            timeout=300,  # 5 minutos timeout
-            env=env
+        # Pipeline roda no próprio processo (endpoint síncrono = thread do threadpool);
+        # com um Chrome já autenticado emprestado do pool; pedidos simultâneos da mesma
+        # edição compartilham a mesma execução
+        resultado, origem = coalescedor_relatorios.executar(
+            edicao, lambda: executar_relatorio(edicao, pool=pool_navegadores).como_dict()
         )
-        
-        if result_proc.returncode == 0:
-            logger.info(f"Relatório gerado com sucesso para edição {edicao}")
+
+        # Novo PDF/status: atualiza o índice e o próximo acesso recalcula o snapshot
+        if origem != "cache":
+            if resultado.get('caminho_pdf'):
+                indice_pdfs.registrar(resultado['caminho_pdf'])
+            snapshot_extracoes.invalidar()
+            difusor_eventos.notificar()
+        
+        if resultado.get('sucesso'):
+            logger.info(f"Relatório para edição {edicao} disponível ({origem})")
             return {
                 "success": True,
                 "message": f"Relatório para edição {edicao} gerado com sucesso",
                 "edicao": edicao,
-                "output": result_proc.stdout
+                "origem": origem,
+                "resultado": resultado
             }
         else:
-            logger.error(f"Erro ao gerar relatório para edição {edicao}: {result_proc.stderr}")
+            logger.error(f"Erro ao gerar relatório para edição {edicao} (etapa {resultado.get('etapa_falha')}): {resultado.get('erro')}")
             raise HTTPException(
-                status_code=500,
-                detail=f"Erro ao gerar relatório: {result_proc.stderr}"
+                status_code=404 if resultado.get('etapa_falha') == "busca" else 500,
+                detail=f"Erro ao gerar relatório: {resultado.get('erro')}"
             )
     except HTTPException:
         raise
-    except subprocess.TimeoutExpired:
-        logger.error(f"Timeout ao gerar relatório para edição {edicao}")
-        raise HTTPException(status_code=500, detail="Timeout ao gerar relatório (5 minutos)")
     except Exception as e:
         logger.error(f"Erro inesperado ao gerar relatório: {e}")
         raise HTTPException(status_code=500, detail=f"Erro inesperado: {str(e)}")
 
 @app.get("/api/dashboard/verificar-pdf/{edicao}")
 def verificar_pdf(edicao: int):
-    """Verifica se o PDF da edição existe"""
+    """Verifica se o PDF da edição existe (consulta o índice em memória)"""
     try:
-        # Buscar título da edição no banco para montar nome do arquivo
-        connection = pymysql.connect(**DB_CONFIG)
-        cursor = connection.cursor(DictCursor)
-        
-        cursor.execute("""
-            SELECT sigla_oficial 
-            FROM extracoes_cadastro 
-            WHERE edicao = %s
-        """, (edicao,))
-        
-        result = cursor.fetchone()
-        cursor.close()
-        connection.close()
-        
-        if not result:
+        pdf = indice_pdfs.obter(edicao)
+        if not pdf:
             return {"existe": False, "nome_arquivo": None}
         
-        sigla = result['sigla_oficial']
-        
-        # Simular o padrão de nome que o script cria
-        # Por exemplo: relatorio-vendas-ppt-rj-edicao-6197.pdf
-        titulo_simulado = f"{sigla} RJ Edição {edicao}"
-        titulo_modificado = unidecode.unidecode(titulo_simulado.lower().replace(" ", "-"))
-        nome_arquivo = f"relatorio-vendas-{titulo_modificado}.pdf"
-        
-        # Verificar se existe no diretório de downloads
-        caminho_pdf = os.path.join(os.getcwd(), "downloads", nome_arquivo)
-        existe = os.path.exists(caminho_pdf)
-        
         return {
-            "existe": existe,
-            "nome_arquivo": nome_arquivo if existe else None,
-            "caminho": caminho_pdf if existe else None
+            "existe": True,
+            "nome_arquivo": pdf['nome_arquivo'],
+            "caminho": pdf['caminho'],
+            "tamanho": pdf['tamanho'],
+            "modificado_em": datetime.fromtimestamp(pdf['mtime']).isoformat()
         }
         
     except Exception as e:
@@ -419,21 +367,20 @@ def obter_status_monitor_andamento():
     """
     ativo = False  # Initialize ativo to prevent potential UnboundLocalError
     try:
-        connection = pymysql.connect(**DB_CONFIG)
-        cursor = connection.cursor(DictCursor)
-
-        # Buscar último log de sucesso
-        cursor.execute("""
-            SELECT data_hora, log_status
-            FROM logs_andamento
-            WHERE log_status = 'success'
-            ORDER BY data_hora DESC
-            LIMIT 1
-        """)
-
-        resultado = cursor.fetchone()
-        cursor.close()
-        connection.close()
+        with db_pool.conexao() as connection:
+            cursor = connection.cursor(DictCursor)
+
+            # Buscar último log de sucesso
+            cursor.execute("""
+                SELECT data_hora, log_status
+                FROM logs_andamento
+                WHERE log_status = 'success'
+                ORDER BY data_hora DESC
+                LIMIT 1
+            """)
+
+            resultado = cursor.fetchone()
+            cursor.close()
 
         if not resultado:
             return {
@@ -494,6 +441,50 @@ def obter_status_monitor_andamento():
             "minutos_desde_ultima": None
         }
 
+@app.get("/api/dashboard/versao")
+def obter_versao_dashboard():
+    """
+    Retorna a versão atual do estado do dashboard
+    - A versão só avança quando o conteúdo do snapshot muda
+    - Clientes buscam a lista completa apenas quando a versão muda
+    """
+    snapshot = snapshot_extracoes.obter()
+    return Response(
+        content=json.dumps({"versao": snapshot.versao, "etag": snapshot.etag}),
+        media_type="application/json",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+# Produtor único de eventos: consulta o estado e envia diffs a todos os navegadores
+difusor_eventos = DifusorEventos(
+    obter_snapshot=snapshot_extracoes.obter,
+    obter_monitor=obter_status_monitor_andamento,
+    invalidar_snapshot=snapshot_extracoes.invalidar,
+    serializar=_serializar_json,
+    intervalo_extracoes=float(os.getenv('DASHBOARD_EVENTOS_INTERVALO', 5)),
+    intervalo_monitor=float(os.getenv('DASHBOARD_MONITOR_INTERVALO', 10))
+)
+
+@app.get("/api/dashboard/eventos")
+async def stream_eventos(request: Request):
+    """
+    Stream SSE com atualizações do dashboard
+    - snapshot: estado completo ao conectar
+    - extracoes: apenas rifas adicionadas/alteradas/removidas
+    - monitor: status do MonitorAndamento quando muda
+    """
+    assinante = difusor_eventos.assinar()
+    return StreamingResponse(
+        difusor_eventos.stream(assinante, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/dashboard/pool-metricas")
+def obter_metricas_pool():
+    """Retorna as métricas do pool de conexões com o banco"""
+    return db_pool.metricas()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8010) 
\ No newline at end of file
@@ -0,0 +1,21 @@
+-- -------------------------------------------------------------
+-- 001_indices_dashboard.sql
+--
+-- Índices da consulta de extrações do dashboard
+-- (app/consulta_dashboard.py). Rodar uma vez no banco:
+--   mysql -h $DB_HOST -u $DB_USER -p $DB_NAME < migrations/001_indices_dashboard.sql
+-- -------------------------------------------------------------
+
+-- Parte "recentes": range em data_sorteio (a partir de ontem), status no próprio índice
+CREATE INDEX idx_extracoes_data_status
+    ON extracoes_cadastro (data_sorteio, status_rifa);
+
+-- Parte "pendentes": ranges em status_rifa ('ativo', 'error' e 'concluído' + 'X'),
+-- com andamento e data_sorteio filtrados no índice (index condition pushdown)
+-- antes de ler a linha - as rifas antigas encerradas não são lidas
+CREATE INDEX idx_extracoes_status_andamento
+    ON extracoes_cadastro (status_rifa, andamento, data_sorteio);
+
+-- LEFT JOIN premiacoes p ON ec.extracao = p.sigla (imagem_path)
+CREATE INDEX idx_premiacoes_sigla
+    ON premiacoes (sigla);
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do agrupamento de compradores (tabela do PDF)
+
+Compara a implementação antiga (split/set/sort em Python por grupo e
+máscara de telefone com .apply) com a vetorizada de app/relatorio_pipeline.py
+em CSVs sintéticos no layout do painel, conferindo que a saída é idêntica.
+
+Uso:
+    python scripts/benchmark_agrupamento.py                 # 10k, 100k e 1M linhas
+    python scripts/benchmark_agrupamento.py 50000 200000    # tamanhos escolhidos
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app')))
+from relatorio_pipeline import agrupar_compradores
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+TOTAL_COLUNAS = 22  # Nome na 7ª, Telefone na 8ª e Números na 21ª coluna
+
+
+# -------------------- implementação antiga (referência) --------------------
+def criptografar_legado(tel):
+    return tel[:7] + "***-**" + tel[-2:] if len(tel) == 15 else tel
+
+
+def juntar_legado(series):
+    nums = []
+    for item in series:
+        nums += [p.strip() for p in str(item).split(",") if p.strip()]
+    nums = sorted(set(nums), key=int)
+    return ", ".join(nums)
+
+
+def agrupar_compradores_legado(df):
+    df = df.iloc[:, [6, 7, 20]]
+    df.columns = ["Nome", "Telefone", "Números"]
+    agrupado = (
+        df.groupby("Telefone")
+          .agg(Nome=("Nome", "first"), Números=("Números", juntar_legado))
+          .reset_index()
+    )
+    agrupado["Telefone"] = agrupado["Telefone"].apply(criptografar_legado)
+    agrupado = agrupado[["Nome", "Telefone", "Números"]]
+    return agrupado.sort_values("Nome")
+
+
+# -------------------- dados sintéticos --------------------
+def gerar_csv(caminho, linhas, semente=42):
+    """
+    CSV ';' no formato do Relatório de Vendas: ~1 comprador para cada 4 compras,
+    1 a 10 números por compra (com repetições entre compras do mesmo telefone)
+    """
+    rng = np.random.default_rng(semente)
+    compradores = max(1, linhas // 4)
+    ids = rng.integers(0, compradores, size=linhas)
+    telefones = np.array([f"(11) 9{i:04d}-{i % 10000:04d}" for i in range(compradores)])
+    nomes = np.array([f"Comprador {i % (compradores // 2 + 1)}" for i in range(compradores)])
+
+    quantidades = rng.integers(1, 11, size=linhas)
+    numeros = rng.integers(0, 100_000, size=int(quantidades.sum())).astype(str)
+    fatias = np.split(numeros, np.cumsum(quantidades)[:-1])
+
+    dados = {f"col{i}": "x" for i in range(TOTAL_COLUNAS)}
+    dados["col6"] = nomes[ids]
+    dados["col7"] = telefones[ids]
+    dados["col20"] = [", ".join(f) for f in fatias]
+    nomes_colunas = {"col6": "Nome", "col7": "Telefone", "col20": "Números"}
+    pd.DataFrame(dados).rename(columns=nomes_colunas).to_csv(caminho, sep=";", index=False, encoding="utf-8")
+
+
+def cronometrar(funcao, df):
+    inicio = time.perf_counter()
+    resultado = funcao(df)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    tamanhos = [int(t) for t in sys.argv[1:]] or TAMANHOS_PADRAO
+    print(f"{'linhas':>10} {'compradores':>12} {'antigo (s)':>11} {'vetorizado (s)':>15} {'ganho':>7}  saída")
+    with tempfile.TemporaryDirectory() as pasta:
+        for linhas in tamanhos:
+            caminho = os.path.join(pasta, f"vendas-{linhas}.csv")
+            gerar_csv(caminho, linhas)
+            df = pd.read_csv(caminho, sep=';', encoding='utf-8')
+
+            antigo, tempo_antigo = cronometrar(agrupar_compradores_legado, df)
+            novo, tempo_novo = cronometrar(agrupar_compradores, df)
+            identica = antigo.equals(novo) and antigo.index.equals(novo.index)
+
+            print(f"{linhas:>10} {len(novo):>12} {tempo_antigo:>11.3f} {tempo_novo:>15.3f} "
+                  f"{tempo_antigo / tempo_novo:>6.1f}x  {'idêntica' if identica else 'DIFERENTE'}")
+            if not identica:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
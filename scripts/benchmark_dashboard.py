@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da consulta de extrações do dashboard (visibilidade no banco)
+
+Cria um banco descartável com extracoes_cadastro sintética (1M linhas por
+padrão: a maior parte rifas antigas concluídas, algumas pendentes e os
+sorteios de hoje/ontem) e compara:
+  - antes: SELECT de todas as extrações ativo/concluído/error + regra de
+    exibição em Python linha a linha (implementação antiga, como referência)
+  - depois: consulta de app/consulta_dashboard.py, sem e com os índices de
+    migrations/001_indices_dashboard.sql
+conferindo que as extrações exibidas são as mesmas.
+
+Usa DB_HOST/DB_USER/DB_PASSWORD/DB_PORT do .env; o banco de teste
+(padrão: <DB_NAME>_benchmark) é criado e apagado pelo script e nunca
+pode ser o próprio DB_NAME.
+
+Uso:
+    python scripts/benchmark_dashboard.py                       # 1M linhas
+    python scripts/benchmark_dashboard.py --linhas 200000 --manter
+    python scripts/benchmark_dashboard.py --horario-invalido     # sigla com horário ilegível
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pymysql
+import pytz
+from pymysql.cursors import DictCursor
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(RAIZ, 'app'))
+from agenda_sorteios import AgendaSorteios, HORARIOS_PADRAO
+from consulta_dashboard import montar_consulta_extracoes
+from db_config import DB_CONFIG
+
+MIGRACAO = os.path.join(RAIZ, 'migrations', '001_indices_dashboard.sql')
+TZ_LOCAL = pytz.timezone('America/Sao_Paulo')
+BLOCO_INSERCAO = 10_000
+REPETICOES = 5
+
+SQL_TABELAS = [
+    """CREATE TABLE extracoes_cadastro (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        edicao INT,
+        sigla_oficial VARCHAR(50),
+        extracao VARCHAR(50),
+        link TEXT,
+        status_cadastro VARCHAR(20),
+        status_link VARCHAR(20),
+        error_msg TEXT,
+        andamento VARCHAR(10),
+        status_rifa VARCHAR(20),
+        data_sorteio DATE
+    )""",
+    """CREATE TABLE premiacoes (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        sigla VARCHAR(50),
+        horario VARCHAR(20),
+        imagem_path VARCHAR(255)
+    )""",
+]
+
+
+# -------------------- implementação antiga (referência) --------------------
+SQL_LEGADO = """
+    SELECT
+        ec.id, ec.edicao, ec.sigla_oficial, ec.extracao, ec.link, ec.status_cadastro,
+        ec.status_link, ec.error_msg, ec.andamento, ec.status_rifa, ec.data_sorteio,
+        p.horario, p.imagem_path
+    FROM extracoes_cadastro ec
+    LEFT JOIN premiacoes p ON ec.extracao = p.sigla
+    WHERE ec.status_rifa IN ('ativo', 'concluído', 'error')
+    AND ec.link IS NOT NULL
+    AND ec.link != ''
+    ORDER BY ec.edicao ASC
+"""
+
+
+def deve_exibir_legado(extracao, agora):
+    andamento = extracao['andamento']
+    percentual = andamento if andamento and andamento.strip() else '0%'
+    tem_erro_x = percentual == 'X'
+    try:
+        numerico = 0 if tem_erro_x else int(percentual.replace('%', ''))
+    except ValueError:
+        numerico = 0
+
+    if extracao['status_rifa'] == 'error' or tem_erro_x:
+        return True
+    if numerico < 100 and extracao['status_rifa'] != 'concluído':
+        return True
+    horario, data_sorteio = extracao['horario'], extracao['data_sorteio']
+    if not (horario and data_sorteio):
+        return False
+    try:
+        horario = horario.strip()
+        if 'AM' in horario or 'PM' in horario:
+            hora_obj = datetime.strptime(horario, '%I:%M %p')
+            hora, minuto = hora_obj.hour, hora_obj.minute
+        else:
+            partes = horario.split(':')
+            hora, minuto = int(partes[0]), int(partes[1]) if len(partes) > 1 else 0
+        fechamento = datetime.combine(data_sorteio, datetime.min.time()).replace(hour=hora, minute=minuto)
+    except Exception:
+        return True  # horário ilegível: a regra antiga exibia
+    return agora <= TZ_LOCAL.localize(fechamento) + timedelta(minutes=30)
+
+
+def consultar_legado(conexao, agora):
+    with conexao.cursor(DictCursor) as cursor:
+        cursor.execute(SQL_LEGADO)
+        return [e['id'] for e in cursor.fetchall() if deve_exibir_legado(e, agora)]
+
+
+def consultar_novo(conexao, agora, agenda):
+    sql, parametros = montar_consulta_extracoes(agora, agenda.horarios(), agenda.siglas_horario_invalido())
+    with conexao.cursor(DictCursor) as cursor:
+        cursor.execute(sql, parametros)
+        return [e['id'] for e in cursor.fetchall()]
+
+
+# -------------------- dados sintéticos --------------------
+def horario_premiacoes(hora):
+    """Metade das siglas no formato "h:mm AM/PM", como em produção"""
+    return hora.strftime('%I:%M %p').lstrip('0') if hora.hour % 2 else hora.strftime('%H:%M')
+
+
+def premiacoes_benchmark(horario_invalido=False):
+    """
+    Siglas padrão com horário, menos CORUJINHA (tem horário padrão na agenda,
+    mas sem linha em premiacoes não aparece depois de encerrada); com
+    horario_invalido, ESPECIAL tem um horário ilegível (encerradas sempre visíveis)
+    """
+    linhas = [(sigla, horario_premiacoes(hora)) for sigla, hora in HORARIOS_PADRAO.items() if sigla != 'CORUJINHA']
+    if horario_invalido:
+        linhas.append(('ESPECIAL', 'a definir'))
+    return linhas
+
+
+def gerar_linhas(linhas, hoje, semente=42, horario_invalido=False):
+    """
+    ~97% rifas antigas concluídas em 100%, ~1% antigas ainda 'ativo' em 100%,
+    ~1% antigas pendentes/erro e o restante sorteios de hoje e ontem
+    """
+    rng = random.Random(semente)
+    siglas = list(HORARIOS_PADRAO) + ['EXTRA']  # EXTRA: sem horário na agenda
+    if horario_invalido:
+        siglas.append('ESPECIAL')
+    for edicao in range(1, linhas + 1):
+        sorteio = rng.random()
+        extracao = rng.choice(siglas)
+        if sorteio < 0.97:
+            status, andamento = 'concluído', '100%'
+            data = hoje - timedelta(days=rng.randint(2, 3650))
+        elif sorteio < 0.98:
+            status, andamento = 'ativo', '100%'
+            data = hoje - timedelta(days=rng.randint(2, 3650))
+        elif sorteio < 0.99:
+            status, andamento = rng.choice([('ativo', f'{rng.randint(0, 99)}%'), ('error', 'X'), ('concluído', 'X'), ('ativo', '')])
+            data = hoje - timedelta(days=rng.randint(2, 3650))
+        else:
+            status = rng.choice(['ativo', 'concluído', 'error'])
+            andamento = rng.choice(['100%', '100%', f'{rng.randint(0, 99)}%', 'X'])
+            data = hoje - timedelta(days=rng.randint(0, 1))
+        link = '' if rng.random() < 0.01 else f'https://painel.exemplo/rifa/{edicao}'
+        yield (edicao, extracao, extracao, link, 'ok', 'ok', None, andamento, status, data)
+
+
+def preparar_banco(conexao, banco, linhas, hoje, horario_invalido=False):
+    with conexao.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{banco}`")
+        cursor.execute(f"CREATE DATABASE `{banco}` CHARACTER SET utf8mb4")
+        cursor.execute(f"USE `{banco}`")
+        for sql in SQL_TABELAS:
+            cursor.execute(sql)
+        cursor.executemany(
+            "INSERT INTO premiacoes (sigla, horario, imagem_path) VALUES (%s, %s, %s)",
+            [(sigla, horario, f'/static/img/{sigla.lower()}.png') for sigla, horario in premiacoes_benchmark(horario_invalido)],
+        )
+        bloco = []
+        for linha in gerar_linhas(linhas, hoje, horario_invalido=horario_invalido):
+            bloco.append(linha)
+            if len(bloco) == BLOCO_INSERCAO:
+                cursor.executemany(
+                    "INSERT INTO extracoes_cadastro (edicao, sigla_oficial, extracao, link, status_cadastro, "
+                    "status_link, error_msg, andamento, status_rifa, data_sorteio) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)", bloco)
+                bloco = []
+        if bloco:
+            cursor.executemany(
+                "INSERT INTO extracoes_cadastro (edicao, sigla_oficial, extracao, link, status_cadastro, "
+                "status_link, error_msg, andamento, status_rifa, data_sorteio) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)", bloco)
+        cursor.execute("ANALYZE TABLE extracoes_cadastro, premiacoes")
+        cursor.fetchall()
+
+
+def aplicar_migracao(conexao):
+    with open(MIGRACAO, encoding='utf-8') as arquivo:
+        texto = "\n".join(l for l in arquivo if not l.lstrip().startswith('--'))
+    with conexao.cursor() as cursor:
+        for comando in filter(str.strip, texto.split(';')):
+            cursor.execute(comando)
+        cursor.execute("ANALYZE TABLE extracoes_cadastro, premiacoes")
+        cursor.fetchall()
+
+
+def cronometrar(funcao, *args):
+    tempos, resultado = [], None
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--linhas', type=int, default=1_000_000)
+    parser.add_argument('--banco', default=f"{DB_CONFIG['database']}_benchmark")
+    parser.add_argument('--manter', action='store_true', help='não apagar o banco de teste no final')
+    parser.add_argument('--horario-invalido', action='store_true',
+                        help='inclui uma sigla com horário ilegível em premiacoes (caminho mais lento)')
+    args = parser.parse_args()
+    if args.banco == DB_CONFIG['database']:
+        print("O banco de teste não pode ser o DB_NAME da aplicação")
+        return 2
+
+    config = {chave: valor for chave, valor in DB_CONFIG.items() if chave != 'database'}
+    conexao = pymysql.connect(**config)
+    try:
+        agora = datetime.now(TZ_LOCAL)
+        print(f"Gerando {args.linhas} linhas em `{args.banco}`...")
+        preparar_banco(conexao, args.banco, args.linhas, agora.date(), args.horario_invalido)
+
+        agenda = AgendaSorteios()
+        agenda.carregar(conexao)
+
+        antes, tempo_antes = cronometrar(consultar_legado, conexao, agora)
+        sem_indices, tempo_sem_indices = cronometrar(consultar_novo, conexao, agora, agenda)
+        aplicar_migracao(conexao)
+        depois, tempo_depois = cronometrar(consultar_novo, conexao, agora, agenda)
+
+        print(f"{'variante':<34} {'tempo (s)':>10} {'exibidas':>9}")
+        print(f"{'antes (SELECT amplo + Python)':<34} {tempo_antes:>10.3f} {len(antes):>9}")
+        print(f"{'depois, sem índices':<34} {tempo_sem_indices:>10.3f} {len(sem_indices):>9}")
+        print(f"{'depois, com índices (migração)':<34} {tempo_depois:>10.3f} {len(depois):>9}")
+        print(f"ganho: {tempo_antes / tempo_depois:.1f}x")
+
+        identicas = sorted(antes) == sorted(sem_indices) == sorted(depois)
+        print(f"extrações exibidas: {'idênticas' if identicas else 'DIFERENTES'}")
+        return 0 if identicas else 1
+    finally:
+        if not args.manter:
+            with conexao.cursor() as cursor:
+                cursor.execute(f"DROP DATABASE IF EXISTS `{args.banco}`")
+        conexao.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
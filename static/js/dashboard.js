@@ -6,6 +6,10 @@ let ultimaAtualizacaoDados = null; // Timestamp da última atualização dos dad
 let verificandoAtualizacoes = false; // Flag para evitar múltiplas verificações simultâneas
 let ultimoTimestampMonitor = null; // Timestamp da última atualização do monitor
 let verificandoMonitor = false; // Flag para evitar verificações simultâneas do monitor
+let etagExtracoes = null; // ETag do snapshot exibido (servidor responde 304 se nada mudou)
+let versaoExtracoes = null; // Versão do estado exibido (avança no servidor só quando algo muda)
+let fonteEventos = null; // Conexão SSE com /api/dashboard/eventos
+let pollingAtivo = false; // Fallback de polling (navegador sem EventSource ou stream indisponível)
 
 // Inicialização
 document.addEventListener('DOMContentLoaded', function() {
@@ -45,8 +49,86 @@ function configurarModal() {
     }
 }
 
-// Atualização automática inteligente
+// Atualização automática: stream SSE (push) com fallback para polling
 function iniciarAtualizacaoAutomatica() {
+    if (typeof EventSource === 'undefined') {
+        console.log('[SSE] EventSource não suportado - usando polling');
+        iniciarPolling();
+        return;
+    }
+    iniciarStreamEventos();
+}
+
+// Stream de eventos: o servidor envia apenas o que mudou
+function iniciarStreamEventos() {
+    let falhasSeguidas = 0;
+    fonteEventos = new EventSource('/api/dashboard/eventos');
+
+    fonteEventos.onopen = () => {
+        falhasSeguidas = 0;
+        console.log('[SSE] ✅ Conectado ao stream de eventos');
+    };
+
+    fonteEventos.addEventListener('snapshot', (evento) => {
+        const data = JSON.parse(evento.data);
+        console.log('[SSE] 📦 Snapshot recebido (versão ' + data.versao + ')');
+        if (data.extracoes) {
+            etagExtracoes = data.etag;
+            versaoExtracoes = String(data.versao);
+            aplicarDadosExtracoes(data.extracoes);
+        }
+        if (data.monitor) {
+            aplicarStatusMonitor(data.monitor);
+        }
+    });
+
+    fonteEventos.addEventListener('extracoes', (evento) => {
+        const diff = JSON.parse(evento.data);
+        console.log(`[SSE] 🔄 Diff recebido: +${diff.adicionadas.length} ~${diff.alteradas.length} -${diff.removidas.length}`);
+        aplicarDiffExtracoes(diff);
+        destacarAtualizacaoGeral();
+    });
+
+    fonteEventos.addEventListener('monitor', (evento) => {
+        aplicarStatusMonitor(JSON.parse(evento.data));
+    });
+
+    fonteEventos.onerror = () => {
+        falhasSeguidas++;
+        console.log(`[SSE] ⚠️ Falha no stream (${falhasSeguidas})`);
+        // O navegador reconecta sozinho; após falhas seguidas, volta ao polling
+        if (fonteEventos.readyState === EventSource.CLOSED || falhasSeguidas >= 3) {
+            fonteEventos.close();
+            fonteEventos = null;
+            console.log('[SSE] Stream indisponível - usando polling');
+            iniciarPolling();
+        }
+    };
+}
+
+// Aplicar diff de extrações recebido pelo stream
+function aplicarDiffExtracoes(diff) {
+    const porEdicao = new Map((rifasData || []).map(r => [r.edicao, r]));
+    diff.removidas.forEach(edicao => porEdicao.delete(edicao));
+    diff.adicionadas.concat(diff.alteradas).forEach(rifa => porEdicao.set(rifa.edicao, rifa));
+
+    etagExtracoes = diff.etag;
+    versaoExtracoes = String(diff.versao);
+    aplicarDadosExtracoes({
+        data_recente: diff.data_recente,
+        data_sorteio: diff.data_sorteio,
+        total_ativas: diff.total_ativas,
+        extracoes: diff.ordem.map(edicao => porEdicao.get(edicao)).filter(Boolean)
+    });
+}
+
+// Polling (fallback quando o stream não está disponível)
+function iniciarPolling() {
+    if (pollingAtivo) {
+        return;
+    }
+    pollingAtivo = true;
+
     // Verificação inteligente de atualizações a cada 15 segundos
     setInterval(() => {
         verificarSeHouveMudancas();
@@ -75,16 +157,15 @@ async function verificarSeHouveMudancas() {
     try {
         verificandoAtualizacoes = true;
         
-        // Fazer uma verificação rápida apenas dos metadados
-        const response = await fetch('/api/dashboard/extracoes-recentes');
-        const data = await response.json();
+        // Verificação rápida: apenas a versão do estado (lista completa só se mudou)
+        const response = await fetch('/api/dashboard/versao', { cache: 'no-store' });
         
         if (!response.ok) {
             return; // Ignorar erros na verificação rápida
         }
         
-        // Verificar se algo mudou comparando com os dados atuais
-        const mudancaDetectada = detectarMudancasNosDados(data.extracoes);
+        const data = await response.json();
+        const mudancaDetectada = versaoExtracoes === null || String(data.versao) !== versaoExtracoes;
         
         if (mudancaDetectada) {
             console.log('[SYNC] 🔄 Mudanças detectadas! Atualizando dashboard...');
@@ -140,20 +221,7 @@ async function verificarStatusMonitorAndamento() {
             destacarAtualizacaoGeral();
         }
 
-        // Atualizar timestamp para próxima verificação
-        ultimoTimestampMonitor = timestampAtual;
-
-        if (data.ativo) {
-            console.log(`[MONITOR] ✅ Status: Ativo (${data.minutos_desde_ultima} min atrás)`);
-            atualizarIndicadorServidor('online', `Última atualização: ${data.ultima_atualizacao_formatada}`);
-            atualizarUltimaAtualizacaoMonitorAndamento(data.ultima_atualizacao_formatada);
-        } else {
-            console.log(`[MONITOR] ❌ Status: Inativo (${data.minutos_desde_ultima || 'N/A'} min atrás)`);
-            atualizarIndicadorServidor('offline', data.motivo || 'Sem atualizações recentes');
-            if (data.ultima_atualizacao_formatada) {
-                atualizarUltimaAtualizacaoMonitorAndamento(data.ultima_atualizacao_formatada);
-            }
-        }
+        aplicarStatusMonitor(data);
     } catch (error) {
         console.log('[MONITOR] ⚠️ Erro ao verificar status:', error);
         atualizarIndicadorServidor('offline', 'Erro de conexão');
@@ -162,6 +230,24 @@ async function verificarStatusMonitorAndamento() {
     }
 }
 
+// Aplicar status do monitor (vindo do polling ou do stream SSE)
+function aplicarStatusMonitor(data) {
+    // Atualizar timestamp para próxima verificação
+    ultimoTimestampMonitor = data.timestamp_ultima_atualizacao;
+
+    if (data.ativo) {
+        console.log(`[MONITOR] ✅ Status: Ativo (${data.minutos_desde_ultima} min atrás)`);
+        atualizarIndicadorServidor('online', `Última atualização: ${data.ultima_atualizacao_formatada}`);
+        atualizarUltimaAtualizacaoMonitorAndamento(data.ultima_atualizacao_formatada);
+    } else {
+        console.log(`[MONITOR] ❌ Status: Inativo (${data.minutos_desde_ultima || 'N/A'} min atrás)`);
+        atualizarIndicadorServidor('offline', data.motivo || 'Sem atualizações recentes');
+        if (data.ultima_atualizacao_formatada) {
+            atualizarUltimaAtualizacaoMonitorAndamento(data.ultima_atualizacao_formatada);
+        }
+    }
+}
+
 // NOVA FUNÇÃO: Atualizar indicador visual do servidor
 function atualizarIndicadorServidor(status, mensagem) {
     console.log(`[MONITOR] 🎨 Atualizando indicador para: ${status} - ${mensagem}`);
@@ -274,24 +360,32 @@ async function carregarDados(isFirstLoad = false, houveMudancas = false) {
             mostrarLoadingCompacto('Sincronizando...');
         }
 
-        const response = await fetch('/api/dashboard/extracoes-recentes');
+        // Atualizações sem mudança sinalizada podem ser condicionais (304 = nada a redesenhar)
+        const condicional = !isFirstLoad && !houveMudancas && etagExtracoes && rifasData && rifasData.length > 0;
+        const response = await fetch('/api/dashboard/extracoes-recentes', {
+            cache: 'no-store',
+            headers: condicional ? { 'If-None-Match': etagExtracoes } : {}
+        });
+
+        if (response.status === 304) {
+            console.log('[SYNC] Snapshot inalterado (304) - tabela mantida');
+            ocultarTodosLoadings();
+            return;
+        }
+
         const data = await response.json();
 
         if (!response.ok) {
             throw new Error(data.detail || 'Erro ao carregar dados');
         }
 
+        etagExtracoes = response.headers.get('ETag');
+        versaoExtracoes = response.headers.get('X-Dashboard-Versao');
+
         // Detectar mudanças reais nos dados
         const dadosAtuaisMudaram = rifasData ? detectarMudancasNosDados(data.extracoes) : true;
 
-        // Atualizar status do sistema
-        document.getElementById('status-sistema').textContent = `${data.total_ativas} rifas ativas`;
-        rifasData = data.extracoes;
-        
-        preencherTabela(data.extracoes);
-        
-        // Verificar se há PDFs disponíveis na pasta (sem gerar automaticamente)
-        verificarPDFsDisponiveis(data.extracoes);
+        aplicarDadosExtracoes(data);
         
         // Atualizar rodapé APENAS se:
         // 1. É primeira carga (isFirstLoad)
@@ -307,7 +401,6 @@ async function carregarDados(isFirstLoad = false, houveMudancas = false) {
         
         // Ocultar loading
         ocultarTodosLoadings();
-        document.getElementById('rifas-table').style.display = 'table';
         
     } catch (error) {
         console.error('Erro:', error);
@@ -316,6 +409,20 @@ async function carregarDados(isFirstLoad = false, houveMudancas = false) {
     }
 }
 
+// Renderizar a lista de extrações (carga HTTP ou stream SSE)
+function aplicarDadosExtracoes(data) {
+    // Atualizar status do sistema
+    document.getElementById('status-sistema').textContent = `${data.total_ativas} rifas ativas`;
+    rifasData = data.extracoes;
+    
+    preencherTabela(data.extracoes);
+    
+    // Verificar se há PDFs disponíveis na pasta (sem gerar automaticamente)
+    verificarPDFsDisponiveis(data.extracoes);
+    
+    document.getElementById('rifas-table').style.display = 'table';
+}
+
 // Preencher tabela agrupada por data
 function preencherTabela(extracoes) {
     const tableBody = document.getElementById('table-body');
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""Os módulos de app/ são importados pelo nome, como nos servidores (sys.path)"""
+
+import os
+import sys
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for pasta in ('app', 'scripts'):
+    caminho = os.path.join(RAIZ, pasta)
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""AgendaSorteios: conversão de horários, reconhecimento de siglas e recarga"""
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+import agenda_sorteios
+from agenda_sorteios import HORARIOS_PADRAO, AgendaSorteios, interpretar_horario
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("14:20", time(14, 20)),
+    ("14:20:05", time(14, 20, 5)),
+    (" 9 ", time(9, 0)),
+    ("2:20 PM", time(14, 20)),
+    ("12:05 AM", time(0, 5)),
+    ("12:30 pm", time(12, 30)),
+    (timedelta(hours=16, minutes=20), time(16, 20)),
+    (time(21, 30), time(21, 30)),
+    ("13:00 PM", None),
+    ("24:00", None),
+    ("14h20", None),
+    ("", None),
+    (None, None),
+])
+def test_interpretar_horario(valor, esperado):
+    assert interpretar_horario(valor) == esperado
+
+
+class Conexao:
+    def __init__(self, linhas=None, erro=None):
+        self.linhas = linhas or []
+        self.erro = erro
+        self.consultas = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.consultas += 1
+        if self.erro:
+            raise self.erro
+
+    def fetchall(self):
+        return self.linhas
+
+    def close(self):
+        pass
+
+
+def test_sigla_oficial_prefere_a_mais_longa():
+    agenda = AgendaSorteios()
+    agenda.definir([("PTSP", "15:00")])
+    assert agenda.sigla_oficial("PTV ESPECIAL") == "PTV"
+    assert agenda.sigla_oficial("ptsp 123") == "PTSP"
+    assert agenda.sigla_oficial("PT RIO") == "PT"
+    assert agenda.sigla_oficial("LOTERIA PTN") is None
+    assert agenda.procurar_sigla("SUPER PTN 123") == "PTN"
+    assert agenda.procurar_sigla("") is None
+
+
+def test_definir_mescla_banco_sobre_o_padrao():
+    agenda = AgendaSorteios()
+    agenda.definir([("ptv", "4:30 PM"), {"sigla": "EXTRA", "horario": "08:00"}, ("PT", "inválido"), ("", "10:00")])
+    assert agenda.horario("PTV") == time(16, 30)
+    assert agenda.horario(" extra ") == time(8, 0)
+    assert agenda.horario("PT") == HORARIOS_PADRAO["PT"]
+    assert agenda.horario("DESCONHECIDA") is None
+    horarios = list(agenda.horarios().values())
+    assert horarios == sorted(horarios)
+    assert agenda.fechamento("PTV", date(2025, 1, 5)) == datetime(2025, 1, 5, 16, 30)
+
+
+
+def test_siglas_horario_invalido():
+    agenda = AgendaSorteios()
+    assert agenda.siglas_horario_invalido() == frozenset()
+    agenda.definir([("PT", "inválido"), ("ESPECIAL", "a definir"), ("VAZIA", ""), ("NULA", None), ("PTV", "4:30 PM")])
+    assert agenda.siglas_horario_invalido() == {"PT", "ESPECIAL"}
+    agenda.definir([("PTV", "17:00")])
+    assert agenda.siglas_horario_invalido() == frozenset()
+
+def test_recarga_respeita_intervalo_e_falha(monkeypatch):
+    agora = [100.0]
+    monkeypatch.setattr(agenda_sorteios.time, "monotonic", lambda: agora[0])
+    agenda = AgendaSorteios(intervalo=300, intervalo_falha=30)
+
+    conexao = Conexao([("PTV", "17:00")])
+    assert agenda.atualizar_se_vencida(conexao) is True
+    assert agenda.atualizar_se_vencida(conexao) is False
+    assert conexao.consultas == 1
+    assert agenda.horario("PTV") == time(17, 0)
+
+    agora[0] += 300
+    quebrada = Conexao(erro=RuntimeError("sem banco"))
+    assert agenda.atualizar_se_vencida(quebrada) is False
+    assert agenda.horario("PTV") == time(17, 0)  # mantém a agenda anterior
+    agora[0] += 29
+    assert agenda.atualizar_se_vencida(quebrada) is False
+    assert quebrada.consultas == 1
+    agora[0] += 1
+    agenda.atualizar_se_vencida(quebrada)
+    assert quebrada.consultas == 2
+
+
+def test_como_dict():
+    agenda = AgendaSorteios(intervalo=60)
+    dados = agenda.como_dict()
+    assert dados["siglas"]["PTV"] == "16:20"
+    assert dados["carregada_em"] is None
+    assert dados["intervalo"] == 60
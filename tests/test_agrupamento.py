@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""agrupar_compradores / juntar_numeros (tabela de compradores do PDF)"""
+
+import numpy as np
+import pandas as pd
+
+from benchmark_agrupamento import agrupar_compradores_legado, gerar_csv
+from relatorio_pipeline import agrupar_compradores, criptografar_telefones, juntar_numeros
+
+
+def test_juntar_numeros_ordena_deduplica_e_ignora_vazios():
+    codigos = np.array([0, 1, 0, 1, 2])
+    numeros = pd.Series(["10, 2", "7", " 2,3", "", ","])
+    assert juntar_numeros(codigos, numeros, 3) == ["2, 3, 10", "7", ""]
+
+
+def test_juntar_numeros_telefone_sem_linhas():
+    assert juntar_numeros(np.array([1]), pd.Series(["5"]), 3) == ["", "5", ""]
+
+
+def test_criptografar_telefones_so_no_formato_completo():
+    telefones = pd.Series(["(11) 91234-5678", "1234"])
+    assert criptografar_telefones(telefones).tolist() == ["(11) 91***-**78", "1234"]
+
+
+def test_agrupar_compradores_primeiro_nome_e_telefone_nulo():
+    df = pd.DataFrame({
+        "Nome": [np.nan, "Ana", "Outro nome", "Bia", "Sem telefone"],
+        "Telefone": ["(11) 91111-1111", "(11) 91111-1111", "(11) 91111-1111", "(11) 92222-2222", np.nan],
+        "Números": ["3", "1, 3", "2", "9", "4"],
+    })
+    agrupado = agrupar_compradores(df)
+    assert agrupado.to_dict("records") == [
+        {"Nome": "Ana", "Telefone": "(11) 91***-**11", "Números": "1, 2, 3"},
+        {"Nome": "Bia", "Telefone": "(11) 92***-**22", "Números": "9"},
+    ]
+
+
+def test_agrupar_compradores_igual_a_implementacao_antiga(tmp_path):
+    caminho = tmp_path / "vendas.csv"
+    gerar_csv(caminho, 2000, semente=7)
+    df = pd.read_csv(caminho, sep=";", encoding="utf-8")
+    novo = agrupar_compradores(df)
+    antigo = agrupar_compradores_legado(df)
+    assert antigo.equals(novo)
+    assert antigo.index.equals(novo.index)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""CacheEdicoes: TTL, cache negativo e descarte LRU"""
+
+import pytest
+
+import cache_edicoes
+from cache_edicoes import CacheEdicoes
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(cache_edicoes.time, "monotonic", relogio)
+    return relogio
+
+
+INFO = {"edicao": 6197, "sigla_oficial": "PTV"}
+
+
+def test_acerto_ate_o_ttl(relogio):
+    cache = CacheEdicoes(max_itens=10, ttl=60, ttl_negativo=5)
+    assert cache.obter(6197) == (False, None)
+    cache.guardar(6197, INFO)
+    relogio.agora += 59
+    assert cache.obter(6197) == (True, INFO)
+    relogio.agora += 1
+    assert cache.obter(6197) == (False, None)
+    metricas = cache.metricas()
+    assert (metricas["acertos"], metricas["falhas"], metricas["expirados"], metricas["itens"]) == (1, 2, 1, 0)
+
+
+def test_cache_negativo_expira_antes(relogio):
+    cache = CacheEdicoes(max_itens=10, ttl=60, ttl_negativo=5)
+    cache.guardar(1, None)
+    assert cache.obter(1) == (True, None)
+    relogio.agora += 5
+    assert cache.obter(1) == (False, None)
+    assert cache.metricas()["acertos_negativos"] == 1
+
+
+def test_ttl_zero_nao_guarda(relogio):
+    cache = CacheEdicoes(max_itens=10, ttl=60, ttl_negativo=0)
+    cache.guardar(1, None)
+    assert cache.obter(1) == (False, None)
+
+
+def test_descarte_lru_respeita_o_uso(relogio):
+    cache = CacheEdicoes(max_itens=2, ttl=60, ttl_negativo=5)
+    cache.guardar(1, INFO)
+    cache.guardar(2, INFO)
+    cache.obter(1)           # 2 passa a ser o menos usado
+    cache.guardar(3, INFO)
+    assert cache.obter(2) == (False, None)
+    assert cache.obter(1) == (True, INFO)
+    assert cache.obter(3) == (True, INFO)
+    assert cache.metricas()["descartados_lru"] == 1
+
+
+def test_invalidar(relogio):
+    cache = CacheEdicoes(max_itens=10, ttl=60, ttl_negativo=5)
+    cache.guardar(1, INFO)
+    cache.guardar(2, INFO)
+    cache.invalidar(1)
+    assert cache.obter(1) == (False, None)
+    cache.invalidar()
+    assert cache.metricas()["itens"] == 0
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""montar_consulta_extracoes: corte de data, ordem dos parâmetros e siglas com horário ilegível"""
+
+from datetime import date, datetime, time
+
+import pytest
+from pymysql.converters import escape_item
+
+from consulta_dashboard import data_corte, montar_consulta_extracoes
+
+AGORA = datetime(2026, 10, 18, 9, 0, 30, 123)
+HORARIOS = {"PTV": time(16, 20), "COR": time(21, 30)}
+
+
+def formatar(sql, parametros):
+    """SQL como o pymysql enviaria ao banco (mesmo escape e a mesma troca de %s e %%)"""
+    return sql % tuple(escape_item(valor, "utf8mb4") for valor in parametros)
+
+
+@pytest.mark.parametrize("agora, esperado", [
+    (datetime(2026, 10, 18, 9, 0), date(2026, 10, 17)),
+    (datetime(2026, 10, 18, 0, 29), date(2026, 10, 16)),
+    (datetime(2026, 10, 18, 0, 30), date(2026, 10, 17)),
+    (datetime(2026, 10, 18, 23, 59), date(2026, 10, 17)),
+])
+def test_data_corte(agora, esperado):
+    assert data_corte(agora) == esperado
+
+
+def test_parametros_na_ordem_dos_placeholders():
+    sql, parametros = montar_consulta_extracoes(AGORA, HORARIOS, {"XX", "AB"})
+    assert sql.count("%s") == len(parametros)
+    final = formatar(sql, parametros)
+    assert "ec.data_sorteio >= '2026-10-17'" in final
+    assert "WHEN 'PTV' THEN CAST('16:20:00' AS TIME)" in final
+    assert "WHEN 'COR' THEN CAST('21:30:00' AS TIME)" in final
+    assert "MINUTE >= '2026-10-18 09:00:30'" in final
+    assert "ec.data_sorteio < '2026-10-17'" in final
+    assert final.count("ec.extracao IN ('AB', 'XX')") == 3
+    assert "REPLACE(TRIM(ec.andamento), '%', '')" in final
+
+
+def test_sem_siglas_invalidas():
+    sql, parametros = montar_consulta_extracoes(AGORA, HORARIOS)
+    assert sql.count("%s") == len(parametros) == 2 + 2 * len(HORARIOS) + 1
+    final = formatar(sql, parametros)
+    assert " IN ('" not in final.replace("status_rifa IN ('", "")
+    assert "CHAR_LENGTH(p.horario) > 0" in final
+
+
+def test_agenda_vazia():
+    sql, parametros = montar_consulta_extracoes(AGORA, {}, ["ESPECIAL"])
+    assert sql.count("%s") == len(parametros)
+    final = formatar(sql, parametros)
+    assert "TIMESTAMP(ec.data_sorteio, NULL)" in final
+    assert final.count("ec.extracao IN ('ESPECIAL')") == 3
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""DeltaVendas (diferença banco x CSV de uma edição já importada) e aplicar_delta"""
+
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from ingestao_vendas import (
+    INGESTAO_CONFIG, SQL_DELETE_CHAVE_VENDAS, SQL_INSERT_VENDAS, DeltaVendas, aplicar_delta, ler_vendas,
+)
+
+
+def csv(telefone, segundo, nome="Ana", qtd=2, total=5.0, numeros="1, 2"):
+    """Linha como sai de linhas_vendas"""
+    return (nome, telefone, "6197", "PTV", qtd, total, date(2025, 1, 5), time(10, 0, segundo),
+            total / qtd, "Pix", "mercadopago", numeros)
+
+
+def banco(linha):
+    """A mesma linha como volta do mysql.connector (TIME -> timedelta, DECIMAL)"""
+    nome, telefone, edicao, extracao, qtd, total, data, hora, valor_cota, *resto = linha
+    hora = timedelta(hours=hora.hour, minutes=hora.minute, seconds=hora.second)
+    return (nome, telefone, edicao, extracao, qtd, Decimal(f"{total:.2f}"), data, hora,
+            Decimal(f"{valor_cota:.2f}"), *resto)
+
+
+def chave(linha):
+    return linha[1], linha[6], linha[7]
+
+
+def test_sem_mudancas_apesar_dos_tipos_do_banco():
+    atuais = [csv("1", 1), csv("2", 2, total=0.3, qtd=3)]
+    delta = DeltaVendas(map(banco, atuais), atuais)
+    assert delta.vazio
+    assert (delta.inseridas, delta.atualizadas, delta.removidas) == (0, 0, 0)
+
+
+def test_nova_alterada_e_removida():
+    existentes = [csv("1", 1), csv("2", 2), csv("3", 3)]
+    atuais = [csv("1", 1), csv("2", 2, numeros="7, 8"), csv("4", 4)]
+    delta = DeltaVendas(map(banco, existentes), atuais, remover=True)
+
+    assert (delta.inseridas, delta.atualizadas, delta.removidas) == (1, 1, 1)
+    assert sorted(delta.chaves_apagar) == sorted([chave(csv("2", 2)), chave(csv("3", 3))])
+    assert delta.linhas_novas == [csv("2", 2, numeros="7, 8"), csv("4", 4)]
+    assert delta.resumo() == "1 nova(s), 1 alterada(s), 1 removida(s)"
+
+
+def test_chave_alterada_regrava_todas_as_linhas_da_chave():
+    # Duas compras do mesmo telefone no mesmo segundo; só uma mudou
+    existentes = [csv("1", 1, numeros="1"), csv("1", 1, numeros="2")]
+    atuais = [csv("1", 1, numeros="1"), csv("1", 1, numeros="3")]
+    delta = DeltaVendas(map(banco, existentes), atuais)
+
+    assert delta.chaves_apagar == [chave(csv("1", 1))]
+    assert delta.linhas_novas == atuais
+    assert (delta.inseridas, delta.atualizadas, delta.removidas) == (0, 1, 0)
+
+
+def test_repeticoes_sao_casadas_como_multiconjunto():
+    linha = csv("1", 1)
+    assert DeltaVendas(map(banco, [linha, linha]), [linha, linha]).vazio
+
+    duplicada = DeltaVendas(map(banco, [linha]), [linha, linha])
+    assert (duplicada.inseridas, duplicada.atualizadas, duplicada.removidas) == (1, 0, 0)
+    assert duplicada.chaves_apagar == [chave(linha)]
+    assert duplicada.linhas_novas == [linha, linha]
+
+    sumiu = DeltaVendas(map(banco, [linha, linha]), [linha], remover=True)
+    assert (sumiu.inseridas, sumiu.atualizadas, sumiu.removidas) == (0, 0, 1)
+    assert sumiu.linhas_novas == [linha]
+
+
+def test_padrao_nao_apaga_compras_ausentes_do_export():
+    existentes = [csv("1", 1), csv("2", 2), csv("3", 3)]
+    atuais = [csv("1", 1), csv("2", 2, numeros="7, 8"), csv("4", 4)]
+    delta = DeltaVendas(map(banco, existentes), atuais)
+
+    assert not delta.remover
+    assert (delta.inseridas, delta.atualizadas, delta.removidas, delta.mantidas) == (1, 1, 0, 1)
+    assert delta.chaves_apagar == [chave(csv("2", 2))]
+    assert delta.linhas_novas == [csv("2", 2, numeros="7, 8"), csv("4", 4)]
+    assert delta.resumo() == "1 nova(s), 1 alterada(s), 1 ausente(s) do export mantida(s)"
+
+
+def test_padrao_com_export_truncado_nao_muda_nada():
+    existentes = [csv(str(i), i) for i in range(5)]
+    delta = DeltaVendas(map(banco, existentes), existentes[:2])
+    assert delta.vazio
+    assert delta.mantidas == 3
+
+
+def test_padrao_mantem_linha_sem_par_numa_chave_regravada():
+    # Duas compras na mesma chave, o CSV traz só uma e alterada: a outra volta como estava
+    existentes = [banco(csv("1", 1, numeros="1")), banco(csv("1", 1, numeros="2"))]
+    atuais = [csv("1", 1, numeros="3")]
+    delta = DeltaVendas(existentes, atuais)
+
+    assert (delta.inseridas, delta.atualizadas, delta.removidas, delta.mantidas) == (0, 1, 0, 1)
+    assert delta.chaves_apagar == [chave(csv("1", 1))]
+    assert delta.linhas_novas == [atuais[0], existentes[0]]
+
+    removendo = DeltaVendas(existentes, atuais, remover=True)
+    assert (removendo.atualizadas, removendo.removidas) == (1, 1)
+    assert removendo.linhas_novas == atuais
+
+
+def test_remover_segue_a_configuracao(monkeypatch):
+    monkeypatch.setitem(INGESTAO_CONFIG, "delta_remover", True)
+    assert DeltaVendas([banco(csv("1", 1))], []).chaves_apagar == [chave(csv("1", 1))]
+
+
+def test_ordem_das_linhas_nao_importa():
+    atuais = [csv(str(i), i) for i in range(10)]
+    assert DeltaVendas(map(banco, reversed(atuais)), atuais).vazio
+
+
+def test_data_invalida_como_chave_nula():
+    sem_data = ("Ana", "1", "6197", "PTV", 1, 2.0, None, None, 2.0, "Pix", "mp", "1")
+    assert DeltaVendas([sem_data], [sem_data]).vazio
+    delta = DeltaVendas([sem_data], [], remover=True)
+    assert delta.chaves_apagar == [("1", None, None)]
+
+
+class Log:
+    def info(self, mensagem):
+        pass
+
+
+class Cursor:
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def execute(self, sql, parametros):
+        self.conexao.eventos.append(("execute", sql, parametros))
+        self.pendentes = list(self.conexao.linhas)
+
+    def fetchmany(self, tamanho):
+        bloco, self.pendentes = self.pendentes[:tamanho], self.pendentes[tamanho:]
+        return bloco
+
+    def executemany(self, sql, parametros):
+        self.conexao.eventos.append(("executemany", sql, list(parametros)))
+
+    def close(self):
+        pass
+
+
+class Conexao:
+    def __init__(self, linhas=()):
+        self.linhas = list(linhas)
+        self.eventos = []
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self.eventos.append(("commit",))
+
+
+def test_aplicar_delta_apaga_chaves_e_insere_sem_commit():
+    existentes = [csv("1", 1), csv("2", 2)]
+    atuais = [csv("1", 1, nome="Ana Maria"), csv("3", 3)]
+    delta = DeltaVendas(map(banco, existentes), atuais, remover=True)
+    conexao = Conexao()
+
+    aplicar_delta(conexao, delta, "6197", Log())
+
+    (tipo, sql, apagar), (tipo_insert, sql_insert, inseridas) = conexao.eventos
+    assert (tipo, sql, tipo_insert, sql_insert) == ("executemany", SQL_DELETE_CHAVE_VENDAS, "executemany", SQL_INSERT_VENDAS)
+    assert sorted(apagar) == [("6197", "1", date(2025, 1, 5), time(10, 0, 1)), ("6197", "2", date(2025, 1, 5), time(10, 0, 2))]
+    assert inseridas == atuais
+
+
+def test_ler_vendas_em_blocos():
+    linhas = [banco(csv(str(i), i)) for i in range(7)]
+    conexao = Conexao(linhas)
+    assert list(ler_vendas(conexao, "6197", bloco=3)) == linhas
+    assert conexao.eventos[0][2] == ("6197",)
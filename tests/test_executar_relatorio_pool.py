@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""executar_relatorio com pool: navegador de job com falha é reciclado, não reaproveitado"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import relatorio_pipeline
+from navegador_pool import PoolNavegadoresEsgotado
+from relatorio_pipeline import ResultadoRelatorio, executar_relatorio
+
+
+class Pool:
+    def __init__(self, erro=None):
+        self.erro = erro
+        self.devolvidos = []
+
+    def emprestar(self):
+        if self.erro:
+            raise self.erro
+        return SimpleNamespace(navegador="chrome-1")
+
+    def devolver(self, trabalhador, falhou=False):
+        self.devolvidos.append((trabalhador.navegador, falhou))
+
+
+def pipeline_falso(sucesso=True, erro=None):
+    class Pipeline:
+        def __init__(self, edicao, navegador=None, ecoar=False):
+            self.edicao, self.navegador = edicao, navegador
+
+        def executar(self):
+            if erro:
+                raise erro
+            resultado = ResultadoRelatorio(str(self.edicao))
+            resultado.sucesso = sucesso
+            resultado.navegador = self.navegador
+            return resultado
+    return Pipeline
+
+
+@pytest.mark.parametrize("sucesso", [True, False])
+def test_devolve_marcando_falha_pelo_resultado(monkeypatch, sucesso):
+    monkeypatch.setattr(relatorio_pipeline, "PipelineRelatorio", pipeline_falso(sucesso))
+    pool = Pool()
+    resultado = executar_relatorio(6100, pool=pool)
+    assert resultado.sucesso is sucesso
+    assert resultado.navegador == "chrome-1"
+    assert pool.devolvidos == [("chrome-1", not sucesso)]
+
+
+def test_excecao_inesperada_tambem_recicla(monkeypatch):
+    monkeypatch.setattr(relatorio_pipeline, "PipelineRelatorio", pipeline_falso(erro=RuntimeError("driver morreu")))
+    pool = Pool()
+    with pytest.raises(RuntimeError):
+        executar_relatorio(6100, pool=pool)
+    assert pool.devolvidos == [("chrome-1", True)]
+
+
+def test_pool_esgotado_vira_falha_na_etapa_navegador():
+    pool = Pool(erro=PoolNavegadoresEsgotado("Nenhum navegador livre em 1s"))
+    resultado = executar_relatorio(6100, pool=pool)
+    assert not resultado.sucesso
+    assert resultado.etapa_falha == "navegador"
+    assert pool.devolvidos == []
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""GravadorVendas (executemany em lotes / LOAD DATA) sobre uma conexão falsa"""
+
+import os
+from datetime import date, time
+
+from ingestao_vendas import SQL_INSERT_VENDAS, SQL_LOAD_DATA_VENDAS, GravadorVendas, _campo_tsv
+
+
+class Log:
+    def info(self, mensagem):
+        pass
+
+
+class Cursor:
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def executemany(self, sql, linhas):
+        self.conexao.eventos.append(("executemany", sql, list(linhas)))
+
+    def execute(self, sql, parametros):
+        (caminho,) = parametros
+        with open(caminho, encoding="utf-8") as arquivo:
+            self.conexao.eventos.append(("load_data", sql, arquivo.read(), caminho))
+
+    def close(self):
+        pass
+
+
+class Conexao:
+    def __init__(self):
+        self.eventos = []
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self.eventos.append(("commit",))
+
+
+def linha(i):
+    return (f"Nome {i}", "(11) 91111-1111", "6197", "PTV", 1, 2.5, date(2025, 1, 5), time(10, 0, i % 60),
+            2.5, "Pix", "mercadopago", str(i))
+
+
+def test_executemany_em_lotes_com_commit_por_bloco():
+    conexao = Conexao()
+    total = GravadorVendas(conexao, Log(), lote=2, commit_a_cada=4, load_data=False).gravar(linha(i) for i in range(7))
+
+    assert total == 7
+    assert [(e[0], len(e[2])) if e[0] == "executemany" else e[0] for e in conexao.eventos] == [
+        ("executemany", 2), ("executemany", 2), "commit", ("executemany", 2), ("executemany", 1), "commit",
+    ]
+    assert all(e[1] == SQL_INSERT_VENDAS for e in conexao.eventos if e[0] == "executemany")
+    inseridas = [l for e in conexao.eventos if e[0] == "executemany" for l in e[2]]
+    assert inseridas == [linha(i) for i in range(7)]
+
+
+def test_sem_confirmar_nao_faz_commit():
+    conexao = Conexao()
+    GravadorVendas(conexao, Log(), lote=2, commit_a_cada=2, load_data=False).gravar([linha(1), linha(2), linha(3)], confirmar=False)
+    assert "commit" not in [e[0] for e in conexao.eventos]
+
+
+def test_commit_a_cada_nunca_menor_que_o_lote():
+    assert GravadorVendas(Conexao(), Log(), lote=10, commit_a_cada=3).commit_a_cada == 10
+
+
+def test_load_data_grava_tsv_e_remove_o_arquivo():
+    conexao = Conexao()
+    especial = ("Ana\tda\nSilva", None, "6197", "PTV", 1, 2.5, None, None, 2.5, "Pix", "c:\\host", "1")
+    GravadorVendas(conexao, Log(), lote=2, commit_a_cada=2, load_data=True).gravar([linha(1), especial])
+
+    (evento, sql, conteudo, caminho), commit = conexao.eventos
+    assert (evento, sql, commit) == ("load_data", SQL_LOAD_DATA_VENDAS, ("commit",))
+    assert not os.path.exists(caminho)
+    primeira, segunda = conteudo.splitlines()
+    assert primeira.split("\t")[6:8] == ["2025-01-05", "10:00:01"]
+    assert segunda == "Ana\\tda\\nSilva\t\\N\t6197\tPTV\t1\t2.5\t\\N\t\\N\t2.5\tPix\tc:\\\\host\t1"
+
+
+def test_campo_tsv():
+    assert _campo_tsv(None) == "\\N"
+    assert _campo_tsv("a\rb") == "a\\rb"
+    assert _campo_tsv(date(2025, 1, 5)) == "2025-01-05"
+    assert _campo_tsv(3) == "3"
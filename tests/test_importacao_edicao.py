@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""inserir_dados_banco_integrado: vendas e registro pai da edição numa transação só"""
+
+from datetime import date, datetime, time
+
+import pytest
+
+import relatorio_pipeline
+from ingestao_vendas import SQL_INSERT_VENDAS
+from relatorio_pipeline import inserir_dados_banco_integrado
+
+
+class Log:
+    def __init__(self):
+        self.mensagens = []
+
+    def info(self, mensagem):
+        self.mensagens.append(mensagem)
+
+    warning = error = info
+
+
+class Cursor:
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.rowcount = 0
+
+    def execute(self, sql, parametros=None):
+        sql = " ".join(sql.split())
+        self.conexao.eventos.append(("execute", sql.split(" ")[0]))
+        if sql.startswith("SELECT COUNT(*) FROM relatorios_importados"):
+            self.resultado = (0,)
+        if sql.startswith("DELETE"):
+            self.rowcount = self.conexao.orfas
+
+    def fetchone(self):
+        return self.resultado
+
+    def executemany(self, sql, linhas):
+        if self.conexao.falhar_insert:
+            raise RuntimeError("conexão perdida")
+        self.conexao.eventos.append(("executemany", sql, len(list(linhas))))
+
+    def close(self):
+        pass
+
+
+class Conexao:
+    def __init__(self, orfas=0, falhar_insert=False):
+        self.orfas = orfas
+        self.falhar_insert = falhar_insert
+        self.eventos = []
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self.eventos.append(("commit",))
+
+    def rollback(self):
+        self.eventos.append(("rollback",))
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def linha(i):
+    return (f"Nome {i}", "1", "6197", "PTV", 1, 2.5, date(2025, 1, 5), time(10, 0, i), 2.5, "Pix", "mp", str(i))
+
+
+@pytest.fixture
+def conectar(monkeypatch):
+    def preparar(conexao):
+        monkeypatch.setattr(relatorio_pipeline.mysql.connector, "connect", lambda **kwargs: conexao)
+        monkeypatch.setattr(relatorio_pipeline, "extrair_sigla_do_arquivo", lambda caminho, log: "PTV")
+        monkeypatch.setattr(relatorio_pipeline.agenda_sorteios, "atualizar_se_vencida", lambda conn: False)
+        monkeypatch.setattr(relatorio_pipeline, "calcular_dados_pai", lambda df, sigla, log: (12, datetime(2025, 1, 5, 16, 20)))
+        monkeypatch.setattr(relatorio_pipeline, "linhas_vendas", lambda df, edicao, sigla, log: (linha(i) for i in range(12)))
+        monkeypatch.setitem(relatorio_pipeline.INGESTAO_CONFIG, "load_data", False)
+        monkeypatch.setitem(relatorio_pipeline.INGESTAO_CONFIG, "lote", 5)
+        monkeypatch.setitem(relatorio_pipeline.INGESTAO_CONFIG, "commit_a_cada", 5)
+        return conexao
+    return preparar
+
+
+def test_vendas_e_pai_confirmados_num_commit_so(conectar):
+    conexao = conectar(Conexao(orfas=3))
+    log = Log()
+    assert inserir_dados_banco_integrado("PTV.csv", "6197", log, df_banco=object()) == ("INSERIDO", 12)
+
+    eventos = [e[0] if e[0] != "execute" else e[1] for e in conexao.eventos]
+    assert eventos == ["SELECT", "DELETE", "executemany", "executemany", "executemany", "INSERT", "commit"]
+    assert all(e[1] == SQL_INSERT_VENDAS for e in conexao.eventos if e[0] == "executemany")
+    assert any("3 linhas de uma importação incompleta" in m for m in log.mensagens)
+
+
+def test_falha_nas_vendas_desfaz_tudo_sem_commit(conectar):
+    conexao = conectar(Conexao(falhar_insert=True))
+    assert inserir_dados_banco_integrado("PTV.csv", "6197", Log(), df_banco=object()) == ("FALHA", 0)
+
+    eventos = [e[0] if e[0] != "execute" else e[1] for e in conexao.eventos]
+    assert eventos == ["SELECT", "DELETE", "rollback"]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""interpretar_edicoes: intervalos, listas e o limite do lote conferido antes de expandir"""
+
+import pytest
+
+import relatorio_pipeline
+from relatorio_pipeline import interpretar_edicoes
+
+
+def test_intervalos_e_listas_sem_repeticao():
+    assert interpretar_edicoes(["6100-6102", "6101,6099", " 6105 - 6104 "]) == [
+        "6100", "6101", "6102", "6099", "6105", "6104",
+    ]
+
+
+def test_intervalo_enorme_recusado_sem_expandir(monkeypatch):
+    monkeypatch.setattr(relatorio_pipeline, "LOTE_MAX_EDICOES", 5)
+    expandidos = []
+    monkeypatch.setattr(relatorio_pipeline, "range", lambda *a: expandidos.append(a) or range(*a), raising=False)
+    with pytest.raises(ValueError, match="limite de 5"):
+        interpretar_edicoes(["0-1000000000"])
+    assert expandidos == []
+
+
+def test_limite_conta_o_que_ja_foi_pedido(monkeypatch):
+    monkeypatch.setattr(relatorio_pipeline, "LOTE_MAX_EDICOES", 5)
+    assert len(interpretar_edicoes(["6100-6102", "6103-6104"])) == 5
+    with pytest.raises(ValueError):
+        interpretar_edicoes(["6100-6102", "6103-6105"])
+    with pytest.raises(ValueError):
+        interpretar_edicoes(["6100-6104", "6200"])
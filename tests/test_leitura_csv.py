@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""carregar_relatorio_vendas nos dois motores de parse"""
+
+import pandas as pd
+import pytest
+
+import leitura_csv
+from leitura_csv import COLUNAS_RELATORIO, carregar_relatorio_vendas, converter_data_compra
+
+CSV = (
+    "Id;Nome;Telefone;Quantidade;Valor;Data da Compra;Aprovado por;Host do Pagamento;Números;Extra\n"
+    "1;Ana;(11) 91111-1111;2;1,50;05/01/2025, 10:20:30;Pix;mercadopago;1, 2;x\n"
+    "2;Bia;(11) 92222-2222; 3 ;2.25;31/12/2024, 23:59:59;Admin;pagseguro;3;x\n"
+    "3;;(11) 93333-3333;abc;R$ 3;ontem;;pagseguro;4;x\n"
+)
+
+MOTORES = ["c", pytest.param("pyarrow", marks=pytest.mark.skipif(leitura_csv.pyarrow is None, reason="pyarrow ausente"))]
+
+
+@pytest.fixture
+def caminho_csv(tmp_path):
+    caminho = tmp_path / "relatorio.csv"
+    caminho.write_text(CSV, encoding="utf-8")
+    return caminho
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+def test_colunas_e_tipos(monkeypatch, caminho_csv, motor):
+    monkeypatch.setattr(leitura_csv, "CSV_ENGINE", motor)
+    df = carregar_relatorio_vendas(caminho_csv)
+
+    assert list(df.columns) == COLUNAS_RELATORIO
+    assert df["Quantidade"].tolist()[:2] == [2, 3]
+    assert pd.isna(df["Quantidade"][2])
+    assert df["Valor"].tolist()[:2] == [1.5, 2.25]
+    assert pd.isna(df["Valor"][2])
+    assert df["Data da Compra"].tolist()[:2] == [pd.Timestamp("2025-01-05 10:20:30"), pd.Timestamp("2024-12-31 23:59:59")]
+    assert pd.isna(df["Data da Compra"][2])
+    assert isinstance(df["Aprovado por"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["Host do Pagamento"].dtype, pd.CategoricalDtype)
+    assert df["Números"].tolist() == ["1, 2", "3", "4"]
+    assert pd.isna(df["Nome"][2])
+
+
+def test_motores_produzem_o_mesmo_dataframe(monkeypatch, caminho_csv):
+    if leitura_csv.pyarrow is None:
+        pytest.skip("pyarrow ausente")
+    monkeypatch.setattr(leitura_csv, "CSV_ENGINE", "c")
+    motor_c = carregar_relatorio_vendas(caminho_csv)
+    monkeypatch.setattr(leitura_csv, "CSV_ENGINE", "pyarrow")
+    motor_arrow = carregar_relatorio_vendas(caminho_csv)
+    pd.testing.assert_frame_equal(motor_c, motor_arrow)
+
+
+def test_pyarrow_ausente_cai_para_o_motor_c(monkeypatch):
+    monkeypatch.setattr(leitura_csv, "CSV_ENGINE", "pyarrow")
+    monkeypatch.setattr(leitura_csv, "pyarrow", None)
+    assert leitura_csv._motor() == "c"
+
+
+def test_converter_data_compra_fora_do_layout_fixo():
+    datas = converter_data_compra(pd.Series([" 05/01/2025, 10:20:30 ", "5/1/2025, 10:20:30", "2025-01-05", None]))
+    assert datas[0] == pd.Timestamp("2025-01-05 10:20:30")
+    assert datas[1] == pd.Timestamp("2025-01-05 10:20:30")
+    assert pd.isna(datas[2]) and pd.isna(datas[3])
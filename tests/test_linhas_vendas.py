@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Preparação por coluna das linhas de relatorios_vendas (linhas_vendas / resumo_vendas)"""
+
+from datetime import date, datetime, time
+
+import numpy as np
+import pandas as pd
+
+from ingestao_vendas import linhas_vendas, resumo_vendas
+
+
+class Log:
+    def __init__(self):
+        self.avisos = []
+
+    def warning(self, mensagem):
+        self.avisos.append(mensagem)
+
+
+def relatorio():
+    return pd.DataFrame({
+        "Nome": [" Ana ", "Bia", np.nan],
+        "Telefone": ["(11) 91111-1111", "(11) 92222-2222", "(11) 93333-3333"],
+        "Quantidade": [2.9, 0.0, np.nan],
+        "Valor": [5.0, 3.0, np.nan],
+        "Data da Compra": pd.to_datetime(["2025-01-05 10:20:30", "2025-01-04 08:00:00", None]),
+        "Aprovado por": pd.Categorical(["Pix", "Admin", None]),
+        "Host do Pagamento": pd.Categorical(["mercadopago", "pagseguro", "pagseguro"]),
+        "Números": ["1, 2", "3", "4"],
+    })
+
+
+def test_linhas_em_ordem_de_data_com_invalidas_primeiro():
+    log = Log()
+    linhas = list(linhas_vendas(relatorio(), "6197", "PTV", log=log))
+
+    assert linhas == [
+        ("nan", "(11) 93333-3333", "6197", "PTV", 0, 0.0, None, None, 0.0, "nan", "pagseguro", "4"),
+        ("Bia", "(11) 92222-2222", "6197", "PTV", 0, 3.0, date(2025, 1, 4), time(8, 0), 0.0, "Admin", "pagseguro", "3"),
+        ("Ana", "(11) 91111-1111", "6197", "PTV", 2, 5.0, date(2025, 1, 5), time(10, 20, 30), 2.5, "Pix", "mercadopago", "1, 2"),
+    ]
+    assert len(log.avisos) == 1
+
+
+def test_tipos_python_nas_tuplas():
+    linha = list(linhas_vendas(relatorio(), "6197", "PTV"))[-1]
+    assert [type(v) for v in linha[4:9]] == [int, float, date, time, float]
+
+
+def test_blocos_nao_mudam_o_resultado():
+    df = pd.concat([relatorio()] * 5, ignore_index=True)
+    assert list(linhas_vendas(df, "1", "PT", bloco=2)) == list(linhas_vendas(df, "1", "PT"))
+
+
+def test_resumo_ignora_linhas_sem_quantidade():
+    df = relatorio()
+    df.loc[2, "Data da Compra"] = pd.Timestamp("2030-01-01")
+    assert resumo_vendas(df) == (2, datetime(2025, 1, 5, 10, 20, 30))
+
+
+def test_resumo_sem_datas_validas():
+    df = relatorio()
+    df["Data da Compra"] = pd.NaT
+    assert resumo_vendas(df) == (2, None)
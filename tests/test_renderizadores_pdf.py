@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""RenderizadorStreaming: PDF válido e renders simultâneos na mesma instância"""
+
+import threading
+
+import pandas as pd
+
+from renderizadores_pdf import RenderizadorStreaming
+
+
+def tabela(nome, linhas):
+    return pd.DataFrame({
+        "Nome": [f"{nome} {i} " * (1 + i % 3) for i in range(linhas)],
+        "Telefone": ["(11) 91***-**11"] * linhas,
+        "Números": [", ".join(map(str, range(i % 40))) for i in range(linhas)],
+    })
+
+
+def test_pdf_completo(tmp_path):
+    caminho = tmp_path / "relatorio.pdf"
+    RenderizadorStreaming().renderizar("Edição 6197 - PTV", tabela("Ana", 300), str(caminho))
+    dados = caminho.read_bytes()
+    assert dados.startswith(b"%PDF-1.4")
+    assert dados.rstrip().endswith(b"%%EOF")
+    assert dados.count(b"/Type /Page ") > 1
+    assert list(tmp_path.iterdir()) == [caminho]  # sem temporário sobrando
+
+
+def test_renders_simultaneos_nao_se_misturam(tmp_path):
+    renderizador = RenderizadorStreaming()
+    tabelas = {"a": tabela("Ana", 1500), "b": tabela("Bia", 1500)}
+    referencias = {}
+    for nome, df in tabelas.items():
+        referencias[nome] = tmp_path / f"ref-{nome}.pdf"
+        renderizador.renderizar("T", df, str(referencias[nome]))
+
+    erros = []
+    barreira = threading.Barrier(6)
+
+    def renderizar(nome, caminho):
+        barreira.wait()
+        try:
+            renderizador.renderizar("T", tabelas[nome], str(caminho))
+        except Exception as e:  # pragma: no cover - só em caso de regressão
+            erros.append(e)
+
+    trabalhos = [("ab"[i % 2], tmp_path / f"job-{i}.pdf") for i in range(6)]
+    threads = [threading.Thread(target=renderizar, args=trabalho) for trabalho in trabalhos]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert erros == []
+    for nome, caminho in trabalhos:
+        assert caminho.read_bytes() == referencias[nome].read_bytes()
@@ -14,7 +14,7 @@ import sys
 import subprocess
 import asyncio
 import logging
-from datetime import datetime, time
+from datetime import datetime
 from dotenv import load_dotenv
 import requests
 import base64
@@ -62,6 +62,30 @@ except ImportError:
 # Log das configurações do banco (sem senha)
 logger.info(f"Configuração do banco: host={DB_CONFIG['host']}, user={DB_CONFIG['user']}, database={DB_CONFIG['database']}, port={DB_CONFIG['port']}")
 
+# Pipeline do relatório importado uma vez (pandas/selenium/pdfkit já carregados para todos os jobs)
+from relatorio_pipeline import (
+    executar_relatorio, executar_lote, criar_pool_navegadores, CAMINHO_DOWNLOADS, LOTE_MAX_EDICOES,
+)
+from fila_jobs import FilaJobs, FilaCheia, LOTE, FILA_JOBS_CONFIG
+from navegador_pool import NAVEGADOR_POOL_CONFIG
+from coalescedor_relatorios import CoalescedorRelatorios
+from banco_assincrono import criar_banco_assincrono
+from cache_edicoes import CacheEdicoes
+from agenda_sorteios import agenda_sorteios
+from db_pool import PoolEsgotado
+
+# Uma execução por edição (inclusive entre este container e o do dashboard) + cache curto do resultado
+coalescedor_relatorios = CoalescedorRelatorios(CAMINHO_DOWNLOADS)
+
+# Chrome(s) já autenticados no painel, emprestados aos jobs - um por trabalhador da fila,
+# para que jobs simultâneos não esperem navegador
+pool_navegadores = criar_pool_navegadores(
+    tamanho=max(NAVEGADOR_POOL_CONFIG['tamanho'], FILA_JOBS_CONFIG['concorrencia'])
+)
+
+# Consultas ao banco fora do event loop (executor próprio + pool de conexões)
+banco = criar_banco_assincrono(DB_CONFIG)
+
 # Configurações do servidor
 WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8011))
 WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', 'webhook_secret')
@@ -74,55 +98,49 @@ class WebhookHandler:
     def __init__(self):
         self.api_key = WEBHOOK_API_KEY
         
-        # Mapeamento de siglas oficiais e seus horários
-        self.siglas_horarios = {
-            'PPT': time(9, 20),    # 09:20
-            'PTM': time(11, 20),   # 11:20
-            'PT': time(14, 20),    # 14:20
-            'PTV': time(16, 20),   # 16:20
-            'PTN': time(18, 20),   # 18:20
-            'FEDERAL': time(19, 0), # 19:00
-            'CORUJINHA': time(21, 30) # 21:30
-        }
+        # Siglas oficiais e horários vêm da agenda única (premiacoes, recarregada por intervalo)
+        self.agenda = agenda_sorteios
         
-        # Siglas oficiais válidas
-        self.siglas_oficiais = list(self.siglas_horarios.keys())
+        # Metadados de edição (LRU + TTL, com cache negativo para edições inexistentes)
+        self.cache_edicoes = CacheEdicoes()
+    
+    @property
+    def siglas_horarios(self):
+        """Sigla oficial -> horário do sorteio (agenda atual)"""
+        return self.agenda.horarios()
+    
+    @property
+    def siglas_oficiais(self):
+        return self.agenda.siglas()
     
     def extrair_sigla_oficial(self, sigla_completa):
         """
         Extrai a sigla oficial de uma sigla completa
         Ex: 'PT ESPECIAL' -> 'PT', 'PPT EXTRA' -> 'PPT'
-        IMPORTANTE: Verifica siglas mais específicas primeiro para evitar confusão
+        O reconhecedor da agenda escolhe sempre o prefixo mais longo (PTV antes de PT)
         """
         if not sigla_completa:
             return None
-            
-        sigla_upper = sigla_completa.upper().strip()
         
-        # Lista ordenada por especificidade (mais específicas primeiro)
-        # Isso evita que PT seja confundido com PTV, PTN, PTM
-        siglas_ordenadas = [
-            'CORUJINHA',  # Mais específica
-            'FEDERAL',    # Mais específica
-            'PPT',        # Mais específica
-            'PTV',        # Mais específica que PT
-            'PTN',        # Mais específica que PT
-            'PTM',        # Mais específica que PT
-            'PT'          # Menos específica - deve ser verificada por último
-        ]
-        
-        # Verificar siglas na ordem de especificidade
-        for sigla_oficial in siglas_ordenadas:
-            if sigla_upper.startswith(sigla_oficial):
-                logger.info(f"Sigla extraída: '{sigla_completa}' -> '{sigla_oficial}'")
-                return sigla_oficial
+        sigla_oficial = self.agenda.sigla_oficial(sigla_completa)
+        if sigla_oficial:
+            logger.info(f"Sigla extraída: '{sigla_completa}' -> '{sigla_oficial}'")
+            return sigla_oficial
         
         logger.warning(f"Nenhuma sigla oficial encontrada em: '{sigla_completa}'")
         return None
     
+    async def atualizar_agenda(self):
+        """Recarrega a agenda de premiacoes quando vencida (conexão do pool, fora do event loop)"""
+        if self.agenda.vencida():
+            try:
+                await banco.executar(self.agenda.atualizar_se_vencida)
+            except Exception as e:
+                logger.warning(f"Agenda de sorteios não atualizada: {e}")
+    
     def obter_horario_sorteio(self, sigla_oficial):
         """Retorna o horário de sorteio para uma sigla oficial"""
-        return self.siglas_horarios.get(sigla_oficial)
+        return self.agenda.horario(sigla_oficial)
     
     def validar_horario_edicao(self, sigla_oficial, data_sorteio):
         """
@@ -194,11 +212,12 @@ class WebhookHandler:
             proxima_edicao_hoje = None
             proxima_sigla_hoje = None
             
+            # Agenda já vem em ordem de horário: a primeira depois de agora é a próxima
             for sigla, horario in self.siglas_horarios.items():
                 if horario > horario_atual:
-                    if proxima_edicao_hoje is None or horario < self.siglas_horarios[proxima_sigla_hoje]:
-                        proxima_edicao_hoje = horario
-                        proxima_sigla_hoje = sigla
+                    proxima_edicao_hoje = horario
+                    proxima_sigla_hoje = sigla
+                    break
             
             logger.info(f"Próxima edição válida hoje: {proxima_sigla_hoje} às {proxima_edicao_hoje}")
             
@@ -226,26 +245,34 @@ class WebhookHandler:
             logger.error(f"Erro ao verificar próxima edição: {e}")
             return True, None  # Em caso de erro, permitir processamento
     
+    def validar_solicitacao(self, request_data):
+        """
+        Validação rápida feita antes de enfileirar
+        Retorna: (edition_number, source_app, erro)
+        """
+        edition_number = request_data.get('edicao')
+        source_app = request_data.get('source_app', 'unknown')
+        
+        if not edition_number:
+            logger.error("Número de edição não fornecido")
+            return None, source_app, "Número de edição não fornecido"
+        
+        logger.info(f"Solicitação recebida de {source_app} para edição {edition_number}")
+        
+        # Verificar se é número de edição válido
+        if not self.is_edition_number(str(edition_number)):
+            logger.error(f"Número de edição inválido: {edition_number}")
+            return None, source_app, "Número de edição inválido"
+        
+        return int(edition_number), source_app, None
+    
     async def process_request(self, request_data):
-        """Processa solicitação recebida de outras aplicações"""
+        """Processa solicitação recebida de outras aplicações (execução direta, sem fila)"""
         try:
-            # Extrair dados da solicitação
-            edition_number = request_data.get('edicao')
-            source_app = request_data.get('source_app', 'unknown')
-            
-            if not edition_number:
-                logger.error("Número de edição não fornecido")
-                return {"success": False, "error": "Número de edição não fornecido"}
-            
-            logger.info(f"Solicitação recebida de {source_app} para edição {edition_number}")
-            
-            # Verificar se é número de edição válido
-            if self.is_edition_number(str(edition_number)):
-                result = await self.handle_edition_request(edition_number)
-                return result
-            else:
-                logger.error(f"Número de edição inválido: {edition_number}")
-                return {"success": False, "error": "Número de edição inválido"}
+            edition_number, source_app, erro = self.validar_solicitacao(request_data)
+            if erro:
+                return {"success": False, "error": erro}
+            return await self.handle_edition_request(edition_number)
                 
         except Exception as e:
             logger.error(f"Erro ao processar solicitação: {e}")
@@ -261,24 +288,26 @@ class WebhookHandler:
             return False
     
     async def check_edition_in_database(self, edition_number):
-        """Verifica se a edição existe no banco e retorna informações"""
+        """Verifica se a edição existe no banco e retorna informações (cache LRU+TTL antes do banco)"""
+        edicao = int(edition_number)
+        encontrado, edition_info = self.cache_edicoes.obter(edicao)
+        if encontrado:
+            if edition_info is None:
+                logger.warning(f"Edição {edition_number} não encontrada no banco (cache)")
+            else:
+                logger.info(f"Edição {edition_number} encontrada (cache): {edition_info['sigla_oficial']} - {edition_info['data_formatada']}")
+            return edition_info
+        
         try:
-            # Log das configurações do banco (sem senha)
-            logger.info(f"Tentando conectar ao banco: host={DB_CONFIG.get('host')}, user={DB_CONFIG.get('user')}, database={DB_CONFIG.get('database')}, port={DB_CONFIG.get('port')}")
-            
-            # Conectar ao banco
-            conn = mysql.connector.connect(**DB_CONFIG)
-            cursor = conn.cursor(dictionary=True)
-            
-            # Consultar a edição na tabela extracoes_cadastro
+            # Consultar a edição na tabela extracoes_cadastro (conexão do pool, fora do event loop)
             sql = """
                 SELECT edicao, sigla_oficial, data_sorteio 
                 FROM extracoes_cadastro 
                 WHERE edicao = %s
             """
-            cursor.execute(sql, (edition_number,))
-            result = cursor.fetchone()
+            result = await banco.buscar_um(sql, (edition_number,))
             
+            edition_info = None
             if result:
                 # Formatar a data para o padrão dd/mm/yy
                 data_sorteio = result['data_sorteio']
@@ -295,22 +324,20 @@ class WebhookHandler:
                 }
                 
                 logger.info(f"Edição {edition_number} encontrada: {result['sigla_oficial']} - {data_formatada}")
-                return edition_info
             else:
                 logger.warning(f"Edição {edition_number} não encontrada no banco")
-                return None
+            
+            # Só resultados de consultas bem-sucedidas entram no cache (erro de banco não é "inexistente")
+            self.cache_edicoes.guardar(edicao, edition_info)
+            return edition_info
                 
-        except mysql.connector.Error as err:
+        except (mysql.connector.Error, PoolEsgotado) as err:
             logger.error(f"Erro ao consultar banco: {err}")
             return None
         except Exception as e:
             logger.error(f"Erro inesperado ao consultar banco: {e}")
             logger.error(f"Tipo de erro: {type(e).__name__}")
             return None
-        finally:
-            if 'conn' in locals() and conn.is_connected():
-                cursor.close()
-                conn.close()
     
     async def handle_edition_request(self, edition_number):
         """Processa solicitação de edição com validações de horário"""
@@ -325,6 +352,7 @@ class WebhookHandler:
                 return {"success": False, "error": f"Edição {edition_number} não encontrada no sistema."}
             
             # Extrair sigla oficial da sigla completa
+            await self.atualizar_agenda()
             sigla_completa = edition_info['sigla_oficial']
             sigla_oficial = self.extrair_sigla_oficial(sigla_completa)
             
@@ -378,49 +406,28 @@ class WebhookHandler:
             return {"success": False, "error": "Erro interno. Tente novamente."}
     
     async def execute_report_script(self, edition_number):
-        """Executa o script relatorio_v2_vps.py"""
+        """Executa o pipeline do relatório no próprio processo (em thread, com navegador do pool)"""
         try:
-            logger.info(f"Executando script para edição {edition_number}")
-            
-            # Comando para executar o script (funciona tanto local quanto Docker)
-            script_path = os.path.join(os.getcwd(), "relatorio_v2_vps.py")
-            cmd = [
-                "python", 
-                script_path, 
-                str(edition_number)
-            ]
+            logger.info(f"Executando pipeline para edição {edition_number}")
             
-            # Executar script usando subprocess.run (síncrono para Windows)
-            import subprocess
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='ignore'
+            resultado, origem = await asyncio.to_thread(
+                coalescedor_relatorios.executar,
+                edition_number,
+                lambda: executar_relatorio(edition_number, pool=pool_navegadores).como_dict()
             )
+            if origem != "executado":
+                logger.info(f"Relatório da edição {edition_number} reaproveitado ({origem})")
             
-            if result.returncode == 0:
-                # Procurar caminho do PDF no output
-                output_lines = result.stdout.split('\n')
-                
-                pdf_path = None
-                
-                for line in output_lines:
-                    if 'PDF gerado:' in line:
-                        pdf_path = line.replace('PDF gerado:', '').strip()
-                        break
-                
+            if resultado.get('sucesso'):
+                pdf_path = resultado.get('caminho_pdf')
                 if pdf_path and os.path.exists(pdf_path):
                     logger.info(f"PDF gerado: {pdf_path}")
                     return True, pdf_path
                 else:
-                    logger.error("PDF não encontrado no output")
+                    logger.error("Pipeline concluído sem PDF (wkhtmltopdf indisponível?)")
                     return False, None
             else:
-                logger.error(f"Script falhou com código {result.returncode}")
-                logger.error(f"STDOUT: {result.stdout}")
-                logger.error(f"STDERR: {result.stderr}")
+                logger.error(f"Pipeline falhou na etapa '{resultado.get('etapa_falha')}': {resultado.get('erro')}")
                 return False, None
                 
         except Exception as e:
@@ -441,6 +448,50 @@ class WebhookHandler:
 # Instanciar handler
 webhook_handler = WebhookHandler()
 
+# Fila de jobs: o webhook responde na hora e os relatórios rodam em trabalhadores limitados
+async def executar_job(job):
+    if job.tipo == LOTE:
+        return await executar_job_lote(job)
+    return await webhook_handler.handle_edition_request(job.edicao)
+
+async def executar_job_lote(job):
+    """Lote: um login no painel para todas as edições (sem validação de horário por edição)"""
+    lote = await asyncio.to_thread(executar_lote, list(job.edicao), pool=pool_navegadores)
+    logger.info(f"Lote {job.id}: {lote['vazao']['sucessos']}/{lote['vazao']['edicoes']} edições "
+                f"em {lote['vazao']['total_s']}s ({lote['vazao']['edicoes_por_minuto']} edições/min)")
+    return {"success": lote["sucesso"], **lote,
+            "error": None if lote["sucesso"] else f"{lote['vazao']['falhas']} edição(ões) falharam"}
+
+fila_jobs = FilaJobs(executar_job)
+
+# Tempo máximo que /webhook?aguardar=true segura a conexão esperando o job
+WEBHOOK_AGUARDAR_TIMEOUT = int(os.getenv('WEBHOOK_AGUARDAR_TIMEOUT', 300))
+
+@app.on_event("startup")
+async def iniciar_fila_jobs():
+    await fila_jobs.iniciar()
+
+@app.on_event("startup")
+async def iniciar_banco():
+    await banco.iniciar()
+
+@app.on_event("shutdown")
+async def encerrar_fila_jobs():
+    await fila_jobs.encerrar()
+
+@app.on_event("shutdown")
+async def encerrar_banco():
+    banco.encerrar()
+
+@app.on_event("startup")
+async def iniciar_navegadores():
+    # Chrome + login levam alguns segundos: aquece em segundo plano sem atrasar o startup
+    asyncio.get_running_loop().run_in_executor(None, pool_navegadores.iniciar)
+
+@app.on_event("shutdown")
+async def encerrar_navegadores():
+    await asyncio.to_thread(pool_navegadores.encerrar)
+
 @app.get("/")
 async def root():
     """Endpoint raiz"""
@@ -452,8 +503,12 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 @app.post("/webhook")
-async def webhook_endpoint(request: Request):
-    """Endpoint para receber solicitações de outras aplicações"""
+async def webhook_endpoint(request: Request, aguardar: bool = False):
+    """
+    Endpoint para receber solicitações de outras aplicações
+    - Padrão: enfileira e responde 202 com o job_id (consultar em /jobs/{job_id})
+    - ?aguardar=true: espera o job terminar e responde como antes (compatibilidade)
+    """
     try:
         # Verificar secret (opcional)
         secret = request.headers.get('x-webhook-secret')
@@ -465,15 +520,127 @@ async def webhook_endpoint(request: Request):
         request_data = await request.json()
         logger.info(f"Solicitação recebida: {request_data}")
         
-        # Processar solicitação
-        result = await webhook_handler.process_request(request_data)
+        edition_number, source_app, erro = webhook_handler.validar_solicitacao(request_data)
+        if erro:
+            return JSONResponse(content={"success": False, "error": erro})
         
-        return JSONResponse(content=result)
+        coalescido = fila_jobs.ativo(edition_number) is not None
+        try:
+            job = fila_jobs.enfileirar(edition_number, source_app)
+        except FilaCheia as e:
+            logger.warning(str(e))
+            return JSONResponse(status_code=503, content={"success": False, "error": str(e)})
+        
+        if aguardar:
+            if await fila_jobs.aguardar(job, timeout=WEBHOOK_AGUARDAR_TIMEOUT):
+                return JSONResponse(content={**(job.resultado or {"success": False, "error": job.erro}), "job_id": job.id})
+            return JSONResponse(status_code=202, content={
+                "success": True,
+                "message": f"Relatório da edição {edition_number} ainda em processamento",
+                "job_id": job.id,
+                "status_url": f"/jobs/{job.id}"
+            })
         
+        return JSONResponse(status_code=202, content={
+            "success": True,
+            "message": f"Relatório da edição {edition_number} enfileirado",
+            "job_id": job.id,
+            "coalescido": coalescido,
+            "estado": job.estado,
+            "posicao_fila": fila_jobs.posicao(job),
+            "status_url": f"/jobs/{job.id}"
+        })
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro no webhook: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/lote")
+async def lote_endpoint(request: Request):
+    """
+    Enfileira a geração de várias edições numa única sessão do painel
+    Corpo: {"edicoes": [6100, 6101, ...]} ou {"inicio": 6100, "fim": 6110}
+    Responde 202 com o job_id; resultados por edição e vazão em /jobs/{job_id}/resultado
+    """
+    secret = request.headers.get('x-webhook-secret')
+    if secret and secret != WEBHOOK_SECRET:
+        logger.warning("Webhook secret inválido")
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    dados = await request.json()
+    try:
+        if "edicoes" in dados:
+            edicoes = [int(e) for e in dados["edicoes"]]
+        else:
+            inicio, fim = int(dados["inicio"]), int(dados["fim"])
+    except (KeyError, TypeError, ValueError):
+        return JSONResponse(status_code=400, content={"success": False, "error": "Informe 'edicoes' (lista) ou 'inicio' e 'fim'"})
+
+    if "edicoes" not in dados:
+        # Limites conferidos antes de montar o intervalo, que nunca passa de LOTE_MAX_EDICOES
+        invalidas = [e for e in (inicio, fim) if not webhook_handler.is_edition_number(e)]
+        if invalidas:
+            return JSONResponse(status_code=400, content={"success": False, "error": f"Edições inválidas: {invalidas}"})
+        if abs(fim - inicio) + 1 > LOTE_MAX_EDICOES:
+            return JSONResponse(status_code=400, content={"success": False, "error": f"Lote excede o limite de {LOTE_MAX_EDICOES} edições"})
+        edicoes = list(range(min(inicio, fim), max(inicio, fim) + 1))
+
+    edicoes = list(dict.fromkeys(edicoes))
+    invalidas = [e for e in edicoes if not webhook_handler.is_edition_number(e)]
+    if not edicoes or invalidas:
+        return JSONResponse(status_code=400, content={"success": False, "error": f"Edições inválidas: {invalidas or 'lista vazia'}"})
+    if len(edicoes) > LOTE_MAX_EDICOES:
+        return JSONResponse(status_code=400, content={"success": False, "error": f"Lote excede o limite de {LOTE_MAX_EDICOES} edições"})
+
+    try:
+        job = fila_jobs.enfileirar(tuple(edicoes), dados.get("source_app"), tipo=LOTE)
+    except FilaCheia as e:
+        logger.warning(str(e))
+        return JSONResponse(status_code=503, content={"success": False, "error": str(e)})
+
+    return JSONResponse(status_code=202, content={
+        "success": True,
+        "message": f"Lote de {len(edicoes)} edições enfileirado",
+        "job_id": job.id,
+        "estado": job.estado,
+        "posicao_fila": fila_jobs.posicao(job),
+        "status_url": f"/jobs/{job.id}"
+    })
+
+@app.get("/jobs/metricas")
+async def metricas_jobs():
+    """Profundidade da fila, jobs em execução, tempos de espera/execução, reaproveitamentos, pool do banco, cache de edições, agenda de sorteios e navegadores"""
+    return {
+        **fila_jobs.metricas(),
+        "coalescedor": coalescedor_relatorios.metricas(),
+        "banco": banco.metricas(),
+        "cache_edicoes": webhook_handler.cache_edicoes.metricas(),
+        "agenda_sorteios": webhook_handler.agenda.como_dict(),
+        "navegadores": pool_navegadores.metricas(),
+    }
+
+@app.get("/jobs/{job_id}")
+async def status_job(job_id: str):
+    """Estado do job (e resultado, quando finalizado)"""
+    job = fila_jobs.obter(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado ou expirado")
+    dados = job.como_dict()
+    dados["posicao_fila"] = fila_jobs.posicao(job)
+    return dados
+
+@app.get("/jobs/{job_id}/resultado")
+async def resultado_job(job_id: str):
+    """Resultado do job; 202 enquanto ainda estiver na fila ou executando"""
+    job = fila_jobs.obter(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado ou expirado")
+    if not job.finalizado:
+        return JSONResponse(status_code=202, content=job.como_dict(incluir_resultado=False))
+    return JSONResponse(content={**(job.resultado or {"success": False, "error": job.erro}), "job_id": job.id})
+
 @app.post("/test")
 async def test_endpoint():
     """Endpoint para testes"""
@@ -484,15 +651,9 @@ async def test_database():
     """Testa conexão com o banco de dados"""
     try:
         logger.info("Testando conexão com banco de dados...")
-        conn = mysql.connector.connect(**DB_CONFIG)
-        cursor = conn.cursor(dictionary=True)
         
         # Testar consulta simples
-        cursor.execute("SELECT COUNT(*) as total FROM extracoes_cadastro")
-        result = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
+        result = await banco.buscar_um("SELECT COUNT(*) as total FROM extracoes_cadastro")
         
         return {
             "success": True,